@@ -71,9 +71,8 @@ class UserProfile(models.Model):
     
     @property
     def is_online(self):
-        if not self.last_seen:
-            return False
-        return (timezone.now() - self.last_seen).seconds < 300  # 5 minutes
+        from .presence import get_presence
+        return get_presence().is_online([self.user_id])[self.user_id]
     
     @property
     def display_name(self):
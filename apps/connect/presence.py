@@ -0,0 +1,199 @@
+# startup_hub/apps/connect/presence.py
+"""
+Presence service: TTL heartbeat keys per user plus batched last-seen persistence.
+
+A user is online while their heartbeat key exists. A heartbeat is only
+written when the user's key is older than half the TTL, so a busy user costs
+one write per couple of minutes rather than one per request.
+
+With Redis (``PRESENCE_SETTINGS['REDIS_URL']`` configured and reachable)
+heartbeats also record the timestamp in a "dirty" hash which
+``flush_last_seen`` drains into ``UserProfile.last_seen`` with one bulk
+UPDATE per batch, so neither HTTP requests nor WebSocket frames write to the
+database. The Django cache cannot hold a queue shared safely by every web,
+ASGI and Celery process, so without Redis each (throttled) heartbeat writes
+``last_seen`` directly instead.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRESENCE_SETTINGS = {
+    'REDIS_URL': '',
+    'TTL': 300,  # seconds a heartbeat keeps a user online
+    'FLUSH_BATCH_SIZE': 500,
+}
+
+ONLINE_KEY = 'presence:online:{}'
+DIRTY_KEY = 'presence:last_seen'
+
+
+def save_last_seen(user_id, timestamp):
+    from datetime import datetime, timezone as dt_timezone
+    from .models import UserProfile
+
+    last_seen = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+    if not UserProfile.objects.filter(user_id=user_id).update(last_seen=last_seen):
+        UserProfile.objects.get_or_create(user_id=user_id, defaults={'last_seen': last_seen})
+
+
+def get_presence_settings():
+    config = dict(DEFAULT_PRESENCE_SETTINGS)
+    config.update(getattr(settings, 'PRESENCE_SETTINGS', {}))
+    return config
+
+
+class RedisPresenceBackend:
+    """Heartbeat keys with native TTLs and a hash of pending last-seen writes"""
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+
+    def last_heartbeat(self, user_id):
+        return self.client.get(ONLINE_KEY.format(user_id))
+
+    def heartbeat(self, user_id, timestamp):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(ONLINE_KEY.format(user_id), timestamp, ex=self.ttl)
+        pipe.hset(DIRTY_KEY, user_id, timestamp)
+        pipe.execute()
+
+    def online(self, user_ids):
+        values = self.client.mget([ONLINE_KEY.format(user_id) for user_id in user_ids])
+        return {user_id: value is not None for user_id, value in zip(user_ids, values)}
+
+    def drain(self):
+        # Read and reset atomically so heartbeats during a flush are not lost
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(DIRTY_KEY)
+        pipe.delete(DIRTY_KEY)
+        pending, _ = pipe.execute()
+        return {int(user_id): float(timestamp) for user_id, timestamp in pending.items()}
+
+
+class CachePresenceBackend:
+    """Django cache stand-in used when Redis is not available; writes last_seen directly"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def last_heartbeat(self, user_id):
+        return cache.get(ONLINE_KEY.format(user_id))
+
+    def heartbeat(self, user_id, timestamp):
+        cache.set(ONLINE_KEY.format(user_id), timestamp, self.ttl)
+        save_last_seen(user_id, timestamp)
+
+    def online(self, user_ids):
+        found = cache.get_many([ONLINE_KEY.format(user_id) for user_id in user_ids])
+        return {user_id: ONLINE_KEY.format(user_id) in found for user_id in user_ids}
+
+    def drain(self):
+        # Nothing is queued; heartbeats were saved as they happened
+        return {}
+
+
+class PresenceService:
+    """Single entry point for online status and last-seen tracking"""
+
+    def __init__(self, backend, batch_size=500, interval=150):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.interval = interval
+
+    def heartbeat(self, user_id):
+        """Mark a user online for one TTL and record last-seen, unless done within ``interval``"""
+        now = time.time()
+        try:
+            last = self.backend.last_heartbeat(user_id)
+            if last is not None and now - float(last) < self.interval:
+                return
+            self.backend.heartbeat(user_id, now)
+        except Exception as e:
+            logger.warning(f"Presence heartbeat failed for user {user_id}: {e}")
+
+    def is_online(self, user_ids):
+        """Return ``{user_id: bool}`` for all given users in one round trip"""
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        try:
+            return self.backend.online(user_ids)
+        except Exception as e:
+            logger.warning(f"Presence lookup failed: {e}")
+            return {user_id: False for user_id in user_ids}
+
+    def flush_last_seen(self):
+        """Persist queued heartbeats to ``UserProfile.last_seen``
+
+        Issues one UPDATE ... CASE statement per batch of users. Returns the
+        number of profiles updated.
+        """
+        from datetime import datetime, timezone as dt_timezone
+        from django.db.models import Case, DateTimeField, Value, When
+        from .models import UserProfile
+
+        pending = self.backend.drain()
+        if not pending:
+            return 0
+
+        updated = 0
+        user_ids = sorted(pending)
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            updated += UserProfile.objects.filter(user_id__in=batch).update(
+                last_seen=Case(
+                    *[
+                        When(
+                            user_id=user_id,
+                            then=Value(datetime.fromtimestamp(pending[user_id], tz=dt_timezone.utc))
+                        )
+                        for user_id in batch
+                    ],
+                    output_field=DateTimeField()
+                )
+            )
+        return updated
+
+
+_presence = None
+
+
+def get_presence():
+    """Return the process-wide presence service, choosing a backend on first use"""
+    global _presence
+    if _presence is None:
+        config = get_presence_settings()
+        backend = None
+        if config['REDIS_URL']:
+            try:
+                import redis
+                client = redis.from_url(config['REDIS_URL'], decode_responses=True)
+                client.ping()
+                backend = RedisPresenceBackend(client, config['TTL'])
+            except Exception as e:
+                logger.warning(f"Presence Redis unavailable, using cache backend: {e}")
+        if backend is None:
+            backend = CachePresenceBackend(config['TTL'])
+        # Refresh at most twice per TTL so the key never lapses for an active user
+        _presence = PresenceService(backend, batch_size=config['FLUSH_BATCH_SIZE'], interval=config['TTL'] / 2)
+    return _presence
+
+
+def prime_online_status(context, user_ids):
+    """Batch-load online status for ``user_ids`` into a serializer context"""
+    known = context.setdefault('online_status', {})
+    missing = [user_id for user_id in user_ids if user_id not in known]
+    if missing:
+        known.update(get_presence().is_online(missing))
+    return known
+
+
+def online_status(context, user_id):
+    """Online status for one user, reusing anything already primed in context"""
+    return prime_online_status(context, [user_id])[user_id]
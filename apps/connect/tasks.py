@@ -0,0 +1,18 @@
+# startup_hub/apps/connect/tasks.py
+from celery import shared_task
+from .presence import get_presence
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_presence_last_seen():
+    """
+    Persist queued presence heartbeats to UserProfile.last_seen.
+    This task should be scheduled to run every minute.
+    """
+    updated = get_presence().flush_last_seen()
+    if updated:
+        logger.info(f'Flushed last_seen for {updated} profiles')
+    return updated
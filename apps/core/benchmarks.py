@@ -0,0 +1,21 @@
+# startup_hub/apps/core/benchmarks.py
+"""
+Guard for the benchmark and load-test management commands.
+
+They create and delete throwaway users, conversations and startups in the
+configured database, so they only run where that cannot touch real data:
+with ``DEBUG`` on, or against a test database (the ``test_`` name the test
+runner gives it).
+"""
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+
+
+def require_scratch_database():
+    """Raise ``CommandError`` unless fixtures may be written to the configured database"""
+    database = str(connection.settings_dict['NAME'])
+    if not settings.DEBUG and not database.rsplit('/', 1)[-1].startswith('test_'):
+        raise CommandError(
+            f'Refusing to create benchmark data in "{database}": run with DEBUG or against a test database'
+        )
@@ -0,0 +1,43 @@
+# startup_hub/apps/core/bulk.py
+"""
+Helpers for set-based bulk actions (startup, job and application moderation).
+
+Views read the current state of the selected rows once, apply the change with
+a single UPDATE or DELETE, and report an outcome for every requested id:
+the action's outcome (``approved``, ``deleted``...), ``unchanged`` when the
+row was already in the target state, ``not_found`` for missing or
+inaccessible ids and ``invalid`` for values that aren't ids.
+"""
+
+MAX_BULK_IDS = 1000
+
+
+def parse_ids(values):
+    """Split request ids into ``(ids, invalid)``, keeping request order and dropping duplicates"""
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    ids, invalid, seen = [], [], set()
+    for value in values:
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            invalid.append(value)
+            continue
+        if pk not in seen:
+            seen.add(pk)
+            ids.append(pk)
+    return ids, invalid
+
+
+def bulk_results(ids, invalid, found, changed, outcome):
+    """Per-id outcomes for a bulk action, in request order"""
+    results = []
+    for pk in ids:
+        if pk in changed:
+            results.append({'id': pk, 'outcome': outcome})
+        elif pk in found:
+            results.append({'id': pk, 'outcome': 'unchanged'})
+        else:
+            results.append({'id': pk, 'outcome': 'not_found'})
+    results.extend({'id': value, 'outcome': 'invalid'} for value in invalid)
+    return results
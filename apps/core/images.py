@@ -0,0 +1,195 @@
+# startup_hub/apps/core/images.py
+"""
+Responsive image pipeline for startup covers, avatars and post images.
+
+Uploads are streamed to storage unchanged. Once the transaction commits,
+``process_image`` hands the stored name to a small pool of worker processes,
+which write resized WebP and JPEG variants next to the original and build a
+tiny blurred placeholder. The result is recorded in the model's variants
+JSON field:
+
+    {'original': name, 'width': ..., 'height': ..., 'placeholder': 'data:...',
+     'webp': [{'width', 'height', 'name', 'url'}, ...], 'jpeg': [...]}
+
+Until then the field only holds ``{'original': name}`` and serializers keep
+returning the original. Images that never got processed (worker restarts,
+uploads from before the pipeline) are picked up by ``process_images``.
+"""
+import base64
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Variant widths per image kind; originals narrower than a width are never upscaled
+IMAGE_VARIANT_WIDTHS = {
+    'cover': [480, 960, 1600],
+    'avatar': [64, 128, 256, 512],
+    'post': [480, 960, 1440],
+}
+
+# (key, PIL format, extension, save options), smallest first in srcset order
+IMAGE_FORMATS = [
+    ('webp', 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+
+PLACEHOLDER_WIDTH = 16
+
+_pool = None
+
+
+def get_pool():
+    """Worker processes are spawned, not forked, so they don't inherit server threads"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+    return _pool
+
+
+def encode(image, pil_format, options):
+    output = BytesIO()
+    image.save(output, format=pil_format, **options)
+    return output.getvalue()
+
+
+def render_variants(name, kind):
+    """Write the variants of stored image ``name``; runs in a worker process"""
+    with default_storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparency onto white so JPEG variants match the WebP ones
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    base = os.path.splitext(name)[0]
+    result = {'original': name, 'width': image.width, 'height': image.height}
+    for key, _, _, _ in IMAGE_FORMATS:
+        result[key] = []
+
+    for width in sorted({min(width, image.width) for width in IMAGE_VARIANT_WIDTHS[kind]}):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for key, pil_format, extension, options in IMAGE_FORMATS:
+            saved = default_storage.save(
+                f'{base}_{width}w.{extension}', ContentFile(encode(resized, pil_format, options))
+            )
+            result[key].append({'width': width, 'height': height, 'name': saved, 'url': default_storage.url(saved)})
+
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    placeholder = base64.b64encode(encode(tiny, 'JPEG', {'quality': 40})).decode()
+    result['placeholder'] = f'data:image/jpeg;base64,{placeholder}'
+    return result
+
+
+def variant_names(variants):
+    return [variant['name'] for key, _, _, _ in IMAGE_FORMATS for variant in (variants or {}).get(key, [])]
+
+
+def delete_variants(variants, original=False):
+    """Remove the variant files (and optionally the original) described by ``variants``"""
+    names = variant_names(variants)
+    if original and (variants or {}).get('original'):
+        names.append(variants['original'])
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete image {name}: {str(e)}")
+
+
+def record_variants(model, pk, variants_field, result):
+    """Store ``result`` unless the image was replaced while it was rendering"""
+    updated = model.objects.filter(
+        pk=pk, **{f'{variants_field}__original': result['original']}
+    ).update(**{variants_field: result})
+    if not updated:
+        delete_variants(result)
+    return updated
+
+
+def reset_pool():
+    """Drop a broken pool (a worker died) so the next upload starts a fresh one"""
+    global _pool
+    _pool = None
+
+
+def _finish(model, pk, variants_field, name, future):
+    # Runs on the executor's callback thread, which has its own connection
+    try:
+        record_variants(model, pk, variants_field, future.result())
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            reset_pool()
+        logger.error(f"Image processing failed for {model.__name__} {pk} ({name}): {str(e)}")
+    finally:
+        connections.close_all()
+
+
+def process_image(instance, variants_field, kind):
+    """Render variants of the original recorded in ``instance.<variants_field>`` after commit"""
+    name = getattr(instance, variants_field)['original']
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        # The upload itself has succeeded; process_images retries anything missed here
+        try:
+            future = get_pool().submit(render_variants, name, kind)
+        except Exception as e:
+            reset_pool()
+            logger.error(f"Could not queue image processing for {model.__name__} {pk} ({name}): {str(e)}")
+            return
+        future.add_done_callback(partial(_finish, model, pk, variants_field, name))
+
+    transaction.on_commit(submit)
+
+
+def absolute_media_url(url):
+    if url.startswith('http') or url.startswith('data:'):
+        return url
+    backend_url = getattr(settings, 'BACKEND_URL', 'http://localhost:8000')
+    return f"{backend_url}{url}"
+
+
+def image_srcset(variants):
+    """``srcset`` strings and placeholder for serializers, or None until variants exist"""
+    if not variants or not variants.get('jpeg'):
+        return None
+    srcset = {'placeholder': variants['placeholder'], 'width': variants['width'], 'height': variants['height']}
+    for key, _, _, _ in IMAGE_FORMATS:
+        srcset[key] = ', '.join(
+            f"{absolute_media_url(variant['url'])} {variant['width']}w" for variant in variants[key]
+        )
+    srcset['src'] = absolute_media_url(variants['jpeg'][-1]['url'])
+    return srcset
+
+
+def largest_variant_url(variants):
+    """Largest JPEG variant, a bounded-size stand-in for the original"""
+    if variants and variants.get('jpeg'):
+        return absolute_media_url(variants['jpeg'][-1]['url'])
+    return None
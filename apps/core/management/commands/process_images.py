@@ -0,0 +1,72 @@
+# startup_hub/apps/core/management/commands/process_images.py
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from apps.core.images import delete_variants, get_pool, record_variants, render_variants
+from apps.posts.models import PostImage
+from apps.startups.models import Startup
+from apps.users.models import User
+
+# kind -> (model, image field, variants field)
+IMAGE_SOURCES = {
+    'cover': (Startup, 'cover_image', 'cover_image_variants'),
+    'avatar': (User, 'profile_picture', 'profile_picture_variants'),
+    'post': (PostImage, 'image', 'variants'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Render resized variants for uploaded images that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            choices=sorted(IMAGE_SOURCES),
+            help='Process one kind of image only',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render images that already have variants',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the images that would be processed',
+        )
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else sorted(IMAGE_SOURCES)
+        pending = []
+        for kind in kinds:
+            model, image_field, variants_field = IMAGE_SOURCES[kind]
+            for pk, image_name, variants in model.objects.values_list('pk', image_field, variants_field):
+                variants = variants or {}
+                name = variants.get('original') or image_name
+                if not name or (variants.get('jpeg') and not options['force']):
+                    continue
+                pending.append((kind, model, pk, variants_field, name, variants))
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(f'{prefix}{len(pending)} images to process')
+        if options['dry_run']:
+            return
+
+        futures = {}
+        for kind, model, pk, variants_field, name, variants in pending:
+            # Drop forced re-renders' old files; uploads from before the pipeline get their original recorded
+            delete_variants(variants)
+            model.objects.filter(pk=pk).update(**{variants_field: {'original': name}})
+            futures[get_pool().submit(render_variants, name, kind)] = (model, pk, variants_field, name)
+
+        processed = failed = 0
+        for future in as_completed(futures):
+            model, pk, variants_field, name = futures[future]
+            try:
+                processed += record_variants(model, pk, variants_field, future.result())
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'{model.__name__} {pk} ({name}): {str(e)}')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} images, {failed} failed'))
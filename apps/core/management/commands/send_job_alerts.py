@@ -1,11 +1,10 @@
 # startup_hub/apps/core/management/commands/send_job_alerts.py
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.conf import settings
 from datetime import timedelta
+from apps.jobs.alerts import compile_alerts, match_jobs, send_pending_alerts
 from apps.jobs.models import JobAlert, Job
+from apps.notifications.outbox import OUTBOX_CONCURRENCY, process_outbox
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,15 +32,30 @@ class Command(BaseCommand):
         parser.add_argument(
             '--limit',
             type=int,
-            default=100,
-            help='Limit number of alerts to process',
+            help='Limit number of alerts to process (default: every due alert)',
+        )
+        parser.add_argument(
+            '--no-deliver',
+            action='store_true',
+            help='Only queue the emails and leave delivery to the outbox worker',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=OUTBOX_CONCURRENCY,
+            help='Parallel email connections used to deliver the queued alerts',
+        )
+        parser.add_argument(
+            '--rebuild-index',
+            action='store_true',
+            help='Recompile every alert and re-match the jobs posted in the last week before sending',
         )
 
     def handle(self, *args, **options):
         frequency = options.get('frequency')
         dry_run = options.get('dry_run', False)
         user_id = options.get('user_id')
-        limit = options.get('limit', 100)
+        limit = options.get('limit')
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -49,135 +63,37 @@ class Command(BaseCommand):
             )
         )
         
-        # Get alerts that need to be sent
-        alerts_queryset = JobAlert.objects.filter(is_active=True).select_related(
-            'user', 'job_type', 'industry'
-        )
-        
-        if frequency:
-            alerts_queryset = alerts_queryset.filter(frequency=frequency)
-        
-        if user_id:
-            alerts_queryset = alerts_queryset.filter(user_id=user_id)
+        if options.get('rebuild_index'):
+            terms = compile_alerts(JobAlert.objects.all())
+            recent_jobs = list(Job.objects.filter(
+                is_active=True, status='active', posted_at__gte=timezone.now() - timedelta(days=7)
+            ).values_list('id', flat=True))
+            matched = match_jobs(recent_jobs)
+            self.stdout.write(
+                f"Indexed {terms} alert terms; {len(recent_jobs)} recent jobs matched {len(matched)} alerts"
+            )
         
-        alerts_to_process = alerts_queryset[:limit]
+        # Matches are queued as jobs go live; this only sends the digests that are due
+        total_queued, total_errors = send_pending_alerts(
+            frequency=frequency,
+            user_id=user_id,
+            limit=limit,
+            dry_run=dry_run,
+            log=self.stdout.write,
+        )
         
         total_sent = 0
-        total_errors = 0
-        
-        for alert in alerts_to_process:
-            try:
-                if alert.should_send_alert():
-                    matching_jobs = self.get_new_matching_jobs(alert)
-                    
-                    if matching_jobs.exists():
-                        if dry_run:
-                            self.stdout.write(
-                                f"[DRY RUN] Would send alert '{alert.title}' to {alert.user.email} "
-                                f"with {matching_jobs.count()} jobs"
-                            )
-                            total_sent += 1
-                        else:
-                            success = self.send_job_alert(alert, matching_jobs)
-                            if success:
-                                alert.mark_as_sent()
-                                total_sent += 1
-                                self.stdout.write(
-                                    f"Sent alert '{alert.title}' to {alert.user.email} "
-                                    f"with {matching_jobs.count()} jobs"
-                                )
-                            else:
-                                total_errors += 1
-                    else:
-                        self.stdout.write(
-                            f"No new jobs for alert '{alert.title}' ({alert.user.email})"
-                        )
-            except Exception as e:
-                logger.error(f"Error processing alert {alert.id}: {str(e)}")
-                total_errors += 1
-                self.stdout.write(
-                    self.style.ERROR(f"Error processing alert {alert.id}: {str(e)}")
-                )
+        if total_queued and not dry_run and not options.get('no_deliver'):
+            report = process_outbox(concurrency=options['concurrency'])
+            total_sent = report['sent']
+            self.stdout.write(
+                f"Delivered {report['sent']} emails in {report['seconds']}s ({report['per_second']}/s), "
+                f"{report['retrying']} to retry, {report['failed']} failed"
+            )
         
         self.stdout.write(
             self.style.SUCCESS(
                 f"Job alert processing completed. "
-                f"Sent: {total_sent}, Errors: {total_errors}"
+                f"Queued: {total_queued}, Sent: {total_sent}, Errors: {total_errors}"
             )
         )
-
-    def get_new_matching_jobs(self, alert):
-        """Get jobs that match the alert criteria and are new since last sent"""
-        matching_jobs = alert.get_matching_jobs()
-        
-        # For immediate alerts, only include jobs posted since last sent
-        if alert.frequency == 'immediate' and alert.last_sent:
-            matching_jobs = matching_jobs.filter(posted_at__gt=alert.last_sent)
-        
-        # For daily alerts, include jobs from the last day
-        elif alert.frequency == 'daily':
-            cutoff = timezone.now() - timedelta(days=1)
-            if alert.last_sent and alert.last_sent > cutoff:
-                cutoff = alert.last_sent
-            matching_jobs = matching_jobs.filter(posted_at__gte=cutoff)
-        
-        # For weekly alerts, include jobs from the last week
-        elif alert.frequency == 'weekly':
-            cutoff = timezone.now() - timedelta(days=7)
-            if alert.last_sent and alert.last_sent > cutoff:
-                cutoff = alert.last_sent
-            matching_jobs = matching_jobs.filter(posted_at__gte=cutoff)
-        
-        return matching_jobs.distinct()
-
-    def send_job_alert(self, alert, jobs):
-        """Send job alert email to user"""
-        try:
-            # Prepare email context
-            context = {
-                'user': alert.user,
-                'alert': alert,
-                'jobs': jobs[:10],  # Limit to 10 jobs per email
-                'total_jobs': jobs.count(),
-                'unsubscribe_url': self.get_unsubscribe_url(alert),
-                'dashboard_url': f"{settings.FRONTEND_URL}/profile",
-                'site_name': 'StartupHub',
-            }
-            
-            # Render email templates
-            subject = f"New Job Alert: {alert.title} - {jobs.count()} new {'job' if jobs.count() == 1 else 'jobs'}"
-            
-            # Plain text version
-            text_content = render_to_string('emails/job_alert.txt', context)
-            
-            # HTML version
-            html_content = render_to_string('emails/job_alert.html', context)
-            
-            # Create email
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=text_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[alert.user.email],
-                headers={
-                    'List-Unsubscribe': f'<{context["unsubscribe_url"]}>',
-                    'X-Alert-ID': str(alert.id),
-                }
-            )
-            
-            # Attach HTML version
-            email.attach_alternative(html_content, "text/html")
-            
-            # Send email
-            email.send()
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email for alert {alert.id}: {str(e)}")
-            return False
-
-    def get_unsubscribe_url(self, alert):
-        """Generate unsubscribe URL for the alert"""
-        # This would typically include a signed token for security
-        return f"{settings.FRONTEND_URL}/settings/alerts/unsubscribe/{alert.id}"
\ No newline at end of file
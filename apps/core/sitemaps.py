@@ -0,0 +1,191 @@
+# startup_hub/apps/core/sitemaps.py
+"""
+Sharded sitemaps for the public startup, job and post pages.
+
+Each section is split into monthly shards by creation date, so edits to old
+rows only touch the month they were created in and new rows land in the
+current month. A shard with more than ``SITEMAP_SHARD_SIZE`` rows is served
+as several numbered files to stay within the 50,000 URL limit.
+
+The index is built from one ``GROUP BY month`` query per section giving each
+shard's row count and latest ``updated_at`` - its signature. Shard files are
+streamed from ``values_list('pk', 'updated_at')``, gzip-compressed and cached
+under their signature, so a shard is only regenerated after its rows change;
+the signature also serves as the ETag.
+"""
+import gzip
+import hashlib
+import math
+from collections import namedtuple
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.jobs.models import Job
+from apps.posts.models import Post
+from apps.startups.models import Startup
+
+SITEMAP_SHARD_SIZE = 50000
+SITEMAP_INDEX_KEY = 'sitemap:index'
+SITEMAP_SHARD_KEY = 'sitemap:shard:{}:{}'
+SITEMAP_INDEX_TIMEOUT = 15 * 60
+SITEMAP_SHARD_TIMEOUT = 7 * 24 * 60 * 60
+
+# Frontend pages outside the database: (path, changefreq, priority)
+STATIC_PAGES = [
+    ('/', 'daily', '1.0'),
+    ('/jobs', 'daily', '0.9'),
+    ('/startups', 'daily', '0.9'),
+    ('/feed', 'daily', '0.8'),
+    ('/messaging', 'weekly', '0.7'),
+    ('/profile', 'weekly', '0.7'),
+    ('/auth', 'monthly', '0.6'),
+    ('/job-upload', 'weekly', '0.7'),
+    ('/about', 'monthly', '0.5'),
+    ('/privacy', 'monthly', '0.3'),
+    ('/terms', 'monthly', '0.3'),
+]
+
+Section = namedtuple('Section', ['queryset', 'created', 'path', 'changefreq', 'priority'])
+
+SECTIONS = {
+    'startups': Section(lambda: Startup.objects.filter(is_approved=True), 'created_at', '/startups/{}', 'weekly', '0.8'),
+    'jobs': Section(lambda: Job.objects.filter(is_active=True, status='active'), 'posted_at', '/jobs/{}', 'daily', '0.8'),
+    'posts': Section(lambda: Post.objects.filter(is_approved=True, is_draft=False), 'created_at', '/posts/{}', 'weekly', '0.6'),
+}
+
+Shard = namedtuple('Shard', ['name', 'section', 'month', 'page', 'count', 'lastmod', 'etag'])
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def base_url():
+    return getattr(settings, 'SITEMAP_BASE_URL', 'https://startlinker.com').rstrip('/')
+
+
+def signature(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def shard_name(section, month, page):
+    name = f'{section}-{month:%Y-%m}'
+    return f'{name}-{page}' if page > 1 else name
+
+
+def month_shards(section):
+    """Signatures of a section's monthly shards from a single grouped query"""
+    months = SECTIONS[section].queryset().annotate(
+        month=TruncMonth(SECTIONS[section].created)
+    ).order_by().values('month').annotate(
+        count=Count('pk'), lastmod=Max('updated_at')
+    ).order_by('month')
+
+    shards = []
+    for row in months:
+        month = timezone.localtime(row['month'])
+        for page in range(1, math.ceil(row['count'] / SITEMAP_SHARD_SIZE) + 1):
+            shards.append(Shard(
+                name=shard_name(section, month, page),
+                section=section,
+                month=month.date().isoformat(),
+                page=page,
+                count=min(SITEMAP_SHARD_SIZE, row['count'] - (page - 1) * SITEMAP_SHARD_SIZE),
+                lastmod=row['lastmod'],
+                etag=signature(section, month.date(), page, row['count'], row['lastmod'].isoformat()),
+            ))
+    return shards
+
+
+def build_index():
+    """``{'shards': {name: Shard}, 'lastmod', 'etag', 'body', 'gzip_body'}`` for the sitemap index"""
+    today = timezone.localdate()
+    pages = Shard(
+        name='pages', section='pages', month=None, page=1, count=len(STATIC_PAGES),
+        lastmod=timezone.make_aware(datetime.combine(today, datetime.min.time())),
+        etag=signature('pages', today, len(STATIC_PAGES)),
+    )
+    shards = [pages]
+    for section in SECTIONS:
+        shards.extend(month_shards(section))
+
+    root = base_url()
+    lines = [XML_HEADER, f'<sitemapindex xmlns="{SITEMAP_NS}">\n']
+    for shard in shards:
+        lines.append(
+            f'  <sitemap><loc>{root}/sitemap-{shard.name}.xml.gz</loc>'
+            f'<lastmod>{shard.lastmod.isoformat()}</lastmod></sitemap>\n'
+        )
+    lines.append('</sitemapindex>\n')
+    body = ''.join(lines).encode()
+
+    return {
+        'shards': {shard.name: shard for shard in shards},
+        'lastmod': max(shard.lastmod for shard in shards),
+        'etag': signature(*(shard.etag for shard in shards)),
+        'body': body,
+        'gzip_body': gzip.compress(body, mtime=0),
+    }
+
+
+def get_index():
+    index = cache.get(SITEMAP_INDEX_KEY)
+    if index is None:
+        index = build_index()
+        cache.set(SITEMAP_INDEX_KEY, index, SITEMAP_INDEX_TIMEOUT)
+    return index
+
+
+def shard_urls(shard):
+    """``(path, lastmod, changefreq, priority)`` for every URL in the shard, streamed from the database"""
+    if shard.section == 'pages':
+        lastmod = shard.lastmod.date().isoformat()
+        for path, changefreq, priority in STATIC_PAGES:
+            yield path, lastmod, changefreq, priority
+        return
+
+    section = SECTIONS[shard.section]
+    start = timezone.make_aware(datetime.fromisoformat(shard.month))
+    end = timezone.make_aware(datetime(start.year + start.month // 12, start.month % 12 + 1, 1))
+    offset = (shard.page - 1) * SITEMAP_SHARD_SIZE
+    rows = section.queryset().filter(**{
+        f'{section.created}__gte': start, f'{section.created}__lt': end
+    }).order_by(section.created, 'pk').values_list('pk', 'updated_at')[offset:offset + SITEMAP_SHARD_SIZE]
+    for pk, updated_at in rows.iterator(chunk_size=2000):
+        yield section.path.format(pk), updated_at.isoformat(), section.changefreq, section.priority
+
+
+def render_shard(shard):
+    """Gzipped ``urlset`` document for the shard"""
+    root = base_url()
+    output = BytesIO()
+    with gzip.GzipFile(fileobj=output, mode='wb', mtime=0) as compressed:
+        compressed.write(f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">\n'.encode())
+        for path, lastmod, changefreq, priority in shard_urls(shard):
+            compressed.write(
+                f'  <url><loc>{escape(root + path)}</loc><lastmod>{lastmod}</lastmod>'
+                f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n'.encode()
+            )
+        compressed.write(b'</urlset>\n')
+    return output.getvalue()
+
+
+def get_shard(name):
+    """Shard from the index by file name, or None"""
+    return get_index()['shards'].get(name)
+
+
+def shard_body(shard):
+    """Gzipped shard, rendered only when its rows changed since it was last cached"""
+    key = SITEMAP_SHARD_KEY.format(shard.name, shard.etag)
+    body = cache.get(key)
+    if body is None:
+        body = render_shard(shard)
+        cache.set(key, body, SITEMAP_SHARD_TIMEOUT)
+    return body
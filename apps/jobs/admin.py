@@ -113,7 +113,7 @@ class JobAdmin(admin.ModelAdmin):
     
     def deactivate_jobs(self, request, queryset):
         """Deactivate selected jobs"""
-        updated = queryset.update(is_active=False, status='paused')
+        updated = queryset.update(is_active=False, status='paused', updated_at=timezone.now())
         messages.success(request, f'{updated} job(s) deactivated.')
     deactivate_jobs.short_description = "Deactivate selected jobs"
     
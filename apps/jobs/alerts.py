@@ -0,0 +1,252 @@
+# startup_hub/apps/jobs/alerts.py
+"""
+Reverse-matching job alerts.
+
+Instead of running every alert's search over all jobs, each active alert is
+compiled into ``JobAlertTerm`` rows - an inverted index of its keywords,
+location, job type, experience level, industry and remote flag, each row
+carrying the number of criteria the alert has. When a job goes live or
+changes, its own terms (word n-grams of its title, description, skills and
+startup name; location n-grams; type, level and industry) are looked up in
+the index once: an alert matches when every one of its criteria has a hit.
+The cost follows the number of jobs posted, not alerts x jobs.
+
+Matches are queued as ``JobAlertMatch`` rows. Immediate alerts are sent as
+soon as their job is matched; daily and weekly ones are collected into a
+digest by ``send_job_alert_digests``. Digests are rendered from templates
+compiled once per run and queued in the email outbox
+(``apps.notifications.outbox``), which delivers them in pooled batches.
+
+Keywords and locations match whole words and phrases (up to
+``MAX_PHRASE_WORDS`` words) rather than arbitrary substrings.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from apps.notifications.outbox import enqueue, outbox_email
+
+from .models import Job, JobAlert, JobAlertMatch, JobAlertTerm
+
+logger = logging.getLogger(__name__)
+
+MAX_PHRASE_WORDS = 3
+MAX_DESCRIPTION_WORDS = 5000
+DIGEST_JOB_LIMIT = 10
+
+# Job fields that change which alerts match
+ALERT_JOB_FIELDS = {
+    'title', 'description', 'location', 'job_type', 'experience_level', 'is_remote',
+    'startup', 'status', 'is_active',
+}
+
+
+def tokens(text):
+    """Lowercase words, keeping the symbols of names like c++, c# and node.js"""
+    return re.findall(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*', (text or '').lower())
+
+
+def phrase(text):
+    return ' '.join(tokens(text))[:100]
+
+
+def ngrams(words, size=MAX_PHRASE_WORDS):
+    return {' '.join(words[i:i + n]) for n in range(1, size + 1) for i in range(len(words) - n + 1)}
+
+
+def alert_criteria(alert):
+    """``{field: set of values}``; an alert matches a job that hits at least one value per field"""
+    criteria = {}
+    keywords = {phrase(keyword) for keyword in alert.keywords.split(',')} - {''}
+    if keywords:
+        criteria['keyword'] = keywords
+    if phrase(alert.location):
+        criteria['location'] = {phrase(alert.location)}
+    if alert.job_type_id:
+        criteria['job_type'] = {str(alert.job_type_id)}
+    if alert.experience_level:
+        criteria['experience'] = {alert.experience_level}
+    if alert.industry_id:
+        criteria['industry'] = {str(alert.industry_id)}
+    if alert.is_remote:
+        criteria['remote'] = {''}
+    # Alerts without criteria match every job
+    return criteria or {'any': {''}}
+
+
+def compile_alerts(alerts):
+    """Replace the index entries of ``alerts``; inactive alerts are left out of the index"""
+    alerts = list(alerts)
+    JobAlertTerm.objects.filter(alert__in=alerts).delete()
+    terms = []
+    for alert in alerts:
+        if not alert.is_active:
+            continue
+        criteria = alert_criteria(alert)
+        terms.extend(
+            JobAlertTerm(alert=alert, field=field, value=value, required=len(criteria))
+            for field, values in criteria.items()
+            for value in values
+        )
+    JobAlertTerm.objects.bulk_create(terms, batch_size=1000)
+    return len(terms)
+
+
+def job_terms(job):
+    """Index lookup for ``job``: a Q over ``JobAlertTerm`` of every criterion value it satisfies"""
+    keyword_words = [
+        tokens(job.title),
+        tokens(job.description)[:MAX_DESCRIPTION_WORDS],
+        tokens(job.startup.name if job.startup else ''),
+    ]
+    keyword_words.extend(tokens(skill) for skill in job.skills.values_list('skill', flat=True))
+    keywords = set().union(*(ngrams(words) for words in keyword_words))
+
+    terms = Q(field='any') | Q(field='keyword', value__in=keywords)
+    if job.is_remote:
+        # Remote jobs count for every location, as in JobAlert.get_matching_jobs
+        terms |= Q(field='location') | Q(field='remote')
+    else:
+        location = tokens(job.location)
+        terms |= Q(field='location', value__in=ngrams(location, size=len(location)))
+    terms |= Q(field='job_type', value=str(job.job_type_id))
+    if job.experience_level:
+        terms |= Q(field='experience', value=job.experience_level)
+    if job.startup and job.startup.industry_id:
+        terms |= Q(field='industry', value=str(job.startup.industry_id))
+    return terms
+
+
+def matching_alert_ids(job):
+    """Ids of active alerts whose every criterion the job satisfies, in one grouped query"""
+    return set(
+        JobAlertTerm.objects.filter(job_terms(job)).values('alert_id', 'required').annotate(
+            matched=Count('field', distinct=True)
+        ).filter(matched=F('required')).values_list('alert_id', flat=True)
+    )
+
+
+def match_jobs(job_ids):
+    """Queue alert matches for jobs that went live or changed; returns ids of alerts with new matches"""
+    new_alert_ids = set()
+    for job in Job.objects.filter(id__in=job_ids).select_related('startup'):
+        pending = JobAlertMatch.objects.filter(job=job, sent_at__isnull=True)
+        if not (job.is_active and job.status == 'active'):
+            pending.delete()
+            continue
+
+        alert_ids = matching_alert_ids(job)
+        # Edits can make a job stop matching before its digest goes out
+        pending.exclude(alert_id__in=alert_ids).delete()
+        already = set(JobAlertMatch.objects.filter(job=job, alert_id__in=alert_ids).values_list('alert_id', flat=True))
+        JobAlertMatch.objects.bulk_create(
+            [JobAlertMatch(alert_id=alert_id, job=job) for alert_id in alert_ids - already],
+            ignore_conflicts=True,
+        )
+        new_alert_ids |= alert_ids - already
+    return new_alert_ids
+
+
+def frontend_url():
+    return getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
+
+
+def unsubscribe_url(alert):
+    # This would typically include a signed token for security
+    return f"{frontend_url()}/settings/alerts/unsubscribe/{alert.id}"
+
+
+def digest_templates():
+    """Compiled text and HTML digest templates, loaded once per sending run"""
+    return get_template('emails/job_alert.txt'), get_template('emails/job_alert.html')
+
+
+def alert_email(alert, jobs, total_jobs, templates):
+    """Outbox email with the digest of ``jobs`` for ``alert``"""
+    text_template, html_template = templates
+    context = {
+        'user': alert.user,
+        'alert': alert,
+        'jobs': jobs,
+        'total_jobs': total_jobs,
+        'unsubscribe_url': unsubscribe_url(alert),
+        'dashboard_url': f"{frontend_url()}/profile",
+        'site_name': 'StartupHub',
+    }
+    return outbox_email(
+        to=alert.user.email,
+        subject=f"New Job Alert: {alert.title} - {total_jobs} new {'job' if total_jobs == 1 else 'jobs'}",
+        body=text_template.render(context),
+        html_body=html_template.render(context),
+        headers={
+            'List-Unsubscribe': f'<{context["unsubscribe_url"]}>',
+            'X-Alert-ID': str(alert.id),
+        },
+        category='job_alert',
+    )
+
+
+def send_pending_alerts(frequency=None, alert_ids=None, user_id=None, limit=None, dry_run=False, log=None):
+    """
+    Queue a digest in the email outbox for every due alert with queued matches
+    and mark those matches sent; returns ``(queued, errors)``. The outbox
+    worker delivers them.
+    """
+    alerts = JobAlert.objects.filter(
+        is_active=True, matches__sent_at__isnull=True
+    ).distinct().select_related('user').order_by('id')
+    if frequency:
+        alerts = alerts.filter(frequency=frequency)
+    if alert_ids is not None:
+        alerts = alerts.filter(id__in=alert_ids)
+    if user_id:
+        alerts = alerts.filter(user_id=user_id)
+    if limit:
+        alerts = alerts[:limit]
+
+    templates = None if dry_run else digest_templates()
+    queued = errors = 0
+    emails, sent_alert_ids, sent_match_ids = [], [], []
+    for alert in alerts:
+        if not alert.should_send_alert():
+            continue
+        matches = list(
+            alert.matches.filter(
+                sent_at__isnull=True, job__is_active=True, job__status='active'
+            ).select_related('job__startup', 'job__job_type').order_by('-job__posted_at')
+        )
+        if not matches:
+            continue
+        jobs = [match.job for match in matches]
+
+        if dry_run:
+            if log:
+                log(f"[DRY RUN] Would send alert '{alert.title}' to {alert.user.email} with {len(jobs)} jobs")
+            queued += 1
+            continue
+
+        try:
+            emails.append(alert_email(alert, jobs[:DIGEST_JOB_LIMIT], len(jobs), templates))
+        except Exception as e:
+            logger.error(f"Failed to render email for alert {alert.id}: {str(e)}")
+            errors += 1
+            continue
+        sent_alert_ids.append(alert.id)
+        sent_match_ids.extend(match.id for match in matches)
+        queued += 1
+        if log:
+            log(f"Queued alert '{alert.title}' to {alert.user.email} with {len(jobs)} jobs")
+
+    if emails:
+        with transaction.atomic():
+            enqueue(emails)
+            now = timezone.now()
+            JobAlertMatch.objects.filter(id__in=sent_match_ids).update(sent_at=now)
+            # A queryset update, so the alerts are not recompiled by their post_save receiver
+            JobAlert.objects.filter(id__in=sent_alert_ids).update(last_sent=now, total_sent=F('total_sent') + 1)
+    return queued, errors
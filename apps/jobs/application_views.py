@@ -4,10 +4,32 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from apps.core.bulk import MAX_BULK_IDS, bulk_results, parse_ids
+from apps.core.exports import export_response, parse_updated_since
 from .models import Job, JobApplication
 from .serializers import JobApplicationDetailSerializer
 
+# (column, lookup) pairs streamed by the application export
+APPLICATION_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('job_id', 'job_id'),
+    ('job_title', 'job__title'),
+    ('startup', 'job__startup__name'),
+    ('applicant_id', 'user_id'),
+    ('applicant_username', 'user__username'),
+    ('applicant_email', 'user__email'),
+    ('applicant_first_name', 'user__first_name'),
+    ('applicant_last_name', 'user__last_name'),
+    ('status', 'status'),
+    ('applied_at', 'applied_at'),
+    ('updated_at', 'updated_at'),
+    ('reviewed_by', 'reviewed_by__username'),
+    ('reviewed_at', 'reviewed_at'),
+    ('interview_scheduled_at', 'interview_scheduled_at'),
+]
 
 class ApplicationPagination(PageNumberPagination):
     page_size = 10
@@ -142,8 +164,8 @@ def my_job_applications_summary(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def bulk_update_applications(request):
-    """Bulk update multiple applications"""
-    application_ids = request.data.get('application_ids', [])
+    """Bulk update multiple applications in one statement, reporting the outcome per id"""
+    application_ids, invalid_ids = parse_ids(request.data.get('application_ids', []))
     status_update = request.data.get('status')
     review_notes = request.data.get('review_notes', '')
     
@@ -152,32 +174,71 @@ def bulk_update_applications(request):
             'error': 'application_ids and status are required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Get applications that belong to user's jobs
-    applications = JobApplication.objects.filter(
-        id__in=application_ids,
-        job__posted_by=request.user
-    )
+    if status_update not in dict(JobApplication.STATUS_CHOICES):
+        return Response({
+            'error': 'Invalid status'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    if not applications.exists():
+    if len(application_ids) > MAX_BULK_IDS:
         return Response({
-            'error': 'No valid applications found'
-        }, status=status.HTTP_404_NOT_FOUND)
+            'error': f'At most {MAX_BULK_IDS} applications per request'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Update applications
-    from django.utils import timezone
-    updated_count = applications.update(
-        status=status_update,
-        review_notes=review_notes,
-        reviewed_by=request.user,
-        reviewed_at=timezone.now()
-    )
+    with transaction.atomic():
+        # Applications that belong to user's jobs; others are reported as not found
+        current = set(JobApplication.objects.select_for_update().filter(
+            id__in=application_ids,
+            job__posted_by=request.user
+        ).values_list('id', flat=True))
+        
+        if not current:
+            return Response({
+                'error': 'No valid applications found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        # Update applications
+        JobApplication.objects.filter(id__in=current).update(
+            status=status_update,
+            review_notes=review_notes,
+            reviewed_by=request.user,
+            reviewed_at=timezone.now()
+        )
     
     return Response({
-        'message': f'Successfully updated {updated_count} applications',
-        'updated_count': updated_count
+        'message': f'Successfully updated {len(current)} applications',
+        'updated_count': len(current),
+        'results': bulk_results(application_ids, invalid_ids, current, current, status_update)
     })
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_applications(request, export_format):
+    """Stream applications as NDJSON or CSV: every application for admins, the user's own jobs' otherwise"""
+    try:
+        updated_since = parse_updated_since(request.GET.get('updated_since'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    applications = JobApplication.objects.all()
+    if not (request.user.is_staff or request.user.is_superuser):
+        applications = applications.filter(job__posted_by=request.user)
+    
+    job_id = request.GET.get('job')
+    if job_id:
+        # Validated up front: errors can't be reported once the stream has started
+        if not job_id.isdigit():
+            return Response({'error': 'Invalid job'}, status=status.HTTP_400_BAD_REQUEST)
+        applications = applications.filter(job_id=job_id)
+    status_filter = request.GET.get('status')
+    if status_filter:
+        applications = applications.filter(status=status_filter)
+    if updated_since:
+        applications = applications.filter(updated_at__gte=updated_since)
+    
+    return export_response(applications, APPLICATION_EXPORT_COLUMNS, export_format, 'applications')
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def application_statistics(request, job_id):
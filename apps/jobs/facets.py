@@ -0,0 +1,178 @@
+# startup_hub/apps/jobs/facets.py
+"""
+Facet counts for the job board filters.
+
+The matched set - live jobs passing the search text and the non-facet
+filters - is grouped once by job type, experience level, remote flag and
+industry. Each facet is then counted from those groups in Python, honouring
+every applied facet filter except its own, so an option shows how many
+results selecting it would give. One grouped query replaces a count query
+per option.
+
+Results are cached per normalized query (search text with case and spacing
+folded, parameters sorted) under a generation that is bumped
+(``invalidate_facets``) when jobs, their skills or their startups change.
+Changes made with queryset updates outside the bulk admin action show up
+after ``FACET_CACHE_TIMEOUT``.
+"""
+import hashlib
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Job
+from .search import filter_jobs, normalize_query, to_int
+
+FACET_GENERATION_KEY = 'jobs:facets:generation'
+FACET_RESULT_KEY = 'jobs:facets:result:{}:{}'
+FACET_OPTIONS_KEY = 'jobs:facets:options:{}'
+FACET_CACHE_TIMEOUT = 10 * 60
+
+# Job fields that change facet counts or options; saves touching only other fields keep the cache
+FACET_FIELDS = {
+    'job_type', 'experience_level', 'is_remote', 'is_urgent', 'startup', 'status', 'is_active',
+    'title', 'description', 'requirements', 'location', 'posted_at',
+}
+
+# Facets counted over the matched set, and every parameter that changes it
+FACET_PARAMS = ['job_type', 'experience_level', 'is_remote', 'industry']
+FILTER_PARAMS = FACET_PARAMS + ['search', 'location', 'is_urgent', 'min_employees', 'max_employees', 'posted_since']
+
+POPULAR_SKILL_LIMIT = 20
+
+
+def generation():
+    value = cache.get(FACET_GENERATION_KEY)
+    if value is None:
+        # Start from the clock so a lost key never revives an older generation
+        cache.add(FACET_GENERATION_KEY, int(time.time()), None)
+        value = cache.get(FACET_GENERATION_KEY)
+    return value
+
+
+def invalidate_facets():
+    try:
+        cache.incr(FACET_GENERATION_KEY)
+    except ValueError:
+        cache.set(FACET_GENERATION_KEY, int(time.time()), None)
+
+
+def normalized_params(params):
+    """Sorted ``(name, value)`` pairs of the parameters that change the facets"""
+    applied = []
+    for name in FILTER_PARAMS:
+        value = params.get(name, '')
+        value = normalize_query(value) if name in ('search', 'location') else value.strip()
+        if value:
+            applied.append((name, value))
+    return sorted(applied)
+
+
+def parse_facet_filters(params):
+    """Map each applied facet to a predicate over a grouped row"""
+    filters = {}
+
+    job_type = to_int(params.get('job_type'))
+    if job_type is not None:
+        filters['job_type'] = lambda row: row['job_type_id'] == job_type
+
+    experience_level = params.get('experience_level')
+    if experience_level:
+        filters['experience_level'] = lambda row: row['experience_level'] == experience_level
+
+    is_remote = params.get('is_remote')
+    if is_remote in ('true', 'false'):
+        remote = is_remote == 'true'
+        filters['is_remote'] = lambda row: row['is_remote'] == remote
+
+    industry = to_int(params.get('industry'))
+    if industry is not None:
+        filters['industry'] = lambda row: row['startup__industry_id'] == industry
+
+    return filters
+
+
+def compute_facets(params):
+    matched = params.copy()
+    for name in FACET_PARAMS:
+        matched.pop(name, None)
+    groups = filter_jobs(Job.objects.filter(is_active=True, status='active'), matched).order_by().values(
+        'job_type_id', 'job_type__name', 'experience_level', 'is_remote',
+        'startup__industry_id', 'startup__industry__name',
+    ).annotate(count=Count('id'))
+
+    filters = parse_facet_filters(params)
+    total = 0
+    job_types, levels, remote, industries = Counter(), Counter(), Counter(), Counter()
+    names = {}
+    for row in groups:
+        failed = None
+        for name, passes in filters.items():
+            if not passes(row):
+                if failed is not None:
+                    break
+                failed = name
+        else:
+            count = row['count']
+            if failed is None:
+                total += count
+            if failed in (None, 'job_type'):
+                job_types[row['job_type_id']] += count
+                names[('job_type', row['job_type_id'])] = row['job_type__name']
+            if failed in (None, 'experience_level'):
+                levels[row['experience_level']] += count
+            if failed in (None, 'is_remote'):
+                remote[row['is_remote']] += count
+            if failed in (None, 'industry') and row['startup__industry_id']:
+                industries[row['startup__industry_id']] += count
+                names[('industry', row['startup__industry_id'])] = row['startup__industry__name']
+
+    return {
+        'total': total,
+        'job_types': sorted(
+            ({'id': pk, 'name': names[('job_type', pk)], 'job_count': count} for pk, count in job_types.items() if count),
+            key=lambda item: item['name'],
+        ),
+        'experience_levels': [
+            {'value': value, 'label': label, 'count': levels[value]}
+            for value, label in Job.EXPERIENCE_CHOICES if levels[value]
+        ],
+        'industries': sorted(
+            ({'id': pk, 'name': names[('industry', pk)], 'job_count': count} for pk, count in industries.items() if count),
+            key=lambda item: item['name'],
+        ),
+        'remote': {'remote': remote[True], 'on_site': remote[False]},
+    }
+
+
+def get_facets(params):
+    """Facets for the given query parameters, cached per normalized query"""
+    digest = hashlib.md5(repr(normalized_params(params)).encode()).hexdigest()
+    key = FACET_RESULT_KEY.format(generation(), digest)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(params)
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
+
+
+def get_filter_options():
+    """Popular skills and locations of the live jobs, the same for every query"""
+    key = FACET_OPTIONS_KEY.format(generation())
+    options = cache.get(key)
+    if options is None:
+        live = Job.objects.filter(is_active=True, status='active')
+        popular_skills = live.exclude(skills__skill__isnull=True).order_by().values('skills__skill').annotate(
+            count=Count('id')
+        ).order_by('-count')[:POPULAR_SKILL_LIMIT]
+        options = {
+            'popular_skills': [item['skills__skill'] for item in popular_skills if item['skills__skill']],
+            'locations': [
+                location for location in live.values_list('location', flat=True).distinct().order_by('location')
+                if location
+            ],
+        }
+        cache.set(key, options, FACET_CACHE_TIMEOUT)
+    return options
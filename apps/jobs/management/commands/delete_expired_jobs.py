@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import Q
+from apps.jobs.facets import invalidate_facets
 from apps.jobs.models import Job, JobBookmark
 import logging
 
@@ -75,6 +76,7 @@ class Command(BaseCommand):
                     status='expired',
                     is_active=False
                 )
+                invalidate_facets()
                 
                 # Remove bookmarks for expired jobs
                 JobBookmark.objects.filter(job_id__in=job_ids).delete()
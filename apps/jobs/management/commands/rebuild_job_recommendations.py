@@ -0,0 +1,38 @@
+# startup_hub/apps/jobs/management/commands/rebuild_job_recommendations.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.recommendations import rebuild_recommendations, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute job skill vectors and the cached job recommendation lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            help='Only refresh the list of this user (repeatable); job vectors are left as they are',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jobs or users processed per batch',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['user_id']:
+            refreshed = refresh_recommendations(options['user_id'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Refreshed {refreshed} recommendation lists in {time.perf_counter() - started:.1f}s'
+            ))
+            return
+
+        jobs, users = rebuild_recommendations(batch_size=options['batch_size'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f'Vectorized {jobs} jobs and refreshed {users} recommendation lists in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,31 @@
+# startup_hub/apps/jobs/management/commands/rebuild_job_search_index.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.facets import invalidate_facets
+from apps.jobs.models import Job
+from apps.jobs.search import search_enabled, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vectors of jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Jobs updated per statement',
+        )
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            raise CommandError('Full-text search needs PostgreSQL; this database uses the icontains fallback')
+
+        job_ids = list(Job.objects.order_by('id').values_list('id', flat=True))
+        batch_size = options['batch_size']
+        updated = 0
+        for start in range(0, len(job_ids), batch_size):
+            updated += update_search_vectors(job_ids[start:start + batch_size])
+        invalidate_facets()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search vectors for {updated} jobs'))
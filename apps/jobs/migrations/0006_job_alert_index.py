@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_job_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobAlertTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20)),
+                ('value', models.CharField(blank=True, max_length=100)),
+                ('required', models.PositiveSmallIntegerField()),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='jobs.jobalert')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'value'], name='jobs_alert_term_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobAlertMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matched_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.jobalert')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_matches', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['alert', 'sent_at'], name='jobs_alert_match_sent_idx')],
+                'unique_together': {('alert', 'job')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_profile_picture_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0006_job_alert_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRecommendationList',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='job_recommendations', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('jobs', models.JSONField(default=list)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserJobVectorTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(max_length=60)),
+                ('weight', models.FloatField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_vector_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['feature'], name='jobs_user_vector_term_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobVectorTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(max_length=60)),
+                ('weight', models.FloatField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vector_terms', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['feature'], name='jobs_vector_term_idx')],
+            },
+        ),
+    ]
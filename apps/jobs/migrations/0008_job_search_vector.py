@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+class PostgresAddIndex(migrations.AddIndex):
+    """GIN indexes only exist on PostgreSQL; other backends just record the state"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def build_search_vectors(apps, schema_editor):
+    """Same document as search.job_search_vector, built for every job"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Job = apps.get_model('jobs', 'Job')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+    Startup = apps.get_model('startups', 'Startup')
+
+    def text(subquery):
+        return Coalesce(Subquery(subquery), Value(''), output_field=TextField())
+
+    skills = text(
+        JobSkill.objects.filter(job=OuterRef('pk')).order_by().values('job').annotate(
+            text=StringAgg('skill', ' ')
+        ).values('text')
+    )
+    startup_name = text(Startup.objects.filter(pk=OuterRef('startup_id')).values('name'))
+    industry_name = text(Startup.objects.filter(pk=OuterRef('startup_id')).values('industry__name'))
+
+    Job.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector(skills, startup_name, weight='B', config='english')
+        + SearchVector('description', 'requirements', weight='C', config='english')
+        + SearchVector('location', industry_name, weight='D', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0004_startup_search_vector'),
+        ('jobs', '0007_job_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(build_search_vectors, migrations.RunPython.noop),
+        PostgresAddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='jobs_job_search_gin'),
+        ),
+    ]
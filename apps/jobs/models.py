@@ -2,6 +2,8 @@
 
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from datetime import timedelta
@@ -75,7 +77,10 @@ class Job(models.Model):
     requirements = models.TextField(blank=True, help_text="Job requirements in detail")
     benefits = models.TextField(blank=True, help_text="Benefits and perks")
     job_link = models.URLField(blank=True, max_length=500, help_text="External application link for the job")
-    
+
+    # Weighted full-text document with skill and startup names, maintained by search.py (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ['-posted_at']
         indexes = [
@@ -84,6 +89,7 @@ class Job(models.Model):
             models.Index(fields=['startup', 'is_active']),
             models.Index(fields=['status', 'posted_at']),
             models.Index(fields=['posted_by', 'status']),
+            GinIndex(fields=['search_vector'], name='jobs_job_search_gin'),
         ]
     
     def __str__(self):
@@ -144,7 +150,7 @@ class Job(models.Model):
         self.is_active = True
         self.approved_by = approved_by_user
         self.approved_at = timezone.now()
-        self.save(update_fields=['status', 'is_active', 'approved_by', 'approved_at'])
+        self.save(update_fields=['status', 'is_active', 'approved_by', 'approved_at', 'updated_at'])
     
     def reject(self, rejected_by_user, reason=''):
         """Reject the job posting"""
@@ -153,7 +159,7 @@ class Job(models.Model):
         self.approved_by = rejected_by_user
         self.approved_at = timezone.now()
         self.rejection_reason = reason
-        self.save(update_fields=['status', 'is_active', 'approved_by', 'approved_at', 'rejection_reason'])
+        self.save(update_fields=['status', 'is_active', 'approved_by', 'approved_at', 'rejection_reason', 'updated_at'])
     
     def can_user_edit(self, user):
         """Check if a specific user can edit this job"""
@@ -182,7 +188,7 @@ class Job(models.Model):
             self.rejection_reason = ''
             self.save(update_fields=[
                 'status', 'is_active', 'approved_by', 
-                'approved_at', 'rejection_reason'
+                'approved_at', 'rejection_reason', 'updated_at'
             ])
     
     def can_user_delete(self, user):
@@ -205,7 +211,7 @@ class Job(models.Model):
         if self.is_expired and self.status in ['active', 'pending']:
             self.status = 'expired'
             self.is_active = False
-            self.save(update_fields=['status', 'is_active'])
+            self.save(update_fields=['status', 'is_active', 'updated_at'])
             return True
         return False
     
@@ -507,6 +513,76 @@ class JobAlert(models.Model):
         self.total_sent += 1
         self.save(update_fields=['last_sent', 'total_sent'])
 
+class JobAlertTerm(models.Model):
+    """Inverted index entry: one criterion value of an active job alert"""
+    alert = models.ForeignKey(JobAlert, on_delete=models.CASCADE, related_name='terms')
+    field = models.CharField(max_length=20)
+    value = models.CharField(max_length=100, blank=True)
+    # Number of criteria the alert has; a job has to satisfy all of them
+    required = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['field', 'value'], name='jobs_alert_term_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.alert_id}: {self.field}={self.value}"
+
+class JobAlertMatch(models.Model):
+    """A job matching an alert, queued until the alert's next digest"""
+    alert = models.ForeignKey(JobAlert, on_delete=models.CASCADE, related_name='matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='alert_matches')
+    matched_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        unique_together = ['alert', 'job']
+        indexes = [
+            models.Index(fields=['alert', 'sent_at'], name='jobs_alert_match_sent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Alert {self.alert_id} -> job {self.job_id}"
+
+class JobVectorTerm(models.Model):
+    """One weighted feature (skill, title word, industry...) of a live job's recommendation vector"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='vector_terms')
+    feature = models.CharField(max_length=60)
+    weight = models.FloatField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['feature'], name='jobs_vector_term_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id}: {self.feature}={self.weight:.3f}"
+
+class UserJobVectorTerm(models.Model):
+    """One weighted feature of a user's job preferences, built from their activity"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_vector_terms')
+    feature = models.CharField(max_length=60)
+    weight = models.FloatField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['feature'], name='jobs_user_vector_term_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.feature}={self.weight:.3f}"
+
+class JobRecommendationList(models.Model):
+    """A user's precomputed top recommended jobs, best first"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='job_recommendations')
+    # [[job_id, score], ...]
+    jobs = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{len(self.jobs)} recommended jobs for user {self.user_id}"
+
 class JobView(models.Model):
     """Track job views for analytics"""
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='job_views')
@@ -0,0 +1,244 @@
+# startup_hub/apps/jobs/recommendations.py
+"""
+Skill-vector job recommendations.
+
+Every live job has a sparse, L2-normalized vector of weighted features - its
+skills (``skill:python``), title words (``title:backend``), startup industry
+(``industry:4``), experience level and job type - stored as ``JobVectorTerm``
+rows. A user's vector is the sum of the vectors of the jobs they applied to
+or bookmarked, plus their profile interests and the industries of the
+startups they liked or bookmarked, kept as ``UserJobVectorTerm`` rows.
+
+A user's top ``RECOMMENDATION_LIST_SIZE`` jobs by cosine similarity are
+scored in one grouped query over the job terms sharing their features and
+cached in ``JobRecommendationList``. The list is refreshed when the user's
+own activity changes, and a job that goes live or changes is scored once
+against the user terms and merged into the lists of the users it fits, so
+nothing is recomputed for everyone. ``rebuild_job_recommendations`` redoes it
+all nightly and drops listed jobs whose score fell since.
+"""
+import math
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+
+from apps.startups.models import Industry, StartupBookmark, StartupLike
+from apps.users.models import UserInterest
+
+from .alerts import phrase, tokens
+from .models import (
+    Job, JobApplication, JobBookmark, JobRecommendationList, JobSkill, JobVectorTerm, UserJobVectorTerm,
+)
+
+RECOMMENDATION_LIST_SIZE = 100
+MIN_SCORE = 0.05
+MAX_USER_FEATURES = 60
+# Most recent applications, bookmarks and startups considered per user
+MAX_USER_ITEMS = 50
+
+FEATURE_WEIGHTS = {
+    'skill': 1.0,
+    'optional_skill': 0.5,
+    'title': 0.6,
+    'industry': 0.8,
+    'level': 0.3,
+    'type': 0.2,
+}
+
+# How much each kind of user activity counts towards their vector
+SIGNAL_WEIGHTS = {
+    'application': 1.0,
+    'bookmark': 0.7,
+    'interest': 1.0,
+    'startup': 0.4,
+}
+
+TITLE_STOPWORDS = {
+    'a', 'an', 'and', 'at', 'for', 'in', 'of', 'or', 'the', 'to', 'with',
+    'senior', 'junior', 'sr', 'jr', 'lead', 'intern', 'm', 'f', 'd',
+}
+
+
+def normalized(vector):
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {feature: weight / norm for feature, weight in vector.items()} if norm else {}
+
+
+def text_features(text, weight):
+    return {f'title:{word[:50]}': weight for word in set(tokens(text)) - TITLE_STOPWORDS}
+
+
+def job_vector(job, skills):
+    """Normalized ``{feature: weight}`` of a job; ``skills`` are its ``(skill, is_required)`` pairs"""
+    vector = Counter(text_features(job.title, FEATURE_WEIGHTS['title']))
+    for skill, is_required in skills:
+        key = phrase(skill)[:50]
+        if key:
+            weight = FEATURE_WEIGHTS['skill' if is_required else 'optional_skill']
+            vector[f'skill:{key}'] = max(vector[f'skill:{key}'], weight)
+    if job.startup_id and job.startup.industry_id:
+        vector[f'industry:{job.startup.industry_id}'] = FEATURE_WEIGHTS['industry']
+    if job.experience_level:
+        vector[f'level:{job.experience_level}'] = FEATURE_WEIGHTS['level']
+    vector[f'type:{job.job_type_id}'] = FEATURE_WEIGHTS['type']
+    return normalized(vector)
+
+
+def job_vectors(jobs):
+    """``{job_id: vector}`` for ``jobs`` (loaded with their startup), with one query for all their skills"""
+    skills = {}
+    for job_id, skill, is_required in JobSkill.objects.filter(job__in=jobs).values_list('job_id', 'skill', 'is_required'):
+        skills.setdefault(job_id, []).append((skill, is_required))
+    return {job.id: job_vector(job, skills.get(job.id, [])) for job in jobs}
+
+
+def is_live(job):
+    return job.is_active and job.status == 'active'
+
+
+def update_job_vectors(job_ids):
+    """Recompute the stored vectors of ``job_ids``; jobs no longer live lose theirs. Returns the live vectors"""
+    jobs = [job for job in Job.objects.filter(id__in=job_ids).select_related('startup') if is_live(job)]
+    vectors = job_vectors(jobs)
+    with transaction.atomic():
+        JobVectorTerm.objects.filter(job_id__in=job_ids).delete()
+        JobVectorTerm.objects.bulk_create(
+            [
+                JobVectorTerm(job_id=job_id, feature=feature, weight=weight)
+                for job_id, vector in vectors.items()
+                for feature, weight in vector.items()
+            ],
+            batch_size=1000,
+        )
+    return vectors
+
+
+def user_vector(user_id):
+    """Normalized ``{feature: weight}`` of a user's job preferences from their activity and profile"""
+    vector = Counter()
+
+    def add(features, weight):
+        for feature, value in features.items():
+            vector[feature] += weight * value
+
+    for signal, model, date_field in [
+        ('application', JobApplication, '-applied_at'),
+        ('bookmark', JobBookmark, '-created_at'),
+    ]:
+        job_ids = model.objects.filter(user_id=user_id).order_by(date_field).values_list('job_id', flat=True)
+        jobs = list(Job.objects.filter(id__in=list(job_ids[:MAX_USER_ITEMS])).select_related('startup'))
+        for features in job_vectors(jobs).values():
+            add(features, SIGNAL_WEIGHTS[signal])
+
+    industries = {name.lower(): pk for pk, name in Industry.objects.values_list('id', 'name')}
+    for interest in UserInterest.objects.filter(user_id=user_id).values_list('interest', flat=True):
+        if interest.strip().lower() in industries:
+            add({f'industry:{industries[interest.strip().lower()]}': 1.0}, SIGNAL_WEIGHTS['interest'])
+        elif phrase(interest):
+            add({f'skill:{phrase(interest)[:50]}': 1.0}, SIGNAL_WEIGHTS['interest'])
+            add(text_features(interest, FEATURE_WEIGHTS['title']), SIGNAL_WEIGHTS['interest'])
+
+    for model in (StartupLike, StartupBookmark):
+        startup_industries = model.objects.filter(
+            user_id=user_id, startup__industry__isnull=False
+        ).order_by('-created_at').values_list('startup__industry_id', flat=True)[:MAX_USER_ITEMS]
+        for industry_id in startup_industries:
+            add({f'industry:{industry_id}': 1.0}, SIGNAL_WEIGHTS['startup'])
+
+    return normalized(dict(vector.most_common(MAX_USER_FEATURES)))
+
+
+def weighted(vector):
+    """Expression giving each term row the weight of its feature in ``vector``"""
+    return Case(
+        *[When(feature=feature, then=Value(weight)) for feature, weight in vector.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def score_jobs(vector, exclude_job_ids=(), limit=RECOMMENDATION_LIST_SIZE):
+    """``[(job_id, score)]`` of the live jobs most similar to ``vector``, best first"""
+    if not vector:
+        return []
+    scores = JobVectorTerm.objects.filter(feature__in=list(vector)).exclude(
+        job_id__in=list(exclude_job_ids)
+    ).values('job_id').annotate(
+        score=Sum(F('weight') * weighted(vector))
+    ).filter(score__gte=MIN_SCORE).order_by('-score', '-job_id').values_list('job_id', 'score')
+    return list(scores[:limit])
+
+
+def refresh_recommendations(user_ids):
+    """Rebuild the vectors and recommendation lists of ``user_ids``; returns how many were refreshed"""
+    for user_id in user_ids:
+        vector = user_vector(user_id)
+        seen = set(JobApplication.objects.filter(user_id=user_id).values_list('job_id', flat=True))
+        seen.update(JobBookmark.objects.filter(user_id=user_id).values_list('job_id', flat=True))
+        jobs = score_jobs(vector, exclude_job_ids=seen)
+        with transaction.atomic():
+            UserJobVectorTerm.objects.filter(user_id=user_id).delete()
+            UserJobVectorTerm.objects.bulk_create(
+                UserJobVectorTerm(user_id=user_id, feature=feature, weight=weight) for feature, weight in vector.items()
+            )
+            JobRecommendationList.objects.update_or_create(
+                user_id=user_id, defaults={'jobs': [[job_id, round(score, 4)] for job_id, score in jobs]}
+            )
+    return len(user_ids)
+
+
+def merge_into_recommendations(vectors, chunk_size=500):
+    """
+    Add freshly (re)vectorized live jobs to the cached lists of the users they
+    fit, scoring each job once against the user terms; returns lists changed.
+    """
+    changed = 0
+    for job_id, vector in vectors.items():
+        if not vector:
+            continue
+        scores = dict(
+            UserJobVectorTerm.objects.filter(feature__in=list(vector)).values('user_id').annotate(
+                score=Sum(F('weight') * weighted(vector))
+            ).filter(score__gte=MIN_SCORE).values_list('user_id', 'score')
+        )
+        user_ids = list(scores)
+        for start in range(0, len(user_ids), chunk_size):
+            lists = []
+            for entry in JobRecommendationList.objects.filter(user_id__in=user_ids[start:start + chunk_size]):
+                jobs = [item for item in entry.jobs if item[0] != job_id]
+                jobs.append([job_id, round(scores[entry.user_id], 4)])
+                jobs.sort(key=lambda item: (-item[1], -item[0]))
+                jobs = jobs[:RECOMMENDATION_LIST_SIZE]
+                if jobs != entry.jobs:
+                    entry.jobs = jobs
+                    lists.append(entry)
+            JobRecommendationList.objects.bulk_update(lists, ['jobs'])
+            changed += len(lists)
+    return changed
+
+
+def recommended_job_ids(user):
+    """The user's cached recommendation list, computed on their first request"""
+    entry = JobRecommendationList.objects.filter(user=user).first()
+    if entry is None:
+        refresh_recommendations([user.id])
+        entry = JobRecommendationList.objects.get(user=user)
+    return [job_id for job_id, score in entry.jobs]
+
+
+def rebuild_recommendations(batch_size=500, log=None):
+    """Recompute every live job's vector and every cached list; returns ``(jobs, users)``"""
+    JobVectorTerm.objects.exclude(job__is_active=True, job__status='active').delete()
+    job_ids = list(Job.objects.filter(is_active=True, status='active').order_by('id').values_list('id', flat=True))
+    for start in range(0, len(job_ids), batch_size):
+        update_job_vectors(job_ids[start:start + batch_size])
+    if log:
+        log(f'Vectorized {len(job_ids)} live jobs')
+
+    user_ids = list(JobRecommendationList.objects.order_by('user_id').values_list('user_id', flat=True))
+    for start in range(0, len(user_ids), batch_size):
+        refresh_recommendations(user_ids[start:start + batch_size])
+        if log:
+            log(f'Refreshed {min(start + batch_size, len(user_ids))}/{len(user_ids)} recommendation lists')
+    return len(job_ids), len(user_ids)
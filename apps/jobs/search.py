@@ -0,0 +1,143 @@
+# startup_hub/apps/jobs/search.py
+"""
+Job board search.
+
+On PostgreSQL each job carries a weighted ``search_vector`` - title A, skill
+names and startup name B, description and requirements C, location and
+industry D - behind a GIN index, so ``?search=`` is one index lookup ranked
+by ``SearchRank`` instead of ``icontains`` over six joined columns with a
+``DISTINCT``. Skill, startup and industry names are denormalized into the
+vector, which is refreshed by the receivers in ``signals.py`` when a job, its
+skills or its startup change; ``rebuild_job_search_index`` rebuilds it.
+
+Other databases (SQLite in local settings) fall back to ``icontains``
+matching, with skills checked through a subquery rather than a join.
+
+``filter_jobs`` applies the job list query parameters and is shared by
+``JobViewSet.get_queryset`` and the facet counts in ``facets.py``.
+"""
+from datetime import timedelta
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.startups.models import Startup
+from apps.startups.search import SEARCH_CONFIG, search_enabled
+
+from .models import Job, JobSkill
+
+# Job fields that feed the search vector
+SEARCH_FIELDS = {'title', 'description', 'requirements', 'location', 'startup'}
+
+
+def text(subquery):
+    return Coalesce(Subquery(subquery), Value(''), output_field=TextField())
+
+
+def job_search_vector():
+    skills = text(
+        JobSkill.objects.filter(job=OuterRef('pk')).order_by().values('job').annotate(
+            text=StringAgg('skill', ' ')
+        ).values('text')
+    )
+    # Subqueries rather than joins: UPDATE cannot reference related tables
+    startup_name = text(Startup.objects.filter(pk=OuterRef('startup_id')).values('name'))
+    industry_name = text(Startup.objects.filter(pk=OuterRef('startup_id')).values('industry__name'))
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(skills, startup_name, weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', 'requirements', weight='C', config=SEARCH_CONFIG)
+        + SearchVector('location', industry_name, weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(job_ids=None, startup_ids=None):
+    """Recompute the search vector for some (or all) jobs in one statement"""
+    if not search_enabled():
+        return 0
+    queryset = Job.objects.all()
+    if job_ids is not None:
+        queryset = queryset.filter(id__in=job_ids)
+    if startup_ids is not None:
+        queryset = queryset.filter(startup_id__in=startup_ids)
+    return queryset.update(search_vector=job_search_vector())
+
+
+def normalize_query(value):
+    """Search text with case and spacing folded, so equivalent queries share cache entries"""
+    return ' '.join(value.lower().split())
+
+
+def search_jobs(queryset, value):
+    """Filter ``queryset`` to matches for ``value``, annotated with ``search_score``"""
+    value = value.strip()
+    if not value:
+        return queryset
+
+    if not search_enabled():
+        return queryset.filter(
+            Q(title__icontains=value) |
+            Q(description__icontains=value) |
+            Q(id__in=JobSkill.objects.filter(skill__icontains=value).values('job_id')) |
+            Q(location__icontains=value) |
+            Q(startup__name__icontains=value) |
+            Q(startup__industry__name__icontains=value)
+        ).annotate(search_score=Value(0.0, output_field=FloatField()))
+
+    query = SearchQuery(value, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(search_score=SearchRank(F('search_vector'), query))
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_jobs(queryset, params):
+    """Apply the job list query parameters (search and filters) to ``queryset``"""
+    search_query = params.get('search')
+    if search_query:
+        queryset = search_jobs(queryset, search_query)
+
+    job_type = to_int(params.get('job_type'))
+    if job_type is not None:
+        queryset = queryset.filter(job_type__id=job_type)
+
+    experience_level = params.get('experience_level')
+    if experience_level:
+        queryset = queryset.filter(experience_level=experience_level)
+
+    location = params.get('location')
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+
+    is_remote = params.get('is_remote')
+    if is_remote == 'true':
+        queryset = queryset.filter(is_remote=True)
+    elif is_remote == 'false':
+        queryset = queryset.filter(is_remote=False)
+
+    if params.get('is_urgent') == 'true':
+        queryset = queryset.filter(is_urgent=True)
+
+    industry = to_int(params.get('industry'))
+    if industry is not None:
+        queryset = queryset.filter(startup__industry__id=industry)
+
+    min_employees = to_int(params.get('min_employees'))
+    if min_employees is not None:
+        queryset = queryset.filter(startup__employee_count__gte=min_employees)
+    max_employees = to_int(params.get('max_employees'))
+    if max_employees is not None:
+        queryset = queryset.filter(startup__employee_count__lte=max_employees)
+
+    posted_since = to_int(params.get('posted_since'))  # days ago
+    if posted_since is not None:
+        queryset = queryset.filter(posted_at__gte=timezone.now() - timedelta(days=posted_since))
+
+    return queryset
@@ -0,0 +1,110 @@
+# startup_hub/apps/jobs/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.startups.models import Startup, StartupBookmark, StartupLike
+from apps.users.models import UserInterest
+from apps.users.signals import safe_celery_task
+
+from .alerts import ALERT_JOB_FIELDS, compile_alerts
+from .facets import FACET_FIELDS, invalidate_facets
+from .models import (
+    Job, JobAlert, JobAlertMatch, JobApplication, JobBookmark, JobRecommendationList, JobSkill, JobVectorTerm,
+)
+from .search import SEARCH_FIELDS, update_search_vectors
+from .tasks import match_job_alerts, refresh_user_job_recommendations, update_job_recommendations
+
+# Startup fields denormalized into job search vectors and facets
+STARTUP_JOB_FIELDS = {'name', 'industry'}
+
+
+def schedule_job_indexing(job_id):
+    """Match the job against the alerts and refresh its recommendation vector once the save commits"""
+    transaction.on_commit(lambda: safe_celery_task(match_job_alerts, [job_id]))
+    transaction.on_commit(lambda: safe_celery_task(update_job_recommendations, [job_id]))
+
+
+@receiver(post_save, sender=JobAlert)
+def compile_job_alert(sender, instance, update_fields=None, **kwargs):
+    """Re-index the alert's criteria; sending it (last_sent, total_sent) leaves them unchanged"""
+    if update_fields is not None and set(update_fields) <= {'last_sent', 'total_sent'}:
+        return
+    compile_alerts([instance])
+
+
+@receiver(post_save, sender=Job)
+def match_job_against_alerts(sender, instance, update_fields=None, **kwargs):
+    """Match live jobs when they're approved or edited; drop queued matches of jobs taken down"""
+    if update_fields is not None and not ALERT_JOB_FIELDS.intersection(update_fields):
+        return
+    if instance.is_active and instance.status == 'active':
+        schedule_job_indexing(instance.pk)
+    else:
+        JobAlertMatch.objects.filter(job=instance, sent_at__isnull=True).delete()
+        JobVectorTerm.objects.filter(job=instance).delete()
+
+
+@receiver(post_save, sender=JobSkill)
+def match_job_skills_against_alerts(sender, instance, **kwargs):
+    # Skills are saved after their job, so a live job is matched again with them
+    job = instance.job
+    if job.is_active and job.status == 'active':
+        schedule_job_indexing(job.pk)
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Rebuild the search vector unless the save only touched non-text fields (e.g. view_count)"""
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    update_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=JobSkill)
+@receiver(post_delete, sender=JobSkill)
+def refresh_skill_search_vector(sender, instance, **kwargs):
+    update_search_vectors([instance.job_id])
+    invalidate_facets()
+
+
+@receiver(post_save, sender=Job)
+def invalidate_job_facets(sender, instance, update_fields=None, **kwargs):
+    """Approvals, edits and new jobs change the filter counts; view counts don't"""
+    if update_fields is not None and not FACET_FIELDS.intersection(update_fields):
+        return
+    invalidate_facets()
+
+
+@receiver(post_delete, sender=Job)
+def invalidate_deleted_job_facets(sender, **kwargs):
+    invalidate_facets()
+
+
+@receiver(post_save, sender=Startup)
+def refresh_startup_jobs_search(sender, instance, created=False, update_fields=None, **kwargs):
+    """Jobs carry their startup's name and industry in their search vector and facets"""
+    if created or (update_fields is not None and not STARTUP_JOB_FIELDS.intersection(update_fields)):
+        return
+    update_search_vectors(startup_ids=[instance.pk])
+    invalidate_facets()
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_save, sender=JobBookmark)
+@receiver(post_delete, sender=JobBookmark)
+@receiver(post_save, sender=UserInterest)
+@receiver(post_delete, sender=UserInterest)
+@receiver(post_save, sender=StartupLike)
+@receiver(post_delete, sender=StartupLike)
+@receiver(post_save, sender=StartupBookmark)
+@receiver(post_delete, sender=StartupBookmark)
+def refresh_job_recommendations(sender, instance, created=True, **kwargs):
+    """Refresh the recommendation list of a user whose job preferences changed"""
+    # Status updates of an application say nothing new about the applicant
+    if not created:
+        return
+    user_id = instance.user_id
+    # Users who never asked for recommendations get their list on first request
+    if JobRecommendationList.objects.filter(user_id=user_id).exists():
+        transaction.on_commit(lambda: safe_celery_task(refresh_user_job_recommendations, [user_id]))
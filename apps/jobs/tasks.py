@@ -3,6 +3,14 @@ from celery import shared_task
 from django.utils import timezone
 from django.db import transaction
 from django.core.management import call_command
+from apps.notifications.tasks import deliver_email_outbox
+from apps.notifications.utils import create_notifications
+from apps.users.signals import safe_celery_task
+from .alerts import match_jobs, send_pending_alerts
+from .facets import invalidate_facets
+from .recommendations import (
+    merge_into_recommendations, rebuild_recommendations, refresh_recommendations, update_job_vectors,
+)
 from .models import Job, JobBookmark
 import logging
 
@@ -58,6 +66,7 @@ def cleanup_expired_jobs_manual(soft_delete=True):
                     status='expired',
                     is_active=False
                 )
+                invalidate_facets()
                 
                 # Remove bookmarks
                 JobBookmark.objects.filter(job_id__in=job_ids).delete()
@@ -141,4 +150,103 @@ StartupHub Team
         
     except Exception as e:
         logger.error(f'Error in job expiry notification task: {e}')
-        raise
\ No newline at end of file
+        raise
+
+@shared_task
+def send_bulk_admin_followups(action, job_ids, reason=''):
+    """
+    Notify posters of jobs approved or rejected in bulk, as one job rather
+    than one per posting.
+    """
+    notifications = []
+    for job_id, title, posted_by_id in Job.objects.filter(id__in=job_ids).values_list('id', 'title', 'posted_by_id'):
+        if action == 'reject':
+            message = f'Your job posting "{title}" was not approved'
+            if reason:
+                message += f': {reason}'
+            notifications.append({
+                'recipient_id': posted_by_id,
+                'title': 'Job posting not approved',
+                'message': message,
+                'job_id': job_id,
+                'extra_data': {'reason': reason},
+            })
+        else:
+            notifications.append({
+                'recipient_id': posted_by_id,
+                'title': 'Job posting approved!',
+                'message': f'Your job posting "{title}" has been approved and is now live!',
+                'job_id': job_id,
+            })
+    
+    notification_type = 'job_rejected' if action == 'reject' else 'job_approved'
+    created = create_notifications(notification_type, notifications)
+    
+    # Bulk approval skips the post_save receivers, so match the new jobs against
+    # alerts and merge them into recommendation lists here
+    if action == 'approve':
+        match_job_alerts(job_ids)
+        update_job_recommendations(job_ids)
+    
+    logger.info(f'Bulk job {action} follow-ups: {len(created)} notifications')
+    return len(created)
+
+
+@shared_task
+def match_job_alerts(job_ids):
+    """
+    Match jobs that went live or changed against the job alert index and
+    queue immediate alerts for the new matches right away.
+    """
+    new_alert_ids = match_jobs(job_ids)
+    queued, errors = send_pending_alerts(frequency='immediate', alert_ids=new_alert_ids)
+    if queued:
+        safe_celery_task(deliver_email_outbox)
+    logger.info(f'Matched {len(job_ids)} jobs: {len(new_alert_ids)} alerts with new jobs, {queued} immediate alerts queued')
+    return len(new_alert_ids)
+
+
+@shared_task
+def send_job_alert_digests():
+    """
+    Queue a digest of the matched jobs of every alert that is due and hand
+    them to the email outbox.
+    This task should be scheduled to run every hour.
+    """
+    queued, errors = send_pending_alerts()
+    if queued:
+        safe_celery_task(deliver_email_outbox)
+    logger.info(f'Job alert digests: {queued} queued, {errors} failed')
+    return queued
+
+
+@shared_task
+def update_job_recommendations(job_ids):
+    """
+    Re-vectorize jobs that went live or changed and merge them into the
+    cached recommendation lists of the users they fit.
+    """
+    vectors = update_job_vectors(job_ids)
+    changed = merge_into_recommendations(vectors)
+    logger.info(f'Vectorized {len(vectors)} jobs, {changed} recommendation lists updated')
+    return changed
+
+
+@shared_task
+def refresh_user_job_recommendations(user_ids):
+    """
+    Rebuild the preference vectors and recommendation lists of users whose
+    applications, bookmarks, likes or interests changed.
+    """
+    return refresh_recommendations(user_ids)
+
+
+@shared_task
+def rebuild_job_recommendations():
+    """
+    Recompute every job vector and cached recommendation list.
+    This task should be scheduled to run daily.
+    """
+    jobs, users = rebuild_recommendations()
+    logger.info(f'Rebuilt job recommendations: {jobs} jobs, {users} users')
+    return users
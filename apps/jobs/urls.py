@@ -1,6 +1,6 @@
 # startup_hub/apps/jobs/urls.py - Updated with all endpoints
 
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
 from .views import JobTypeViewSet, JobViewSet
 from . import application_views
@@ -22,6 +22,7 @@ urlpatterns = [
     path('my-applications/', JobViewSet.as_view({'get': 'my_applications'}), name='job-my-applications'),
     path('admin/', JobViewSet.as_view({'get': 'admin_list'}), name='job-admin-list'),
     path('bulk-admin/', JobViewSet.as_view({'post': 'bulk_admin'}), name='job-bulk-admin'),
+    re_path(r'^export/(?P<export_format>ndjson|csv)/$', JobViewSet.as_view({'get': 'export'}), name='job-export'),
     path('admin_stats/', JobViewSet.as_view({'get': 'admin_stats'}), name='job-admin-stats'),
     path('job-types/', JobTypeViewSet.as_view({'get': 'list'}), name='job-types-list'),
     
@@ -34,6 +35,7 @@ urlpatterns = [
     path('<int:job_id>/applications/stats/', application_views.application_statistics, name='job-application-stats'),
     path('applications/<int:application_id>/', application_views.application_detail, name='application-detail'),
     path('applications/<int:application_id>/message/', application_views.initiate_conversation_with_applicant, name='application-message'),
+    re_path(r'^applications/export/(?P<export_format>ndjson|csv)/$', application_views.export_applications, name='application-export'),
     path('applications/bulk-update/', application_views.bulk_update_applications, name='application-bulk-update'),
     path('my-applications-summary/', application_views.my_job_applications_summary, name='my-applications-summary'),
     
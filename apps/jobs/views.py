@@ -9,7 +9,15 @@ from django.db.models import Q, Count
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from apps.core.bulk import MAX_BULK_IDS, bulk_results, parse_ids
+from apps.core.exports import export_columns, export_response, parse_updated_since
+from apps.users.signals import safe_celery_task
+from .facets import get_facets, get_filter_options, invalidate_facets
 from .models import JobType, Job, JobApplication, JobEditRequest
+from .recommendations import RECOMMENDATION_LIST_SIZE, recommended_job_ids
+from .search import filter_jobs
+from .tasks import send_bulk_admin_followups
 from .serializers import (
     JobTypeSerializer, JobListSerializer, JobDetailSerializer, 
     JobApplicationSerializer, JobCreateSerializer, JobEditSerializer,
@@ -18,6 +26,32 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
+# (column, lookup) pairs streamed by the job export
+JOB_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('startup_id', 'startup_id'),
+    ('startup', 'startup__name'),
+    ('job_type', 'job_type__name'),
+    ('location', 'location'),
+    ('salary_range', 'salary_range'),
+    ('is_remote', 'is_remote'),
+    ('is_urgent', 'is_urgent'),
+    ('experience_level', 'experience_level'),
+    ('status', 'status'),
+    ('is_active', 'is_active'),
+    ('posted_by', 'posted_by__username'),
+    ('job_link', 'job_link'),
+    ('view_count', 'view_count'),
+    ('posted_at', 'posted_at'),
+    ('updated_at', 'updated_at'),
+    ('expires_at', 'expires_at'),
+    ('application_deadline', 'application_deadline'),
+]
+
+# Columns updated without touching updated_at; left out of updated_since exports
+JOB_ACTIVITY_COLUMNS = {'view_count'}
+
 class JobTypeViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = JobType.objects.all()
     serializer_class = JobTypeSerializer
@@ -27,8 +61,8 @@ class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.filter(is_active=True, status='active').exclude(status='expired').select_related('startup', 'job_type')
     # TEMPORARY: Allow unauthenticated access for testing email field fix
     permission_classes = [AllowAny]  # TODO: Revert to [IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description', 'skills__skill', 'location', 'startup__name']
+    # ?search= is handled in get_queryset (see search.py)
+    filter_backends = [filters.OrderingFilter]
     ordering_fields = ['posted_at', 'title', 'salary_range', 'view_count']
     ordering = ['-posted_at']
     
@@ -47,78 +81,10 @@ class JobViewSet(viewsets.ModelViewSet):
         
         params = self.request.query_params
         
-        # Advanced search
-        search_query = params.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(skills__skill__icontains=search_query) |
-                Q(location__icontains=search_query) |
-                Q(startup__name__icontains=search_query) |
-                Q(startup__industry__name__icontains=search_query)
-            ).distinct()
-        
-        # Job type filtering
-        job_type = params.get('job_type')
-        if job_type:
-            try:
-                queryset = queryset.filter(job_type__id=int(job_type))
-            except (ValueError, TypeError):
-                pass
-        
-        # Experience level filtering
-        experience_level = params.get('experience_level')
-        if experience_level:
-            queryset = queryset.filter(experience_level=experience_level)
-        
-        # Location filtering
-        location = params.get('location')
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        
-        # Remote work filtering
-        is_remote = params.get('is_remote')
-        if is_remote == 'true':
-            queryset = queryset.filter(is_remote=True)
-        elif is_remote == 'false':
-            queryset = queryset.filter(is_remote=False)
-        
-        # Urgent jobs filtering
-        is_urgent = params.get('is_urgent')
-        if is_urgent == 'true':
-            queryset = queryset.filter(is_urgent=True)
-        
-        # Industry filtering
-        industry = params.get('industry')
-        if industry:
-            try:
-                queryset = queryset.filter(startup__industry__id=int(industry))
-            except (ValueError, TypeError):
-                pass
-        
-        # Company size filtering
-        min_employees = params.get('min_employees')
-        max_employees = params.get('max_employees')
-        if min_employees:
-            try:
-                queryset = queryset.filter(startup__employee_count__gte=int(min_employees))
-            except (ValueError, TypeError):
-                pass
-        if max_employees:
-            try:
-                queryset = queryset.filter(startup__employee_count__lte=int(max_employees))
-            except (ValueError, TypeError):
-                pass
-        
-        # Posted date filtering
-        posted_since = params.get('posted_since')  # days ago
-        if posted_since:
-            try:
-                since_date = timezone.now() - timedelta(days=int(posted_since))
-                queryset = queryset.filter(posted_at__gte=since_date)
-            except (ValueError, TypeError):
-                pass
+        # Full-text search and filters (see search.py); search results are ranked unless ?ordering= says otherwise
+        queryset = filter_jobs(queryset, params)
+        if params.get('search', '').strip():
+            self.ordering = ['-search_score', '-posted_at']
         
         return queryset
     
@@ -326,7 +292,7 @@ class JobViewSet(viewsets.ModelViewSet):
                 elif original_status == 'pending':
                     # Keep as pending if already pending
                     job.status = 'pending'
-                    job.save(update_fields=['status'])
+                    job.save(update_fields=['status', 'updated_at'])
             
             response_serializer = JobDetailSerializer(job, context={'request': request})
             
@@ -414,49 +380,18 @@ class JobViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def filters(self, request):
-        """Get available filter options for jobs"""
-        from apps.startups.models import Industry
-        
-        # Get all job types with job counts
-        job_types = JobType.objects.annotate(
-            job_count=Count('job', filter=Q(job__is_active=True, job__status='active'))
-        ).filter(job_count__gt=0).order_by('name')
-        
-        # Get experience levels
-        experience_levels = [
-            {'value': 'entry', 'label': 'Entry Level', 'count': Job.objects.filter(experience_level='entry', is_active=True, status='active').count()},
-            {'value': 'mid', 'label': 'Mid Level', 'count': Job.objects.filter(experience_level='mid', is_active=True, status='active').count()},
-            {'value': 'senior', 'label': 'Senior Level', 'count': Job.objects.filter(experience_level='senior', is_active=True, status='active').count()},
-            {'value': 'lead', 'label': 'Lead/Principal', 'count': Job.objects.filter(experience_level='lead', is_active=True, status='active').count()},
-        ]
-        
-        # Get industries (from startups that have jobs)
-        industries = Industry.objects.annotate(
-            job_count=Count('startups__jobs', filter=Q(startups__jobs__is_active=True, startups__jobs__status='active'))
-        ).filter(job_count__gt=0).order_by('name')
-        
-        # Get popular skills
-        from django.db.models import Count as CountAgg
-        try:
-            popular_skills_qs = Job.objects.filter(is_active=True, status='active').values(
-                'skills__skill'
-            ).annotate(
-                count=CountAgg('skills__skill')
-            ).order_by('-count')[:20]
-            
-            popular_skills = [item['skills__skill'] for item in popular_skills_qs if item['skills__skill']]
-        except:
-            popular_skills = []
-        
-        # Get locations
-        locations = Job.objects.filter(is_active=True, status='active').values_list('location', flat=True).distinct().order_by('location')
+        """Get available filter options for jobs, with counts for the current search and filters"""
+        facets = get_facets(request.query_params)
+        options = get_filter_options()
         
         return Response({
-            'job_types': JobTypeSerializer(job_types, many=True).data,
-            'experience_levels': [level for level in experience_levels if level['count'] > 0],
-            'industries': [{'id': ind.id, 'name': ind.name, 'job_count': ind.job_count} for ind in industries],
-            'popular_skills': popular_skills,
-            'locations': [loc for loc in locations if loc],
+            'total': facets['total'],
+            'job_types': facets['job_types'],
+            'experience_levels': facets['experience_levels'],
+            'industries': facets['industries'],
+            'remote': facets['remote'],
+            'popular_skills': options['popular_skills'],
+            'locations': options['locations'],
             'posted_since_options': [
                 {'value': 1, 'label': 'Last 24 hours'},
                 {'value': 3, 'label': 'Last 3 days'},
@@ -467,33 +402,35 @@ class JobViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def recommendations(self, request):
-        """Get personalized job recommendations"""
+        """Get personalized job recommendations, most similar to the user's skills and activity first"""
         if not request.user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
         
         user = request.user
+        limit = request.query_params.get('limit', '10')
+        limit = min(int(limit), RECOMMENDATION_LIST_SIZE) if limit.isdigit() and int(limit) > 0 else 10
+        applied_jobs = set(user.job_applications.values_list('job_id', flat=True))
         
-        # Get user's interests and application history
-        try:
-            applied_jobs = user.job_applications.values_list('job__id', flat=True)
-        except:
-            applied_jobs = []
+        bookmarked_jobs = set(user.job_bookmarks.values_list('job_id', flat=True))
         
-        # Get user's liked/bookmarked startups
-        try:
+        # Precomputed list; jobs taken down, applied to or bookmarked since it was built are skipped
+        job_ids = [
+            job_id for job_id in recommended_job_ids(user)
+            if job_id not in applied_jobs and job_id not in bookmarked_jobs
+        ]
+        jobs = {job.id: job for job in self.get_queryset().filter(id__in=job_ids, is_active=True, status='active')}
+        recommended = [jobs[job_id] for job_id in job_ids if job_id in jobs][:limit]
+        
+        if not recommended:
+            # No skills or activity to go on yet: recent jobs from startups the user liked or bookmarked
             liked_startups = user.startuplike_set.values_list('startup__id', flat=True)
             bookmarked_startups = user.startupbookmark_set.values_list('startup__id', flat=True)
-        except:
-            liked_startups = []
-            bookmarked_startups = []
-        
-        # Recommend jobs based on liked startups and similar companies
-        recommended = self.get_queryset().filter(
-            Q(startup__id__in=liked_startups) |
-            Q(startup__id__in=bookmarked_startups)
-        ).exclude(
-            id__in=applied_jobs
-        ).distinct().order_by('-posted_at')[:10]
+            recommended = self.get_queryset().filter(
+                Q(startup__id__in=liked_startups) |
+                Q(startup__id__in=bookmarked_startups)
+            ).exclude(
+                id__in=applied_jobs
+            ).distinct().order_by('-posted_at')[:limit]
         
         serializer = self.get_serializer(recommended, many=True)
         return Response(serializer.data)
@@ -710,6 +647,28 @@ class JobViewSet(viewsets.ModelViewSet):
         serializer = JobDetailSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path=r'export/(?P<export_format>ndjson|csv)')
+    def export(self, request, export_format=None):
+        """Stream all jobs as NDJSON or CSV (admin only)"""
+        if not (request.user.is_staff or request.user.is_superuser):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            updated_since = parse_updated_since(request.query_params.get('updated_since'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = Job.objects.all()
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        if updated_since:
+            queryset = queryset.filter(updated_at__gte=updated_since)
+        
+        logger.info(f"Job {export_format} export started by: {request.user}")
+        columns = export_columns(JOB_EXPORT_COLUMNS, JOB_ACTIVITY_COLUMNS, incremental=bool(updated_since))
+        return export_response(queryset, columns, export_format, 'jobs')
+    
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated], url_path='admin')
     def admin_action(self, request, pk=None):
         """Admin actions: approve, reject"""
@@ -734,7 +693,7 @@ class JobViewSet(viewsets.ModelViewSet):
             elif action_type == 'deactivate':
                 job.is_active = False
                 job.status = 'paused'
-                job.save(update_fields=['is_active', 'status'])
+                job.save(update_fields=['is_active', 'status', 'updated_at'])
                 return Response({'message': 'Job deactivated'})
             
             else:
@@ -746,36 +705,65 @@ class JobViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated], url_path='bulk-admin')
     def bulk_admin(self, request):
-        """Bulk admin actions"""
+        """Bulk admin actions, each applied as one statement with per-id outcomes"""
         if not (request.user.is_staff or request.user.is_superuser):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        job_ids = request.data.get('job_ids', [])
+        job_ids, invalid_ids = parse_ids(request.data.get('job_ids', []))
         action_type = request.data.get('action')
+        reason = request.data.get('reason', '') or 'Bulk rejection'
         
         logger.info(f"Bulk admin action '{action_type}' on {len(job_ids)} jobs by {request.user}")
         
         if not job_ids:
             return Response({'error': 'No jobs selected'}, status=status.HTTP_400_BAD_REQUEST)
         
+        if len(job_ids) > MAX_BULK_IDS:
+            return Response({'error': f'At most {MAX_BULK_IDS} jobs per request'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if action_type not in ('approve', 'reject', 'delete'):
+            return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            jobs = Job.objects.filter(id__in=job_ids)
-            
-            if action_type == 'approve':
-                # Approve all pending jobs
-                pending_jobs = jobs.filter(status='pending')
-                for job in pending_jobs:
-                    job.approve(request.user)
-                return Response({'message': f'{pending_jobs.count()} jobs approved successfully'})
-            
-            elif action_type == 'reject':
-                pending_jobs = jobs.filter(status='pending')
-                for job in pending_jobs:
-                    job.reject(request.user, 'Bulk rejection')
-                return Response({'message': f'{pending_jobs.count()} jobs rejected successfully'})
+            with transaction.atomic():
+                current = dict(
+                    Job.objects.select_for_update().filter(id__in=job_ids).values_list('id', 'status')
+                )
+                now = timezone.now()
+                
+                if action_type == 'delete':
+                    outcome = 'deleted'
+                    changed = set(current)
+                    Job.objects.filter(id__in=changed).delete()
+                else:
+                    # Only pending jobs are reviewed, as with the single-job admin action
+                    changed = {job_id for job_id, job_status in current.items() if job_status == 'pending'}
+                    jobs = Job.objects.filter(id__in=changed)
+                    if action_type == 'approve':
+                        outcome = 'approved'
+                        jobs.update(
+                            status='active', is_active=True, approved_by=request.user,
+                            approved_at=now, updated_at=now
+                        )
+                    else:
+                        outcome = 'rejected'
+                        jobs.update(
+                            status='rejected', is_active=False, approved_by=request.user,
+                            approved_at=now, rejection_reason=reason, updated_at=now
+                        )
+                    notify_ids = sorted(changed)
+                    if notify_ids:
+                        transaction.on_commit(lambda: safe_celery_task(
+                            send_bulk_admin_followups, action_type, notify_ids, reason
+                        ))
+                # Queryset updates skip the receivers that keep the facet cache fresh
+                transaction.on_commit(invalidate_facets)
             
-            else:
-                return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'message': f'{len(changed)} jobs {outcome} successfully',
+                'updated_count': len(changed),
+                'results': bulk_results(job_ids, invalid_ids, current, changed, outcome)
+            })
                 
         except Exception as e:
             logger.error(f"Error performing bulk admin action: {str(e)}")
@@ -850,6 +838,7 @@ class JobViewSet(viewsets.ModelViewSet):
                     status='expired',
                     is_active=False
                 )
+                invalidate_facets()
                 
                 # Remove bookmarks for expired jobs
                 JobBookmark.objects.filter(job_id__in=job_ids).delete()
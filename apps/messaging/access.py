@@ -0,0 +1,103 @@
+# startup_hub/apps/messaging/access.py
+"""
+Cached per-user access sets for messaging.
+
+For each user we cache the ids of their conversations, of users they have
+blocked or been blocked by, and of users they are connected with; for each
+conversation, its member count. Socket connects, message sends, chat requests
+and the broadcast policy check these instead of querying participants,
+``BlockedUser`` and ``UserConnection`` every time.
+
+Entries are dropped by the receivers in ``signals.py`` when participants,
+blocks or connections change; the timeout bounds staleness for writes that
+bypass signals (queryset ``update``/``delete``).
+"""
+from django.core.cache import cache
+from django.db.models import Q
+
+from .conf import messaging_setting
+from .models import BlockedUser, Conversation, UserConnection
+
+CONVERSATIONS_KEY = 'chat:access:conversations:{}'
+BLOCKS_KEY = 'chat:access:blocks:{}'
+CONNECTIONS_KEY = 'chat:access:connections:{}'
+MEMBERS_KEY = 'chat:access:members:{}'
+
+
+def cached_set(key, load):
+    """Return the cached set under ``key``, loading it on a miss"""
+    value = cache.get(key)
+    if value is None:
+        value = frozenset(load())
+        cache.set(key, value, messaging_setting('ACCESS_CACHE_TIMEOUT'))
+    return value
+
+
+def conversation_ids(user_id):
+    """IDs (as strings) of the conversations a user participates in"""
+    return cached_set(
+        CONVERSATIONS_KEY.format(user_id),
+        lambda: (
+            str(conversation_id) for conversation_id in
+            Conversation.participants.through.objects.filter(user_id=user_id).values_list('conversation_id', flat=True)
+        )
+    )
+
+
+def blocked_user_ids(user_id):
+    """IDs of users this user has blocked or has been blocked by"""
+    def load():
+        for blocker_id, blocked_id in BlockedUser.objects.filter(
+            Q(user_id=user_id) | Q(blocked_user_id=user_id)
+        ).values_list('user_id', 'blocked_user_id'):
+            yield blocked_id if blocker_id == user_id else blocker_id
+    return cached_set(BLOCKS_KEY.format(user_id), load)
+
+
+def connection_ids(user_id):
+    """IDs of users this user is connected with, in either direction"""
+    def load():
+        for from_id, to_id in UserConnection.objects.filter(
+            Q(from_user_id=user_id) | Q(to_user_id=user_id)
+        ).values_list('from_user_id', 'to_user_id'):
+            yield to_id if from_id == user_id else from_id
+    return cached_set(CONNECTIONS_KEY.format(user_id), load)
+
+
+def member_count(conversation_id):
+    """Number of participants in a conversation"""
+    key = MEMBERS_KEY.format(conversation_id)
+    count = cache.get(key)
+    if count is None:
+        count = Conversation.participants.through.objects.filter(conversation_id=conversation_id).count()
+        cache.set(key, count, messaging_setting('ACCESS_CACHE_TIMEOUT'))
+    return count
+
+
+def is_participant(user_id, conversation_id):
+    return str(conversation_id) in conversation_ids(user_id)
+
+
+def is_blocked(user_id, other_user_id):
+    """Whether either user has blocked the other"""
+    return other_user_id in blocked_user_ids(user_id)
+
+
+def are_connected(user_id, other_user_id):
+    return other_user_id in connection_ids(user_id)
+
+
+def invalidate_conversations(*user_ids):
+    cache.delete_many([CONVERSATIONS_KEY.format(user_id) for user_id in user_ids])
+
+
+def invalidate_blocks(*user_ids):
+    cache.delete_many([BLOCKS_KEY.format(user_id) for user_id in user_ids])
+
+
+def invalidate_connections(*user_ids):
+    cache.delete_many([CONNECTIONS_KEY.format(user_id) for user_id in user_ids])
+
+
+def invalidate_member_counts(*conversation_ids):
+    cache.delete_many([MEMBERS_KEY.format(conversation_id) for conversation_id in conversation_ids])
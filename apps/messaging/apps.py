@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class MessagingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.messaging'
+    
+    def ready(self):
+        # Import signals when the app is ready
+        import apps.messaging.signals
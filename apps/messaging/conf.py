@@ -0,0 +1,51 @@
+# startup_hub/apps/messaging/conf.py
+from django.conf import settings
+
+# Defaults for settings.MESSAGING_SETTINGS; projects only override what they need
+DEFAULTS = {
+    # Typing indicators
+    'TYPING_START_INTERVAL': 3,   # min seconds between broadcast typing-starts per user/conversation
+    'TYPING_STOP_TIMEOUT': 6,     # seconds without a typing frame before an automatic typing-stop
+    
+    # Messages queued on one connection are inserted together, up to this many per batch
+    'MESSAGE_BATCH_SIZE': 50,
+    
+    # WebRTC signalling backlog kept for late joiners (see signalling.py)
+    'SIGNAL_REDIS_URL': '',
+    'SIGNAL_TTL': 120,            # seconds a call's backlog outlives its last signal
+    'SIGNAL_BACKLOG': 200,        # max signals kept per call
+    
+    # Stale call sweep: unanswered calls older than STALE_CALL_TIMEOUT seconds,
+    # and answered calls older than MAX_CALL_DURATION seconds, are ended
+    'STALE_CALL_TIMEOUT': 300,
+    'MAX_CALL_DURATION': 4 * 60 * 60,
+    
+    # Broadcast policy (see fanout.py): at or above this many members, read
+    # receipts and online/offline events are sent as digests every
+    # DIGEST_INTERVAL seconds and messages as compact frames
+    'LARGE_GROUP_THRESHOLD': 50,
+    'DIGEST_INTERVAL': 2,
+    
+    # Seconds a user's cached conversation/block/connection sets live (see access.py)
+    'ACCESS_CACHE_TIMEOUT': 600,
+    
+    # Voice/attachment stream URLs (see media.py) are stable for MEDIA_URL_WINDOW
+    # seconds and expire one to two windows after issue; voice notes store a
+    # WAVEFORM_POINTS-long peak summary
+    'MEDIA_URL_WINDOW': 60 * 60,
+    'WAVEFORM_POINTS': 48,
+    
+    # Per-connection inbound frame limits: frame type -> (tokens per second, burst)
+    'FRAME_RATE_LIMITS': {
+        'message': (5, 10),
+        'typing': (2, 6),
+        'read_receipt': (20, 50),
+        'call_signal': (50, 200),
+        'default': (10, 20),
+    },
+}
+
+
+def messaging_setting(name):
+    """Look up a messaging setting, falling back to the module default"""
+    return getattr(settings, 'MESSAGING_SETTINGS', {}).get(name, DEFAULTS[name])
@@ -1,17 +1,48 @@
 # startup_hub/apps/messaging/consumers.py
+import asyncio
 import json
+import logging
+import time
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .models import Conversation, Message, MessageRead, ConversationParticipant, VideoCall, CallSignal, CallParticipant
+from .models import Conversation, Message, MessageRead, ConversationParticipant, VideoCall, CallParticipant
 from .serializers import MessageSerializer
+from . import access
+from .conf import messaging_setting
+from .fanout import compact_message_frame, digest_buffer, is_large_group
+from .metrics import fanout_stats, frame_stats
+from .services import mark_conversation_read, persist_messages, release_unread
+from .signalling import SIGNAL_TYPES, get_signal_store
+from .throttling import FrameRateLimiter
+from apps.connect.presence import get_presence, get_presence_settings
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 class ChatConsumer(AsyncWebsocketConsumer):
     """WebSocket consumer for real-time chat functionality"""
     
+    # Inbound frame types understood by the chat consumers (used for metrics labels)
+    FRAME_TYPES = {
+        'message', 'typing', 'read_receipt', 'delete_message', 'call_signal',
+        'call_status', 'call_notification', 'heartbeat', 'subscribe', 'unsubscribe',
+    }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = FrameRateLimiter()
+        # Messages waiting to be persisted, and the task draining them
+        self.outbox = []
+        self.outbox_task = None
+        # conversation_id -> {'started', 'deadline', 'timer'} for active typing
+        self.typing_state = {}
+        # conversation_id -> (member count, monotonic expiry) for the broadcast policy
+        self.member_counts = {}
+    
     async def connect(self):
         """Handle WebSocket connection"""
         # Get room_id from URL route
@@ -27,7 +58,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         # Check if user has access to this conversation
-        if not await self.user_has_access():
+        if not await self.user_has_access(self.room_id):
             await self.close()
             return
         
@@ -41,15 +72,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         await self.accept()
         
         # Send user online status
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'user_status',
-                'user_id': self.user.id,
-                'status': 'online',
-                'username': self.user.username
-            }
-        )
+        await self.broadcast_user_status(self.room_id, 'online')
         
         # Update last seen
         await self.update_last_seen()
@@ -58,15 +81,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         """Handle WebSocket disconnection"""
         # Send user offline status
         if hasattr(self, 'room_group_name'):
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'user_status',
-                    'user_id': self.user.id,
-                    'status': 'offline',
-                    'username': self.user.username
-                }
-            )
+            await self.stop_all_typing()
+            await self.broadcast_user_status(self.room_id, 'offline')
             
             # Leave room group
             await self.channel_layer.group_discard(
@@ -74,32 +90,107 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
     
+    async def broadcast_user_status(self, conversation_id, status):
+        """Announce this user's online/offline status to a conversation"""
+        event = {
+            'type': 'user_status',
+            'conversation_id': str(conversation_id),
+            'user_id': self.user.id,
+            'status': status,
+            'username': self.user.username
+        }
+        await self.broadcast(conversation_id, event, digest=True)
+    
     async def receive(self, text_data):
         """Handle incoming WebSocket messages"""
         try:
             data = json.loads(text_data)
-            message_type = data.get('type', 'message')
-            
-            if message_type == 'message':
-                await self.handle_message(data)
-            elif message_type == 'typing':
-                await self.handle_typing(data)
-            elif message_type == 'read_receipt':
-                await self.handle_read_receipt(data)
-            elif message_type == 'delete_message':
-                await self.handle_delete_message(data)
-            elif message_type == 'call_signal':
-                await self.handle_call_signal(data)
-            elif message_type == 'call_status':
-                await self.handle_call_status(data)
-            elif message_type == 'call_notification':
-                await self.handle_call_notification(data)
         except json.JSONDecodeError:
             await self.send(text_data=json.dumps({
                 'error': 'Invalid JSON'
             }))
+            return
+        
+        if not await self.admit_frame(data.get('type', 'message')):
+            return
+        
+        await self.dispatch_frame(self.room_id, data)
+    
+    async def admit_frame(self, message_type):
+        """Apply the per-connection token bucket for this frame type"""
+        if self.rate_limiter.allow(message_type):
+            return True
+        
+        label = message_type if message_type in self.FRAME_TYPES else 'other'
+        frame_stats.incr(f'frames.dropped.{label}')
+        # Typing frames are dropped silently; anything else tells the client
+        if message_type != 'typing':
+            await self.send(text_data=json.dumps({
+                'error': 'Rate limit exceeded',
+                'frame_type': message_type
+            }))
+        return False
+    
+    async def dispatch_frame(self, conversation_id, data):
+        """Route an inbound frame to its handler for the given conversation"""
+        message_type = data.get('type', 'message')
+        
+        # Any inbound frame (including explicit 'heartbeat' frames) keeps the
+        # user online; refresh at most twice per presence TTL
+        if time.monotonic() - getattr(self, 'last_heartbeat', 0) > get_presence_settings()['TTL'] / 2:
+            await self.update_last_seen()
+        
+        if message_type == 'message':
+            await self.handle_message(conversation_id, data)
+        elif message_type == 'typing':
+            await self.handle_typing(conversation_id, data)
+        elif message_type == 'read_receipt':
+            await self.handle_read_receipt(conversation_id, data)
+        elif message_type == 'delete_message':
+            await self.handle_delete_message(conversation_id, data)
+        elif message_type == 'call_signal':
+            await self.handle_call_signal(conversation_id, data)
+        elif message_type == 'call_status':
+            await self.handle_call_status(conversation_id, data)
+        elif message_type == 'call_notification':
+            await self.handle_call_notification(conversation_id, data)
+    
+    @staticmethod
+    def group_name(conversation_id):
+        """Channel-layer group name for a conversation"""
+        return f'chat_{conversation_id}'
+    
+    async def get_member_count(self, conversation_id):
+        """Member count for the broadcast policy, memoized briefly per socket"""
+        count, expires = self.member_counts.get(conversation_id, (None, 0))
+        if time.monotonic() >= expires:
+            count = await database_sync_to_async(access.member_count)(conversation_id)
+            self.member_counts[conversation_id] = (count, time.monotonic() + 30)
+        return count
     
-    async def handle_message(self, data):
+    async def broadcast(self, conversation_id, event, digest=False):
+        """Send a group event, applying the large-group policy (see fanout.py)
+        
+        With ``digest``, events in large groups are folded into the next
+        digest frame instead of being sent individually.
+        """
+        members = await self.get_member_count(conversation_id)
+        group = self.group_name(conversation_id)
+        if digest and is_large_group(members):
+            item = {key: value for key, value in event.items() if key not in ('type', 'conversation_id')}
+            digest_buffer.add(
+                self.channel_layer, group, conversation_id, event['type'], event['user_id'], item, members
+            )
+            return
+        
+        fanout_stats.record(str(conversation_id), event['type'], members)
+        await self.channel_layer.group_send(group, event)
+    
+    async def send_frame(self, event, payload):
+        """Send an outbound frame built from a group event to the WebSocket"""
+        await self.send(text_data=json.dumps(payload))
+    
+    async def handle_message(self, conversation_id, data):
         """Handle new message"""
         content = data.get('content', '').strip()
         reply_to_id = data.get('reply_to')
@@ -110,70 +201,162 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }))
             return
         
-        # Save message to database
-        message = await self.save_message(content, reply_to_id)
+        # Sending a message ends the sender's typing state
+        await self.stop_typing(conversation_id)
         
-        # Serialize message
-        message_data = await self.serialize_message(message)
+        # Queue the message; frames that arrive while a batch is being
+        # written are persisted together in the next batch
+        self.outbox.append({
+            'conversation_id': conversation_id,
+            'content': content,
+            'reply_to': reply_to_id,
+            'client_id': data.get('client_id'),
+        })
+        if self.outbox_task is None or self.outbox_task.done():
+            self.outbox_task = asyncio.ensure_future(self.flush_outbox())
+    
+    async def flush_outbox(self):
+        """Persist queued messages in batches and broadcast them in order"""
+        batch_size = messaging_setting('MESSAGE_BATCH_SIZE')
+        while self.outbox:
+            batch = self.outbox[:batch_size]
+            del self.outbox[:batch_size]
+            
+            try:
+                results = await self.persist_messages(batch)
+            except Exception as e:
+                logger.error(f"Error saving messages: {e}")
+                await self.send(text_data=json.dumps({
+                    'error': 'Failed to send message',
+                    'client_ids': [draft['client_id'] for draft in batch if draft['client_id']]
+                }))
+                continue
+            
+            if len(batch) > 1:
+                frame_stats.incr('messages.batched', len(batch))
+            
+            # Send message to room group
+            for conversation_id, message_data in results:
+                event = {
+                    'type': 'chat_message',
+                    'conversation_id': str(conversation_id),
+                }
+                if is_large_group(await self.get_member_count(conversation_id)):
+                    # Encoded once here instead of once per member socket
+                    event['text'] = compact_message_frame(conversation_id, message_data)
+                else:
+                    event['message'] = message_data
+                await self.broadcast(conversation_id, event)
+    
+    async def handle_typing(self, conversation_id, data):
+        """Handle typing indicator
         
-        # Send message to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'chat_message',
-                'message': message_data
+        Typing-starts are coalesced to one broadcast per TYPING_START_INTERVAL;
+        repeated starts only push back the automatic typing-stop deadline.
+        """
+        now = time.monotonic()
+        state = self.typing_state.get(conversation_id)
+        
+        if not data.get('is_typing', False):
+            if state:
+                await self.stop_typing(conversation_id)
+            else:
+                frame_stats.incr('frames.coalesced.typing_stop')
+            return
+        
+        if state:
+            state['deadline'] = now + messaging_setting('TYPING_STOP_TIMEOUT')
+            if now - state['started'] < messaging_setting('TYPING_START_INTERVAL'):
+                frame_stats.incr('frames.coalesced.typing_start')
+                return
+            state['started'] = now
+        else:
+            state = self.typing_state[conversation_id] = {
+                'started': now,
+                'deadline': now + messaging_setting('TYPING_STOP_TIMEOUT'),
             }
-        )
+            state['timer'] = asyncio.ensure_future(self.expire_typing(conversation_id))
+        
+        await self.broadcast_typing(conversation_id, True)
     
-    async def handle_typing(self, data):
-        """Handle typing indicator"""
-        is_typing = data.get('is_typing', False)
+    async def expire_typing(self, conversation_id):
+        """Send a typing-stop once the typing deadline passes without refresh"""
+        while True:
+            state = self.typing_state.get(conversation_id)
+            if state is None:
+                return
+            remaining = state['deadline'] - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(remaining)
         
-        # Send typing status to other users
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        self.typing_state.pop(conversation_id, None)
+        frame_stats.incr('typing.auto_stopped')
+        await self.broadcast_typing(conversation_id, False)
+    
+    async def stop_typing(self, conversation_id):
+        """End an active typing state and broadcast the typing-stop"""
+        state = self.typing_state.pop(conversation_id, None)
+        if state is None:
+            return
+        state['timer'].cancel()
+        await self.broadcast_typing(conversation_id, False)
+    
+    async def stop_all_typing(self):
+        for conversation_id in list(self.typing_state):
+            await self.stop_typing(conversation_id)
+    
+    async def broadcast_typing(self, conversation_id, is_typing):
+        """Send typing status to other users"""
+        frame_stats.incr('typing.broadcast')
+        await self.broadcast(
+            conversation_id,
             {
                 'type': 'typing_indicator',
+                'conversation_id': str(conversation_id),
                 'user_id': self.user.id,
                 'username': self.user.username,
                 'is_typing': is_typing
             }
         )
     
-    async def handle_read_receipt(self, data):
+    async def handle_read_receipt(self, conversation_id, data):
         """Handle read receipt"""
         message_id = data.get('message_id')
         
         if message_id:
             # Mark message as read
-            await self.mark_message_read(message_id)
+            await self.mark_message_read(conversation_id, message_id)
             
             # Send read receipt to room
-            await self.channel_layer.group_send(
-                self.room_group_name,
+            await self.broadcast(
+                conversation_id,
                 {
                     'type': 'read_receipt',
+                    'conversation_id': str(conversation_id),
                     'message_id': message_id,
                     'user_id': self.user.id,
                     'read_at': timezone.now().isoformat()
-                }
+                },
+                digest=True
             )
     
-    async def handle_delete_message(self, data):
+    async def handle_delete_message(self, conversation_id, data):
         """Handle message deletion"""
         message_id = data.get('message_id')
         
         if message_id:
             # Check if user can delete this message
-            if await self.can_delete_message(message_id):
+            if await self.can_delete_message(conversation_id, message_id):
                 # Mark message as deleted
-                await self.delete_message(message_id)
+                await self.delete_message(conversation_id, message_id)
                 
                 # Send deletion event to room
-                await self.channel_layer.group_send(
-                    self.room_group_name,
+                await self.broadcast(
+                    conversation_id,
                     {
                         'type': 'message_deleted',
+                        'conversation_id': str(conversation_id),
                         'message_id': message_id,
                         'deleted_by': self.user.id
                     }
@@ -182,142 +365,92 @@ class ChatConsumer(AsyncWebsocketConsumer):
     # Event handlers for group sends
     async def chat_message(self, event):
         """Send message to WebSocket"""
-        await self.send(text_data=json.dumps({
+        if 'text' in event:
+            # Compact frame, already encoded by the sender
+            await self.send(text_data=event['text'])
+            return
+        await self.send_frame(event, {
             'type': 'message',
             'message': event['message']
-        }))
+        })
     
     async def user_status(self, event):
         """Send user status to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame(event, {
             'type': 'user_status',
             'user_id': event['user_id'],
             'status': event['status'],
             'username': event['username']
-        }))
+        })
+    
+    async def user_status_digest(self, event):
+        """Send the latest online/offline state of users in a large group"""
+        await self.send_frame(event, {
+            'type': 'user_status_digest',
+            'statuses': event['items']
+        })
     
     async def typing_indicator(self, event):
         """Send typing indicator to WebSocket"""
         # Don't send typing indicator to the user who is typing
         if event['user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send_frame(event, {
                 'type': 'typing',
                 'user_id': event['user_id'],
                 'username': event['username'],
                 'is_typing': event['is_typing']
-            }))
+            })
     
     async def read_receipt(self, event):
         """Send read receipt to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame(event, {
             'type': 'read_receipt',
             'message_id': event['message_id'],
             'user_id': event['user_id'],
             'read_at': event['read_at']
-        }))
+        })
+    
+    async def read_receipt_digest(self, event):
+        """Send the latest read position of users in a large group"""
+        await self.send_frame(event, {
+            'type': 'read_receipt_digest',
+            'receipts': event['items']
+        })
     
     async def message_deleted(self, event):
         """Send message deletion event to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame(event, {
             'type': 'message_deleted',
             'message_id': event['message_id'],
             'deleted_by': event['deleted_by']
-        }))
+        })
     
     # Database operations
     @database_sync_to_async
-    def user_has_access(self):
+    def user_has_access(self, conversation_id):
         """Check if user has access to conversation"""
-        try:
-            conversation = Conversation.objects.get(id=self.room_id)
-            return conversation.participants.filter(id=self.user.id).exists()
-        except Conversation.DoesNotExist:
-            return False
-    
-    @database_sync_to_async
-    def save_message(self, content, reply_to_id=None):
-        """Save message to database"""
-        conversation = Conversation.objects.get(id=self.room_id)
-        
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=self.user,
-            content=content,
-            reply_to_id=reply_to_id
-        )
-        
-        # Update conversation's updated_at
-        conversation.updated_at = timezone.now()
-        conversation.save()
-        
-        # Update participant's last read
-        ConversationParticipant.objects.update_or_create(
-            conversation=conversation,
-            user=self.user,
-            defaults={
-                'last_read_message': message,
-                'last_read_at': timezone.now()
-            }
-        )
-        
-        return message
+        return access.is_participant(self.user.id, conversation_id)
     
     @database_sync_to_async
-    def serialize_message(self, message):
-        """Serialize message for WebSocket"""
-        # Prefetch related data
-        message = Message.objects.select_related(
-            'sender', 'reply_to', 'reply_to__sender'
-        ).prefetch_related('read_receipts__user').get(id=message.id)
-        
-        # Serialize read receipts
-        read_receipts = [
-            {
-                'user_id': receipt.user.id,
-                'user': {
-                    'id': receipt.user.id,
-                    'username': receipt.user.username,
-                    'full_name': receipt.user.get_full_name() or receipt.user.username
-                },
-                'read_at': receipt.read_at.isoformat()
-            } for receipt in message.read_receipts.all()
-        ]
-        
-        return {
-            'id': str(message.id),
-            'sender': {
-                'id': message.sender.id,
-                'username': message.sender.username,
-                'display_name': message.sender.get_display_name() if hasattr(message.sender, 'get_display_name') else message.sender.username
-            },
-            'content': message.content,
-            'sent_at': message.sent_at.isoformat(),
-            'message_type': message.message_type,
-            'voice_file': message.voice_file.url if message.voice_file else None,
-            'voice_duration': message.voice_duration,
-            'reply_to': {
-                'id': str(message.reply_to.id),
-                'content': message.reply_to.content[:100],
-                'sender': message.reply_to.sender.username
-            } if message.reply_to else None,
-            'read_receipts': read_receipts,
-            'read_by': list(message.read_receipts.values_list('user_id', flat=True)),  # Kept for backward compatibility
-            'is_deleted': message.is_deleted
-        }
+    def persist_messages(self, drafts):
+        """Insert queued messages and build their broadcast payloads"""
+        return persist_messages(self.user, drafts)
     
     @database_sync_to_async
-    def mark_message_read(self, message_id):
+    def mark_message_read(self, conversation_id, message_id):
         """Mark message as read"""
         try:
-            message = Message.objects.get(id=message_id, conversation_id=self.room_id)
-            MessageRead.objects.get_or_create(
+            message = Message.objects.get(id=message_id, conversation_id=conversation_id)
+            receipt, created = MessageRead.objects.get_or_create(
                 message=message,
                 user=self.user
             )
+            if created and message.sender_id != self.user.id:
+                mark_conversation_read(conversation_id, self.user, count=1)
             
             # Update participant's last read
             ConversationParticipant.objects.update_or_create(
-                conversation_id=self.room_id,
+                conversation_id=conversation_id,
                 user=self.user,
                 defaults={
                     'last_read_message': message,
@@ -328,27 +461,29 @@ class ChatConsumer(AsyncWebsocketConsumer):
             pass
     
     @database_sync_to_async
-    def can_delete_message(self, message_id):
+    def can_delete_message(self, conversation_id, message_id):
         """Check if user can delete message"""
         try:
-            message = Message.objects.get(id=message_id, conversation_id=self.room_id)
+            message = Message.objects.get(id=message_id, conversation_id=conversation_id)
             return message.sender == self.user
         except Message.DoesNotExist:
             return False
     
     @database_sync_to_async
-    def delete_message(self, message_id):
+    def delete_message(self, conversation_id, message_id):
         """Mark message as deleted"""
         try:
-            message = Message.objects.get(id=message_id, conversation_id=self.room_id)
-            message.is_deleted = True
-            message.deleted_at = timezone.now()
-            message.save()
+            message = Message.objects.get(id=message_id, conversation_id=conversation_id)
+            if not message.is_deleted:
+                message.is_deleted = True
+                message.deleted_at = timezone.now()
+                message.save()
+                release_unread(message)
         except Message.DoesNotExist:
             pass
     
-    async def handle_call_signal(self, data):
-        """Handle WebRTC signaling for video calls"""
+    async def handle_call_signal(self, conversation_id, data):
+        """Relay WebRTC signaling for video calls"""
         signal_type = data.get('signal_type')
         signal_data = data.get('signal_data')
         to_user_id = data.get('to_user_id')
@@ -360,14 +495,25 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }))
             return
         
-        # Save signal to database
-        await self.save_call_signal(call_id, to_user_id, signal_type, signal_data)
+        if signal_type not in SIGNAL_TYPES:
+            await self.send(text_data=json.dumps({
+                'error': 'Unknown signal type',
+                'signal_type': signal_type
+            }))
+            return
+        
+        # Keep a short-lived copy for late joiners instead of a database row
+        signal = await sync_to_async(get_signal_store().publish)(
+            conversation_id, call_id, self.user.id, to_user_id, signal_type, signal_data
+        )
         
         # Send signal to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        await self.broadcast(
+            conversation_id,
             {
                 'type': 'call_signal',
+                'conversation_id': str(conversation_id),
+                'signal_id': signal['id'],
                 'signal_type': signal_type,
                 'signal_data': signal_data,
                 'from_user_id': self.user.id,
@@ -376,7 +522,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }
         )
     
-    async def handle_call_status(self, data):
+    async def handle_call_status(self, conversation_id, data):
         """Handle call status updates"""
         call_id = data.get('call_id')
         status = data.get('status')
@@ -385,20 +531,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         # Update call status
-        await self.update_call_status(call_id, status)
+        await self.update_call_status(conversation_id, call_id, status)
+        
+        if status == 'ended':
+            await sync_to_async(get_signal_store().clear)([(conversation_id, call_id)])
         
         # Send status update to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        await self.broadcast(
+            conversation_id,
             {
                 'type': 'call_status_update',
+                'conversation_id': str(conversation_id),
                 'call_id': call_id,
                 'status': status,
                 'user_id': self.user.id
             }
         )
     
-    async def handle_call_notification(self, data):
+    async def handle_call_notification(self, conversation_id, data):
         """Handle call notifications (incoming call, call ended, etc.)"""
         notification_type = data.get('notification_type')
         call_id = data.get('call_id')
@@ -408,10 +558,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         # Send notification to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
+        await self.broadcast(
+            conversation_id,
             {
                 'type': 'call_notification',
+                'conversation_id': str(conversation_id),
                 'notification_type': notification_type,
                 'call_id': call_id,
                 'call_data': call_data,
@@ -424,64 +575,42 @@ class ChatConsumer(AsyncWebsocketConsumer):
         """Send call signal to WebSocket"""
         # Only send to the target user
         if event.get('to_user_id') == self.user.id or event.get('from_user_id') == self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send_frame(event, {
                 'type': 'call_signal',
+                'signal_id': event.get('signal_id'),
                 'signal_type': event['signal_type'],
                 'signal_data': event['signal_data'],
                 'from_user_id': event['from_user_id'],
                 'to_user_id': event.get('to_user_id'),
                 'call_id': event['call_id']
-            }))
+            })
     
     async def call_status_update(self, event):
         """Send call status update to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame(event, {
             'type': 'call_status_update',
             'call_id': event['call_id'],
             'status': event['status'],
             'user_id': event['user_id']
-        }))
+        })
     
     async def call_notification(self, event):
         """Send call notification to WebSocket"""
         # Don't send notification to the user who initiated it
         if event['from_user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send_frame(event, {
                 'type': 'call_notification',
                 'notification_type': event['notification_type'],
                 'call_id': event['call_id'],
                 'call_data': event['call_data'],
                 'from_user_id': event['from_user_id']
-            }))
-    
-    @database_sync_to_async
-    def save_call_signal(self, call_id, to_user_id, signal_type, signal_data):
-        """Save call signal to database"""
-        try:
-            call = VideoCall.objects.get(id=call_id)
-            to_user = None
-            if to_user_id:
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                to_user = User.objects.get(id=to_user_id)
-            
-            CallSignal.objects.create(
-                call=call,
-                from_user=self.user,
-                to_user=to_user,
-                signal_type=signal_type,
-                signal_data=signal_data
-            )
-        except (VideoCall.DoesNotExist, Exception) as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error saving call signal: {e}")
+            })
     
     @database_sync_to_async
-    def update_call_status(self, call_id, status):
-        """Update call status"""
+    def update_call_status(self, conversation_id, call_id, status):
+        """Persist call lifecycle changes"""
         try:
-            call = VideoCall.objects.get(id=call_id)
+            call = VideoCall.objects.get(id=call_id, conversation_id=conversation_id)
             
             # Update call status
             if status == 'started' and not call.started_at:
@@ -492,11 +621,130 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 call.ended_at = timezone.now()
             
             call.save()
-        except VideoCall.DoesNotExist:
+        except (VideoCall.DoesNotExist, ValidationError, ValueError):
             pass
     
+    async def update_last_seen(self):
+        """Refresh the user's presence heartbeat"""
+        self.last_heartbeat = time.monotonic()
+        await sync_to_async(get_presence().heartbeat)(self.user.id)
+
+class UserChatConsumer(ChatConsumer):
+    """Single per-user WebSocket multiplexing all of the user's conversations
+    
+    Every inbound frame must carry a ``conversation_id`` and every outbound
+    frame is tagged with one, so clients hold one socket instead of one per
+    open conversation. Clients can ``subscribe``/``unsubscribe`` to
+    conversations created or left after the socket was opened.
+    """
+    
+    async def connect(self):
+        """Join every conversation group the user belongs to"""
+        self.user = self.scope["user"]
+        self.conversation_ids = set()
+        
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        
+        # One query for all memberships instead of one access check per socket
+        for conversation_id in await self.get_conversation_ids():
+            await self.join_conversation(conversation_id)
+        
+        await self.accept()
+        
+        for conversation_id in self.conversation_ids:
+            await self.broadcast_user_status(conversation_id, 'online')
+        
+        # Single presence update for the user, not one per conversation
+        await self.update_last_seen()
+    
+    async def disconnect(self, close_code):
+        """Leave all conversation groups"""
+        await self.stop_all_typing()
+        for conversation_id in list(getattr(self, 'conversation_ids', ())):
+            await self.broadcast_user_status(conversation_id, 'offline')
+            await self.leave_conversation(conversation_id)
+    
+    async def receive(self, text_data):
+        """Handle incoming multiplexed frames"""
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send(text_data=json.dumps({
+                'error': 'Invalid JSON'
+            }))
+            return
+        
+        message_type = data.get('type', 'message')
+        conversation_id = str(data.get('conversation_id') or '')
+        
+        if not await self.admit_frame(message_type):
+            return
+        
+        if message_type == 'heartbeat':
+            await self.update_last_seen()
+        elif message_type == 'subscribe':
+            await self.handle_subscribe(conversation_id)
+        elif message_type == 'unsubscribe':
+            await self.handle_unsubscribe(conversation_id)
+        elif conversation_id in self.conversation_ids:
+            await self.dispatch_frame(conversation_id, data)
+        else:
+            await self.send(text_data=json.dumps({
+                'error': 'Not subscribed to conversation',
+                'conversation_id': conversation_id or None
+            }))
+    
+    async def handle_subscribe(self, conversation_id):
+        """Subscribe to a conversation after checking membership"""
+        if conversation_id not in self.conversation_ids:
+            if not conversation_id or not await self.user_has_access(conversation_id):
+                await self.send(text_data=json.dumps({
+                    'error': 'Conversation not found or access denied',
+                    'conversation_id': conversation_id or None
+                }))
+                return
+            await self.join_conversation(conversation_id)
+            await self.broadcast_user_status(conversation_id, 'online')
+        
+        await self.send(text_data=json.dumps({
+            'type': 'subscribed',
+            'conversation_id': conversation_id
+        }))
+    
+    async def handle_unsubscribe(self, conversation_id):
+        """Stop receiving frames for a conversation"""
+        if conversation_id in self.conversation_ids:
+            await self.stop_typing(conversation_id)
+            await self.broadcast_user_status(conversation_id, 'offline')
+            await self.leave_conversation(conversation_id)
+        
+        await self.send(text_data=json.dumps({
+            'type': 'unsubscribed',
+            'conversation_id': conversation_id
+        }))
+    
+    async def join_conversation(self, conversation_id):
+        await self.channel_layer.group_add(
+            self.group_name(conversation_id),
+            self.channel_name
+        )
+        self.conversation_ids.add(conversation_id)
+    
+    async def leave_conversation(self, conversation_id):
+        await self.channel_layer.group_discard(
+            self.group_name(conversation_id),
+            self.channel_name
+        )
+        self.conversation_ids.discard(conversation_id)
+    
+    async def send_frame(self, event, payload):
+        """Tag outbound frames with the conversation they belong to"""
+        payload['conversation_id'] = event.get('conversation_id')
+        await self.send(text_data=json.dumps(payload))
+    
     @database_sync_to_async
-    def update_last_seen(self):
-        """Update user's last seen timestamp"""
-        # This could be extended to track online status
-        pass
\ No newline at end of file
+    def get_conversation_ids(self):
+        """IDs of all conversations the user participates in"""
+        return list(access.conversation_ids(self.user.id))
@@ -0,0 +1,87 @@
+# startup_hub/apps/messaging/fanout.py
+"""
+Broadcast policy for conversation groups.
+
+Small conversations get every event as it happens. At or above
+``LARGE_GROUP_THRESHOLD`` members:
+
+* read receipts and online/offline events are buffered per conversation and
+  sent as one digest frame per ``DIGEST_INTERVAL`` holding the latest state
+  of each user, so a burst of N receipts costs one send instead of N;
+* chat messages go out as a compact frame (default-valued fields dropped)
+  that is JSON-encoded once per worker rather than once per member socket.
+
+Buffers live in the ASGI worker's event loop; each worker digests the
+events its own sockets produce.
+"""
+import asyncio
+import json
+
+from .conf import messaging_setting
+from .metrics import fanout_stats
+
+# Message fields clients can assume when a compact frame omits them
+COMPACT_DEFAULTS = {
+    'voice_file': None,
+    'voice_duration': None,
+    'reply_to': None,
+    'read_receipts': [],
+    'read_by': [],
+    'is_deleted': False,
+    'message_type': 'text',
+}
+
+
+def is_large_group(member_count):
+    return member_count >= messaging_setting('LARGE_GROUP_THRESHOLD')
+
+
+def compact_message_frame(conversation_id, message):
+    """Pre-encoded ``message`` frame without fields that hold their defaults"""
+    return json.dumps({
+        'type': 'message',
+        'format': 'compact',
+        'conversation_id': str(conversation_id),
+        'message': {
+            key: value for key, value in message.items()
+            if key not in COMPACT_DEFAULTS or value != COMPACT_DEFAULTS[key]
+        }
+    })
+
+
+class DigestBuffer:
+    """Per-conversation buffers flushed as digest events after an interval"""
+
+    def __init__(self):
+        # (conversation_id, kind) -> {'members': count, 'items': {user_id: latest item}}
+        self.pending = {}
+        self.tasks = set()
+
+    def add(self, channel_layer, group, conversation_id, kind, user_id, item, members):
+        """Buffer ``item`` as the latest ``kind`` state of ``user_id``"""
+        key = (str(conversation_id), kind)
+        buffer = self.pending.get(key)
+        if buffer is None:
+            buffer = self.pending[key] = {'members': members, 'items': {}}
+            task = asyncio.ensure_future(self.flush_later(channel_layer, group, key))
+            # Hold a reference until the flush has run
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        buffer['items'][user_id] = item
+        fanout_stats.record(key[0], kind, members, digested=True)
+
+    async def flush_later(self, channel_layer, group, key):
+        await asyncio.sleep(messaging_setting('DIGEST_INTERVAL'))
+        buffer = self.pending.pop(key, None)
+        if not buffer or not buffer['items']:
+            return
+        conversation_id, kind = key
+        fanout_stats.record(conversation_id, f'{kind}_digest', buffer['members'])
+        await channel_layer.group_send(group, {
+            'type': f'{kind}_digest',
+            'conversation_id': conversation_id,
+            'items': list(buffer['items'].values())
+        })
+
+
+digest_buffer = DigestBuffer()
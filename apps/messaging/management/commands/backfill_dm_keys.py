@@ -0,0 +1,71 @@
+# startup_hub/apps/messaging/management/commands/backfill_dm_keys.py
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from apps.messaging.models import Conversation
+
+
+class Command(BaseCommand):
+    help = 'Set dm_key on existing 1-on-1 conversations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Conversations updated per query',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing',
+        )
+
+    def handle(self, *args, **options):
+        Participants = Conversation.participants.through
+
+        # Newest first, so the most recently active duplicate keeps the key
+        candidate_ids = list(
+            Conversation.objects.filter(
+                is_group=False,
+                conversation_type='general',
+                dm_key__isnull=True
+            ).annotate(
+                participant_count=Count('participants')
+            ).filter(
+                participant_count=2
+            ).order_by('-updated_at').values_list('id', flat=True)
+        )
+        taken = set(Conversation.objects.filter(dm_key__isnull=False).values_list('dm_key', flat=True))
+
+        updated = 0
+        duplicates = 0
+        batch_size = options['batch_size']
+        for start in range(0, len(candidate_ids), batch_size):
+            batch_ids = candidate_ids[start:start + batch_size]
+
+            members = {}
+            for conversation_id, user_id in Participants.objects.filter(
+                conversation_id__in=batch_ids
+            ).values_list('conversation_id', 'user_id'):
+                members.setdefault(conversation_id, []).append(user_id)
+
+            changed = []
+            for conversation_id in batch_ids:
+                dm_key = Conversation.make_dm_key(*members[conversation_id])
+                if dm_key in taken:
+                    # An older duplicate of a pair that already has a DM
+                    duplicates += 1
+                    continue
+                taken.add(dm_key)
+                changed.append(Conversation(id=conversation_id, dm_key=dm_key))
+
+            if changed and not options['dry_run']:
+                Conversation.objects.bulk_update(changed, ['dm_key'])
+            updated += len(changed)
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Set dm_key on {updated} conversations; '
+            f'{duplicates} duplicate conversations left without a key'
+        ))
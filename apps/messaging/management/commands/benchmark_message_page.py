@@ -0,0 +1,104 @@
+# startup_hub/apps/messaging/management/commands/benchmark_message_page.py
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.core.benchmarks import require_scratch_database
+from apps.messaging.models import Conversation, Message, MessageReaction, MessageRead
+from apps.messaging.serializers import MessageSerializer
+from apps.users.models import User
+
+EMOJIS = ['👍', '❤️', '😂', '🎉', '🚀']
+
+
+class Command(BaseCommand):
+    help = 'Count the queries needed to serialize a page of chat messages (DEBUG or test databases only; apps.messaging.tests pins the budget)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=50,
+            help='Messages in the page',
+        )
+        parser.add_argument(
+            '--participants',
+            type=int,
+            default=5,
+            help='Conversation participants (each may react to and read every message)',
+        )
+        parser.add_argument(
+            '--max-queries',
+            type=int,
+            default=10,
+            help='Fail if serializing the page takes more queries than this',
+        )
+
+    def handle(self, *args, **options):
+        require_scratch_database()
+
+        suffix = uuid.uuid4().hex[:8]
+        users = [
+            User.objects.create_user(
+                email=f'bench_{suffix}_{index}@example.com',
+                username=f'bench_{suffix}_{index}'
+            )
+            for index in range(options['participants'])
+        ]
+        conversation = Conversation.objects.create()
+
+        try:
+            conversation.participants.add(*users)
+            messages = Message.objects.bulk_create([
+                Message(conversation=conversation, sender=random.choice(users), content=f'benchmark {index}')
+                for index in range(options['messages'])
+            ])
+            MessageReaction.objects.bulk_create([
+                MessageReaction(message=message, user=user, emoji=random.choice(EMOJIS))
+                for message in messages for user in users if random.random() < 0.5
+            ])
+            MessageRead.objects.bulk_create([
+                MessageRead(message=message, user=user)
+                for message in messages for user in users if random.random() < 0.7
+            ])
+
+            viewer = users[0]
+            request = Request(APIRequestFactory().get('/api/messaging/messages/'))
+            request.user = viewer
+            # Same queryset shape as MessageViewSet.get_queryset
+            queryset = Message.objects.filter(
+                conversation=conversation,
+                is_deleted=False
+            ).select_related('sender', 'reply_to').order_by('sent_at')
+
+            page_queries, page_time = self.measure(
+                lambda: MessageSerializer(queryset, many=True, context={'request': request}).data
+            )
+            single_queries, single_time = self.measure(
+                lambda: [MessageSerializer(message, context={'request': request}).data for message in queryset]
+            )
+        finally:
+            conversation.delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.stdout.write(f'Page of {options["messages"]} messages, {options["participants"]} participants')
+        self.stdout.write(f'Batched page:      {page_queries} queries, {page_time * 1000:.1f} ms')
+        self.stdout.write(f'Message by message: {single_queries} queries, {single_time * 1000:.1f} ms')
+
+        if page_queries > options['max_queries']:
+            raise CommandError(f'Page took {page_queries} queries, budget is {options["max_queries"]}')
+
+        self.stdout.write(self.style.SUCCESS('Query budget met'))
+
+    def measure(self, serialize):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            serialize()
+            elapsed = time.perf_counter() - started
+        return len(queries), elapsed
@@ -0,0 +1,148 @@
+# startup_hub/apps/messaging/management/commands/benchmark_message_send.py
+import asyncio
+import time
+import uuid
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from apps.core.benchmarks import require_scratch_database
+from apps.messaging.conf import DEFAULTS
+from apps.messaging.metrics import percentile
+from apps.messaging.models import Conversation
+from apps.messaging.routing import websocket_urlpatterns
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Measure WebSocket message send-to-receive latency over the in-memory channel layer (DEBUG or test databases only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=200,
+            help='Number of messages to send',
+        )
+        parser.add_argument(
+            '--burst',
+            type=int,
+            default=1,
+            help='Messages sent back-to-back before waiting for delivery',
+        )
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            default=None,
+            help='Fail if p95 latency exceeds this many milliseconds',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=10,
+            help='Seconds to wait for a message to be delivered',
+        )
+
+    def handle(self, *args, **options):
+        require_scratch_database()
+
+        messaging_settings = dict(getattr(settings, 'MESSAGING_SETTINGS', {}))
+        # The benchmark measures persistence, not the inbound rate limiter
+        frame_rate_limits = dict(messaging_settings.get('FRAME_RATE_LIMITS', DEFAULTS['FRAME_RATE_LIMITS']))
+        frame_rate_limits['message'] = (options['messages'], options['messages'])
+        messaging_settings['FRAME_RATE_LIMITS'] = frame_rate_limits
+
+        channel_layers = {
+            'default': {
+                'BACKEND': 'channels.layers.InMemoryChannelLayer',
+                'CONFIG': {'capacity': max(100, options['messages'] * 2)},
+            }
+        }
+
+        suffix = uuid.uuid4().hex[:8]
+        sender = User.objects.create_user(
+            email=f'bench_sender_{suffix}@example.com',
+            username=f'bench_sender_{suffix}'
+        )
+        recipient = User.objects.create_user(
+            email=f'bench_recipient_{suffix}@example.com',
+            username=f'bench_recipient_{suffix}'
+        )
+        conversation = Conversation.objects.create()
+        conversation.participants.add(sender, recipient)
+
+        try:
+            with override_settings(CHANNEL_LAYERS=channel_layers, MESSAGING_SETTINGS=messaging_settings):
+                latencies, elapsed = asyncio.run(
+                    self.run_benchmark(conversation, sender, recipient, options)
+                )
+        finally:
+            conversation.delete()
+            sender.delete()
+            recipient.delete()
+
+        latencies_ms = [latency * 1000 for latency in latencies]
+        p95 = percentile(latencies_ms, 95)
+
+        self.stdout.write(f'Messages delivered: {len(latencies_ms)}/{options["messages"]} (burst {options["burst"]})')
+        self.stdout.write(f'Throughput: {len(latencies_ms) / elapsed:.1f} msg/s')
+        self.stdout.write(
+            f'Latency ms: p50 {percentile(latencies_ms, 50):.2f}  p95 {p95:.2f}  '
+            f'p99 {percentile(latencies_ms, 99):.2f}  max {max(latencies_ms, default=0):.2f}'
+        )
+
+        if len(latencies_ms) < options['messages']:
+            raise CommandError(f'{options["messages"] - len(latencies_ms)} messages were not delivered')
+        if options['budget_ms'] is not None and p95 > options['budget_ms']:
+            raise CommandError(f'p95 latency {p95:.2f}ms exceeds budget of {options["budget_ms"]}ms')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark completed'))
+
+    async def run_benchmark(self, conversation, sender, recipient, options):
+        application = URLRouter(websocket_urlpatterns)
+        path = f'/ws/chat/{conversation.id}/'
+
+        sender_socket = WebsocketCommunicator(application, path)
+        sender_socket.scope['user'] = sender
+        recipient_socket = WebsocketCommunicator(application, path)
+        recipient_socket.scope['user'] = recipient
+
+        for socket in (sender_socket, recipient_socket):
+            connected, _ = await socket.connect()
+            if not connected:
+                raise CommandError('WebSocket connection was rejected')
+
+        sent_at = {}
+        latencies = []
+        started = time.perf_counter()
+        try:
+            remaining = options['messages']
+            while remaining:
+                burst = min(options['burst'], remaining)
+                remaining -= burst
+                for _ in range(burst):
+                    client_id = uuid.uuid4().hex
+                    sent_at[client_id] = time.perf_counter()
+                    await sender_socket.send_json_to({
+                        'type': 'message',
+                        'content': f'benchmark {len(sent_at)}',
+                        'client_id': client_id,
+                    })
+
+                delivered = 0
+                while delivered < burst:
+                    try:
+                        frame = await recipient_socket.receive_json_from(timeout=options['timeout'])
+                    except asyncio.TimeoutError:
+                        return latencies, time.perf_counter() - started
+                    client_id = frame.get('message', {}).get('client_id') if frame.get('type') == 'message' else None
+                    if client_id in sent_at:
+                        latencies.append(time.perf_counter() - sent_at[client_id])
+                        delivered += 1
+            return latencies, time.perf_counter() - started
+        finally:
+            await sender_socket.disconnect()
+            await recipient_socket.disconnect()
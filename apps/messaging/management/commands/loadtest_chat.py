@@ -0,0 +1,353 @@
+# startup_hub/apps/messaging/management/commands/loadtest_chat.py
+import asyncio
+import random
+import time
+import tracemalloc
+import uuid
+from collections import Counter, defaultdict
+
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from apps.core.benchmarks import require_scratch_database
+from apps.messaging.conf import DEFAULTS
+from apps.messaging.metrics import fanout_stats, frame_stats, percentile
+from apps.messaging.models import Conversation
+from apps.messaging.routing import websocket_urlpatterns
+from apps.users.models import User
+
+
+class QueryCounter:
+    """Database execute wrapper that counts statements"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@database_sync_to_async
+def install_query_counter(counter):
+    # Consumers run their database calls on the shared thread-sensitive
+    # executor, so the wrapper has to be installed on that thread's connection
+    connection.execute_wrappers.append(counter)
+
+
+@database_sync_to_async
+def remove_query_counter(counter):
+    connection.execute_wrappers.remove(counter)
+
+
+class SimulatedClient:
+    """One WebSocket connection plus what it has seen"""
+
+    def __init__(self, user, communicator, conversation_ids):
+        self.user = user
+        self.communicator = communicator
+        self.conversation_ids = conversation_ids
+        # conversation_id -> id of the newest message received there
+        self.last_message_ids = {}
+        self.reader = None
+
+
+class Command(BaseCommand):
+    help = 'Load-test the chat WebSocket consumers with simulated users over the in-memory channel layer (DEBUG or test databases only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=50,
+            help='Number of simulated users',
+        )
+        parser.add_argument(
+            '--conversations',
+            type=int,
+            default=20,
+            help='Number of conversations',
+        )
+        parser.add_argument(
+            '--members',
+            type=int,
+            default=5,
+            help='Participants per conversation',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['user', 'room'],
+            default='user',
+            help='One multiplexed socket per user, or one socket per user and conversation',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds to generate load',
+        )
+        parser.add_argument(
+            '--message-rate',
+            type=float,
+            default=0.2,
+            help='Messages per second per user',
+        )
+        parser.add_argument(
+            '--typing-rate',
+            type=float,
+            default=0.5,
+            help='Typing frames per second per user',
+        )
+        parser.add_argument(
+            '--read-rate',
+            type=float,
+            default=0.2,
+            help='Read receipts per second per user',
+        )
+        parser.add_argument(
+            '--drain',
+            type=float,
+            default=2,
+            help='Seconds to wait for in-flight frames after the load stops',
+        )
+        parser.add_argument(
+            '--no-rate-limit',
+            action='store_true',
+            help='Lift the per-connection inbound frame limits',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Random seed for membership and traffic',
+        )
+
+    def handle(self, *args, **options):
+        if options['members'] > options['users']:
+            raise CommandError('--members cannot exceed --users')
+        require_scratch_database()
+
+        self.random = random.Random(options['seed'])
+
+        messaging_settings = dict(getattr(settings, 'MESSAGING_SETTINGS', {}))
+        if options['no_rate_limit']:
+            messaging_settings['FRAME_RATE_LIMITS'] = {
+                frame_type: (10 ** 6, 10 ** 6) for frame_type in DEFAULTS['FRAME_RATE_LIMITS']
+            }
+        channel_layers = {
+            'default': {
+                'BACKEND': 'channels.layers.InMemoryChannelLayer',
+                'CONFIG': {'capacity': 10000},
+            }
+        }
+
+        users, conversations, memberships = self.create_fixtures(options)
+        try:
+            with override_settings(CHANNEL_LAYERS=channel_layers, MESSAGING_SETTINGS=messaging_settings):
+                report = asyncio.run(self.run_load(users, memberships, options))
+        finally:
+            Conversation.objects.filter(id__in=[conversation.id for conversation in conversations]).delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.write_report(report, options)
+
+    def create_fixtures(self, options):
+        """Create throwaway users and conversations for the run"""
+        suffix = uuid.uuid4().hex[:8]
+        users = [
+            User.objects.create_user(
+                email=f'bench_{suffix}_{index}@example.com',
+                username=f'bench_{suffix}_{index}'
+            )
+            for index in range(options['users'])
+        ]
+        conversations = []
+        # user id -> ids of the conversations they belong to
+        memberships = defaultdict(list)
+        for _ in range(options['conversations']):
+            conversation = Conversation.objects.create()
+            members = self.random.sample(users, options['members'])
+            conversation.participants.add(*members)
+            conversations.append(conversation)
+            for user in members:
+                memberships[user.id].append(str(conversation.id))
+        return users, conversations, memberships
+
+    async def run_load(self, users, memberships, options):
+        application = URLRouter(websocket_urlpatterns)
+
+        # Connect everything while tracing allocations, then stop tracing so
+        # it does not skew the latency numbers
+        sockets = []
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        connect_started = time.perf_counter()
+        for user in users:
+            conversation_ids = memberships[user.id]
+            if options['mode'] == 'user':
+                paths = [('/ws/chat/', conversation_ids)]
+            else:
+                paths = [(f'/ws/chat/{conversation_id}/', [conversation_id]) for conversation_id in conversation_ids]
+            for path, ids in paths:
+                communicator = WebsocketCommunicator(application, path)
+                communicator.scope['user'] = user
+                connected, _ = await communicator.connect()
+                if not connected:
+                    raise CommandError(f'Connection to {path} was rejected')
+                sockets.append(SimulatedClient(user, communicator, ids))
+        connect_time = time.perf_counter() - connect_started
+        memory_per_connection = (tracemalloc.get_traced_memory()[0] - memory_before) / max(len(sockets), 1)
+        tracemalloc.stop()
+
+        sent_at = {}
+        latencies = []
+        sent = Counter()
+        received = Counter()
+        errors = Counter()
+
+        async def read_frames(client):
+            while True:
+                frame = await client.communicator.receive_json_from(timeout=3600)
+                now = time.perf_counter()
+                if 'error' in frame:
+                    errors[frame['error']] += 1
+                    continue
+                received[frame.get('type')] += 1
+                if frame.get('type') != 'message':
+                    continue
+                message = frame['message']
+                conversation_id = frame.get('conversation_id') or client.conversation_ids[0]
+                client.last_message_ids[conversation_id] = message['id']
+                if message['sender']['id'] != client.user.id and message.get('client_id') in sent_at:
+                    latencies.append(now - sent_at[message['client_id']])
+
+        async def drive(user_clients, deadline):
+            rates = [
+                ('message', options['message_rate']),
+                ('typing', options['typing_rate']),
+                ('read_receipt', options['read_rate']),
+            ]
+            total_rate = sum(rate for _, rate in rates)
+            if not total_rate:
+                return
+            while True:
+                await asyncio.sleep(self.random.expovariate(total_rate))
+                if time.perf_counter() >= deadline:
+                    return
+                frame_type = self.random.choices(
+                    [name for name, _ in rates], weights=[rate for _, rate in rates]
+                )[0]
+                client = self.random.choice(user_clients)
+                conversation_id = self.random.choice(client.conversation_ids)
+                frame = {'type': frame_type}
+                if options['mode'] == 'user':
+                    frame['conversation_id'] = conversation_id
+                if frame_type == 'message':
+                    frame['client_id'] = uuid.uuid4().hex
+                    frame['content'] = f'load test {len(sent_at)}'
+                    sent_at[frame['client_id']] = time.perf_counter()
+                elif frame_type == 'typing':
+                    frame['is_typing'] = True
+                else:
+                    message_id = client.last_message_ids.get(conversation_id)
+                    if not message_id:
+                        continue
+                    frame['message_id'] = message_id
+                sent[frame_type] += 1
+                await client.communicator.send_json_to(frame)
+
+        clients_by_user = defaultdict(list)
+        for client in sockets:
+            if client.conversation_ids:
+                clients_by_user[client.user.id].append(client)
+            client.reader = asyncio.ensure_future(read_frames(client))
+
+        stats_before = frame_stats.snapshot()
+        fanout_stats.reset()
+        query_counter = QueryCounter()
+        await install_query_counter(query_counter)
+        started = time.perf_counter()
+        deadline = started + options['duration']
+        try:
+            await asyncio.gather(*[
+                drive(user_clients, deadline) for user_clients in clients_by_user.values()
+            ])
+            await asyncio.sleep(options['drain'])
+            elapsed = time.perf_counter() - started
+        finally:
+            await remove_query_counter(query_counter)
+            for client in sockets:
+                client.reader.cancel()
+            await asyncio.gather(*[client.reader for client in sockets], return_exceptions=True)
+            for client in sockets:
+                await client.communicator.disconnect()
+
+        stats_after = frame_stats.snapshot()
+        return {
+            'connections': len(sockets),
+            'connect_time': connect_time,
+            'memory_per_connection': memory_per_connection,
+            'elapsed': elapsed,
+            'sent': sent,
+            'received': received,
+            'errors': errors,
+            'latencies': latencies,
+            'queries': query_counter.count,
+            'fanout': fanout_stats.snapshot(limit=5),
+            'frame_stats': {
+                key: value - stats_before.get(key, 0)
+                for key, value in stats_after.items()
+                if value != stats_before.get(key, 0)
+            },
+        }
+
+    def write_report(self, report, options):
+        latencies_ms = [latency * 1000 for latency in report['latencies']]
+        messages_sent = report['sent']['message']
+
+        self.stdout.write(
+            f'Connections: {report["connections"]} ({options["mode"]} mode) for {options["users"]} users '
+            f'in {options["conversations"]} conversations of {options["members"]}'
+        )
+        self.stdout.write(
+            f'Connect time: {report["connect_time"]:.2f}s, '
+            f'memory per connection: {report["memory_per_connection"] / 1024:.1f} KiB'
+        )
+        self.stdout.write(
+            'Frames sent: ' + ', '.join(f'{name} {count}' for name, count in sorted(report['sent'].items()))
+        )
+        self.stdout.write(
+            'Frames received: ' + ', '.join(f'{name} {count}' for name, count in sorted(report['received'].items()))
+        )
+        if report['errors']:
+            self.stdout.write(self.style.WARNING(
+                'Errors: ' + ', '.join(f'{name} {count}' for name, count in report['errors'].most_common())
+            ))
+        self.stdout.write(
+            f'Throughput: {messages_sent / report["elapsed"]:.1f} msg/s in, '
+            f'{len(latencies_ms) / report["elapsed"]:.1f} fan-out deliveries/s out'
+        )
+        self.stdout.write(
+            f'Fan-out latency ms: p50 {percentile(latencies_ms, 50):.2f}  p95 {percentile(latencies_ms, 95):.2f}  '
+            f'p99 {percentile(latencies_ms, 99):.2f}  max {max(latencies_ms, default=0):.2f}'
+        )
+        self.stdout.write(
+            f'DB queries: {report["queries"]} total, '
+            f'{report["queries"] / max(messages_sent, 1):.2f} per message (all frame types included)'
+        )
+        for key, value in sorted(report['frame_stats'].items()):
+            self.stdout.write(f'  {key}: {value}')
+        self.stdout.write('Busiest conversations by fan-out:')
+        for counters in report['fanout']:
+            self.stdout.write(
+                f'  {counters["conversation_id"]}: {counters["members"]} members, '
+                f'{counters["events"]} events, {counters["deliveries"]} deliveries, '
+                f'{counters["digested"]} digested'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Load test completed'))
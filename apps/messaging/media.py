@@ -0,0 +1,245 @@
+# startup_hub/apps/messaging/media.py
+"""
+Streaming of voice messages and message attachments.
+
+Serializers hand out signed stream URLs (``stream_url``) rather than raw
+storage URLs, so ``<audio>`` elements can fetch them without an auth header.
+A URL stays the same for a whole ``MEDIA_URL_WINDOW`` so browsers can cache
+it, and stops working one to two windows after it was issued.
+
+For local storage the file is served by ``ranged_file_response``: single
+byte ranges get a 206, ETag/Last-Modified allow 304s and ``If-Range``, and
+whole files or open-ended ranges (``bytes=N-``, what media elements send when
+seeking) are handed to ``FileResponse`` as the open file so a WSGI server with
+``wsgi.file_wrapper`` can sendfile them. Remote storage (S3) handles ranges
+itself, so the stream URL redirects there.
+
+Duration and waveform of voice messages are computed once at upload
+(``audio_summary``) and stored on the message.
+"""
+import array
+import math
+import mimetypes
+import os
+import sys
+import time
+import wave
+
+from django.core.signing import BadSignature, Signer
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseRedirect
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .conf import messaging_setting
+from .models import Message, MessageAttachment
+
+MEDIA_SALT = 'messaging.media'
+
+RANGE_PREFIX = 'bytes='
+
+
+def media_file(kind, pk):
+    """Return ``(field_file, filename)`` for a streamable object, or raise Http404"""
+    try:
+        if kind == 'voice':
+            message = Message.objects.only('voice_file').get(pk=pk, message_type='voice', is_deleted=False)
+            field_file = message.voice_file
+            filename = os.path.basename(field_file.name)
+        elif kind == 'attachment':
+            attachment = MessageAttachment.objects.only('file', 'file_name').get(pk=pk)
+            field_file = attachment.file
+            filename = attachment.file_name
+        else:
+            raise Http404
+    except (Message.DoesNotExist, MessageAttachment.DoesNotExist, ValueError):
+        raise Http404
+    if not field_file:
+        raise Http404
+    return field_file, filename
+
+
+def sign_media(kind, pk):
+    """Signed token for a stream URL, unchanged for the current window"""
+    window = messaging_setting('MEDIA_URL_WINDOW')
+    expires = (int(time.time()) // window + 2) * window
+    return Signer(salt=MEDIA_SALT).sign(f'{kind}:{pk}:{expires}')
+
+
+def unsign_media(token):
+    """Return ``(kind, pk, expires)`` from a token, or raise BadSignature"""
+    kind, pk, expires = Signer(salt=MEDIA_SALT).unsign(token).split(':')
+    return kind, pk, int(expires)
+
+
+def stream_url(request, kind, pk):
+    url = reverse('media-stream', args=[sign_media(kind, pk)])
+    if request and hasattr(request, 'build_absolute_uri'):
+        return request.build_absolute_uri(url)
+    return url
+
+
+def parse_range(header, size):
+    """Parse a single ``bytes=`` range into inclusive ``(start, end)``
+
+    Returns None when the whole file should be sent (no header, a unit other
+    than bytes, or several ranges) and raises ValueError when the range
+    cannot be satisfied.
+    """
+    if not header or not header.startswith(RANGE_PREFIX) or ',' in header:
+        return None
+    first, _, last = header[len(RANGE_PREFIX):].strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end or start >= size:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+class RangeFile:
+    """Read at most ``length`` bytes from an open file"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def ranged_file_response(request, path, filename, content_type=None):
+    """Serve a local file with Range, ETag and conditional request support"""
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{size:x}')
+    last_modified = int(stat.st_mtime)
+
+    def with_validators(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = f'private, max-age={messaging_setting("MEDIA_URL_WINDOW")}'
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return with_validators(not_modified)
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if if_range is None or if_range == etag or if_range == http_date(last_modified):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return with_validators(response)
+
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type, filename=filename)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        if end == size - 1:
+            # Open-ended range: the file itself, so sendfile still applies
+            response = FileResponse(file, content_type=content_type, filename=filename, status=206)
+        else:
+            response = FileResponse(
+                RangeFile(file, end - start + 1), content_type=content_type, filename=filename, status=206
+            )
+            response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return with_validators(response)
+
+
+@require_safe
+def stream_media(request, token):
+    """Stream a voice message or attachment named by a signed token"""
+    try:
+        kind, pk, expires = unsign_media(token)
+    except (BadSignature, ValueError):
+        raise Http404
+    if expires < time.time():
+        return HttpResponseForbidden('Media link expired')
+
+    field_file, filename = media_file(kind, pk)
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        # Remote storage serves ranges itself
+        return HttpResponseRedirect(field_file.url)
+    if not os.path.exists(path):
+        raise Http404
+
+    content_type = mimetypes.guess_type(filename)[0]
+    if kind == 'voice' and content_type and content_type.startswith('video/'):
+        # .webm/.ogg voice notes are audio-only
+        content_type = 'audio/' + content_type.split('/', 1)[1]
+    return ranged_file_response(request, path, filename, content_type)
+
+
+def audio_summary(file, points=None):
+    """Return ``(duration, waveform)`` for an uploaded WAV file
+
+    ``waveform`` holds ``points`` peak levels between 0 and 1. Compressed
+    formats cannot be decoded without an audio library, so they (and
+    unreadable files) give ``(None, [])`` and the client-reported values are
+    kept instead.
+    """
+    points = points or messaging_setting('WAVEFORM_POINTS')
+    typecodes = {1: 'b', 2: 'h', 4: 'i'}
+    file.seek(0)
+    try:
+        with wave.open(file, 'rb') as audio:
+            frames = audio.getnframes()
+            rate = audio.getframerate()
+            width = audio.getsampwidth()
+            if not rate:
+                return None, []
+            duration = round(frames / rate, 2)
+            if width not in typecodes or not frames:
+                return duration, []
+
+            full_scale = float(2 ** (8 * width - 1))
+            frames_per_point = max(math.ceil(frames / points), 1)
+            waveform = []
+            while True:
+                chunk = audio.readframes(frames_per_point)
+                if not chunk:
+                    break
+                if width == 1:
+                    # 8-bit WAV samples are unsigned
+                    samples = [sample - 128 for sample in chunk]
+                else:
+                    samples = array.array(typecodes[width], chunk[:len(chunk) - len(chunk) % width])
+                    if sys.byteorder == 'big':
+                        samples.byteswap()
+                peak = max((abs(sample) for sample in samples), default=0)
+                waveform.append(round(min(peak / full_scale, 1.0), 3))
+            return duration, waveform
+    except (wave.Error, EOFError):
+        return None, []
+    finally:
+        file.seek(0)
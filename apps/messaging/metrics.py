@@ -0,0 +1,99 @@
+# startup_hub/apps/messaging/metrics.py
+"""
+In-process counters for the real-time messaging layer.
+
+Each ASGI worker keeps its own counters; they are exposed per worker through
+the ``ws-stats`` endpoint and reset when the worker restarts.
+"""
+import threading
+import time
+from collections import Counter
+
+
+class FrameStats:
+    """Thread-safe named counters"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self.started_at = time.time()
+    
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+    
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+    
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self.started_at = time.time()
+
+
+frame_stats = FrameStats()
+
+
+class FanoutStats:
+    """Broadcast volume per conversation
+    
+    ``events`` counts group sends, ``deliveries`` the member sockets they
+    reach (events x members) and ``digested`` the events folded into digest
+    frames instead of being sent. Only the busiest conversations are kept.
+    """
+    
+    MAX_CONVERSATIONS = 1000
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conversations = {}
+        self.started_at = time.time()
+    
+    def record(self, conversation_id, event_type, members, digested=False):
+        with self._lock:
+            counters = self._conversations.get(conversation_id)
+            if counters is None:
+                if len(self._conversations) >= self.MAX_CONVERSATIONS:
+                    self._prune()
+                counters = self._conversations[conversation_id] = Counter()
+            counters['members'] = members
+            if digested:
+                counters['digested'] += 1
+                counters[f'digested.{event_type}'] += 1
+            else:
+                counters['events'] += 1
+                counters['deliveries'] += members
+                counters[f'events.{event_type}'] += 1
+    
+    def _prune(self):
+        # Keep the busier half so one-off conversations cannot grow the table
+        ranked = sorted(self._conversations.items(), key=lambda item: item[1]['deliveries'], reverse=True)
+        self._conversations = dict(ranked[:self.MAX_CONVERSATIONS // 2])
+    
+    def snapshot(self, limit=20):
+        """Busiest conversations by deliveries"""
+        with self._lock:
+            ranked = sorted(self._conversations.items(), key=lambda item: item[1]['deliveries'], reverse=True)
+            # Every summary counter is present, even for conversations that never digested
+            return [
+                {'events': 0, 'deliveries': 0, 'digested': 0, **counters, 'conversation_id': str(conversation_id)}
+                for conversation_id, counters in ranked[:limit]
+            ]
+    
+    def reset(self):
+        with self._lock:
+            self._conversations.clear()
+            self.started_at = time.time()
+
+
+fanout_stats = FanoutStats()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 when empty)"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
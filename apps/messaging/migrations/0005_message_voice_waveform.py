@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_conversation_dm_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='voice_waveform',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:05
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_count(apps, schema_editor):
+    """Count each participant's unread messages the way the list used to, in two UPDATEs"""
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+
+    def unread(messages):
+        return Coalesce(
+            Subquery(
+                messages.filter(
+                    conversation=OuterRef('conversation_id'), is_deleted=False
+                ).exclude(sender=OuterRef('user_id')).order_by().values('conversation').annotate(
+                    total=Count('pk')
+                ).values('total')
+            ),
+            0
+        )
+
+    last_read_at = Subquery(Message.objects.filter(pk=OuterRef(OuterRef('last_read_message_id'))).values('sent_at'))
+    ConversationParticipant.objects.filter(last_read_message__isnull=True).update(
+        unread_count=unread(Message.objects.all())
+    )
+    ConversationParticipant.objects.filter(last_read_message__isnull=False).update(
+        unread_count=unread(Message.objects.filter(sent_at__gt=last_read_at))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_message_voice_waveform'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unread_count, migrations.RunPython.noop),
+    ]
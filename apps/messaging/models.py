@@ -41,6 +41,19 @@ class Conversation(models.Model):
     is_archived = models.BooleanField(default=False)
     is_muted = models.BooleanField(default=False)
     
+    # Pointer to the newest message, maintained on send
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    
+    # "<lower user id>:<higher user id>" for 1-on-1 conversations; the unique
+    # index turns opening a DM into a single indexed lookup-or-create
+    dm_key = models.CharField(max_length=41, null=True, blank=True, unique=True, editable=False)
+    
     class Meta:
         ordering = ['-updated_at']
         indexes = [
@@ -55,6 +68,12 @@ class Conversation(models.Model):
             return f"{participants[0].username} & {participants[1].username}"
         return f"Conversation {self.id}"
     
+    @staticmethod
+    def make_dm_key(user_id, other_user_id):
+        """Canonical key for the direct conversation between two users"""
+        low, high = sorted([user_id, other_user_id])
+        return f"{low}:{high}"
+    
     def get_other_participant(self, user):
         """Get the other participant in a 1-on-1 conversation"""
         if not self.is_group:
@@ -96,6 +115,7 @@ class Message(models.Model):
         validators=[FileExtensionValidator(['webm', 'opus', 'ogg', 'mp3', 'wav'])]
     )
     voice_duration = models.FloatField(null=True, blank=True)  # Duration in seconds
+    voice_waveform = models.JSONField(default=list, blank=True)  # Peak levels 0-1, computed at upload
     
     # Timestamps
     sent_at = models.DateTimeField(auto_now_add=True)
@@ -179,6 +199,7 @@ class ConversationParticipant(models.Model):
     # Last read
     last_read_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True)
     last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)  # Incremented on send, reset on read
     
     # Status
     joined_at = models.DateTimeField(auto_now_add=True)
@@ -411,7 +432,7 @@ class CallParticipant(models.Model):
         return f"{self.user.username} in call {self.call.id} - {self.status}"
 
 class CallSignal(models.Model):
-    """Store WebRTC signaling messages for call setup"""
+    """Legacy WebRTC signaling rows (no longer written; see signalling.py)"""
     SIGNAL_TYPE_CHOICES = [
         ('offer', 'Offer'),
         ('answer', 'Answer'),
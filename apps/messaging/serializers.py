@@ -2,16 +2,28 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, Prefetch, prefetch_related_objects
 from datetime import timedelta
+from apps.connect.presence import online_status, prime_online_status
 from .models import (
     Conversation, Message, MessageAttachment, MessageRead, MessageReaction,
     ConversationParticipant, ChatRequest, UserConnection, BusinessCard, SharedBusinessCard,
     VideoCall, CallParticipant, CallSignal, Poll, PollOption, PollVote, Event, EventAttendee
 )
+from .conf import messaging_setting
+from .media import audio_summary, stream_url
+from .services import get_or_create_direct_conversation
 
 User = get_user_model()
 
+class UserListSerializer(serializers.ListSerializer):
+    """Batch-load online status for every user in the list"""
+    
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, 'all') else data)
+        prime_online_status(self.context, [user.id for user in users])
+        return super().to_representation(users)
+
 class UserSerializer(serializers.ModelSerializer):
     """Basic user serializer for messaging"""
     full_name = serializers.SerializerMethodField()
@@ -19,16 +31,14 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields = ['id', 'username', 'full_name', 'is_online']
     
     def get_full_name(self, obj):
         return obj.get_full_name() or obj.username
     
     def get_is_online(self, obj):
-        # Check if user has been active in last 5 minutes
-        if hasattr(obj, 'connect_profile') and obj.connect_profile.last_seen:
-            return (timezone.now() - obj.connect_profile.last_seen).seconds < 300
-        return False
+        return online_status(self.context, obj.id)
 
 class MessageAttachmentSerializer(serializers.ModelSerializer):
     file = serializers.SerializerMethodField()
@@ -39,13 +49,10 @@ class MessageAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['file_name', 'file_size', 'uploaded_at']
     
     def get_file(self, obj):
-        """Get file URL, handling cases where request is not available"""
-        request = self.context.get('request')
-        if request and hasattr(request, 'build_absolute_uri'):
-            return request.build_absolute_uri(obj.file.url) if obj.file else None
-        else:
-            # Fallback for when request is not available
-            return obj.file.url if obj.file else None
+        """Signed stream URL for the attachment"""
+        if not obj.file:
+            return None
+        return stream_url(self.context.get('request'), 'attachment', obj.id)
 
 class MessageReactionSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -55,6 +62,72 @@ class MessageReactionSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'emoji', 'created_at']
         read_only_fields = ['created_at']
 
+def serialize_read_receipt(receipt):
+    return {
+        'user_id': receipt.user.id,
+        'user': {
+            'id': receipt.user.id,
+            'username': receipt.user.username,
+            'full_name': receipt.user.get_full_name() or receipt.user.username
+        },
+        'read_at': receipt.read_at.isoformat()
+    }
+
+def prime_message_state(context, messages):
+    """Batch-load reactions, attachments and read state for a page of messages
+    
+    Reaction counts and the viewer's reactions are derived from the prefetched
+    reaction rows, so a page costs three queries however many messages it has.
+    Results are stored per message id in ``context['message_state']``.
+    """
+    prefetch_related_objects(
+        messages,
+        'sender',
+        'pinned_by',
+        'attachments',
+        Prefetch('reactions', queryset=MessageReaction.objects.select_related('user')),
+    )
+    
+    request = context.get('request')
+    viewer_id = request.user.id if request and request.user.is_authenticated else None
+    
+    receipts = {}
+    for receipt in MessageRead.objects.filter(
+        message_id__in=[message.id for message in messages]
+    ).select_related('user'):
+        receipts.setdefault(receipt.message_id, []).append(receipt)
+    
+    state = context.setdefault('message_state', {})
+    user_ids = set()
+    for message in messages:
+        counts = {}
+        user_reactions = []
+        for reaction in message.reactions.all():
+            counts[reaction.emoji] = counts.get(reaction.emoji, 0) + 1
+            if reaction.user_id == viewer_id:
+                user_reactions.append(reaction.emoji)
+            user_ids.add(reaction.user_id)
+        message_receipts = receipts.get(message.id, [])
+        state[message.id] = {
+            'reaction_counts': counts,
+            'user_reactions': user_reactions,
+            'is_read': any(receipt.user_id == viewer_id for receipt in message_receipts),
+            'read_receipts': [serialize_read_receipt(receipt) for receipt in message_receipts],
+        }
+        user_ids.add(message.sender_id)
+        if message.pinned_by_id:
+            user_ids.add(message.pinned_by_id)
+    
+    prime_online_status(context, list(user_ids))
+
+class MessageListSerializer(serializers.ListSerializer):
+    """Batch-load data shared by all messages in a page"""
+    
+    def to_representation(self, data):
+        messages = list(data.all() if hasattr(data, 'all') else data)
+        prime_message_state(self.context, messages)
+        return super().to_representation(messages)
+
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     attachments = MessageAttachmentSerializer(many=True, read_only=True)
@@ -69,18 +142,26 @@ class MessageSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Message
+        list_serializer_class = MessageListSerializer
         fields = [
             'id', 'conversation', 'sender', 'content', 'sent_at',
             'edited_at', 'is_deleted', 'is_system_message',
             'reply_to', 'attachments', 'reactions', 'reaction_counts', 
             'user_reactions', 'is_read', 'read_receipts', 'message_type', 'voice_file', 'voice_duration',
-            'is_pinned', 'pinned_at', 'pinned_by', 'is_announcement'
+            'voice_waveform', 'is_pinned', 'pinned_at', 'pinned_by', 'is_announcement'
         ]
-        read_only_fields = ['sent_at', 'edited_at']
+        read_only_fields = ['sent_at', 'edited_at', 'voice_waveform']
+    
+    def batched_state(self, obj):
+        """Per-message data batch-loaded by MessageListSerializer, if any"""
+        return self.context.get('message_state', {}).get(obj.id)
     
     def get_reaction_counts(self, obj):
         """Get count of each emoji reaction"""
-        from django.db.models import Count
+        state = self.batched_state(obj)
+        if state is not None:
+            return state['reaction_counts']
+        
         counts = {}
         reaction_counts = obj.reactions.values('emoji').annotate(count=Count('emoji'))
         for item in reaction_counts:
@@ -89,12 +170,20 @@ class MessageSerializer(serializers.ModelSerializer):
     
     def get_user_reactions(self, obj):
         """Get current user's reactions to this message"""
+        state = self.batched_state(obj)
+        if state is not None:
+            return state['user_reactions']
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return list(obj.reactions.filter(user=request.user).values_list('emoji', flat=True))
         return []
     
     def get_is_read(self, obj):
+        state = self.batched_state(obj)
+        if state is not None:
+            return state['is_read']
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.read_receipts.filter(user=request.user).exists()
@@ -102,19 +191,12 @@ class MessageSerializer(serializers.ModelSerializer):
     
     def get_read_receipts(self, obj):
         """Get read receipts for this message"""
-        from .models import MessageRead
+        state = self.batched_state(obj)
+        if state is not None:
+            return state['read_receipts']
+        
         read_receipts = MessageRead.objects.filter(message=obj).select_related('user')
-        return [
-            {
-                'user_id': receipt.user.id,
-                'user': {
-                    'id': receipt.user.id,
-                    'username': receipt.user.username,
-                    'full_name': receipt.user.get_full_name() or receipt.user.username
-                },
-                'read_at': receipt.read_at.isoformat()
-            } for receipt in read_receipts
-        ]
+        return [serialize_read_receipt(receipt) for receipt in read_receipts]
     
     def get_voice_duration(self, obj):
         """Get voice duration, ensuring it's JSON-serializable"""
@@ -129,16 +211,10 @@ class MessageSerializer(serializers.ModelSerializer):
         return obj.voice_duration
     
     def get_voice_file(self, obj):
-        """Get voice file URL, handling cases where request is not available"""
+        """Signed stream URL for the voice note"""
         if not obj.voice_file:
             return None
-            
-        request = self.context.get('request')
-        if request and hasattr(request, 'build_absolute_uri'):
-            return request.build_absolute_uri(obj.voice_file.url)
-        else:
-            # Fallback for when request is not available
-            return obj.voice_file.url
+        return stream_url(self.context.get('request'), 'voice', obj.id)
 
 class ConversationParticipantSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -173,25 +249,24 @@ class ConversationListSerializer(serializers.ModelSerializer):
         return None
     
     def get_last_message(self, obj):
-        last_message = obj.messages.filter(is_deleted=False).last()
+        # Use the pointer maintained on send; fall back for older conversations
+        last_message = obj.last_message
+        if last_message is None or last_message.is_deleted:
+            last_message = obj.messages.filter(is_deleted=False).last()
         if last_message:
             return MessageSerializer(last_message, context=self.context).data
         return None
     
     def get_unread_count(self, obj):
+        # Served from the participant's counter; the list queryset annotates it
+        if hasattr(obj, 'user_unread_count'):
+            return obj.user_unread_count or 0
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            try:
-                participant = obj.participant_settings.get(user=request.user)
-                if participant.last_read_message:
-                    return obj.messages.filter(
-                        sent_at__gt=participant.last_read_message.sent_at,
-                        is_deleted=False
-                    ).exclude(sender=request.user).count()
-                else:
-                    return obj.messages.filter(is_deleted=False).exclude(sender=request.user).count()
-            except ConversationParticipant.DoesNotExist:
-                return 0
+            unread_count = obj.participant_settings.filter(
+                user=request.user
+            ).values_list('unread_count', flat=True).first()
+            return unread_count or 0
         return 0
     
     def get_display_name(self, obj):
@@ -275,17 +350,19 @@ class ConversationCreateSerializer(serializers.ModelSerializer):
             # Check if this is a group chat
             is_group = len(all_participant_ids) > 2 or validated_data.get('is_group', False)
             
-            # For 1-on-1 chats, check if conversation already exists
+            # 1-on-1 chats are looked up (or created) by their unique dm_key
             if not is_group and len(all_participant_ids) == 2:
-                existing = Conversation.objects.filter(
-                    is_group=False,
-                    participants__in=all_participant_ids
-                ).annotate(
-                    participant_count=Count('participants')
-                ).filter(participant_count=2)
-                
-                if existing.exists():
-                    return existing.first()
+                other_user = User.objects.get(id=participant_ids[0])
+                conversation, created = get_or_create_direct_conversation(
+                    request_user, other_user, created_by=request_user
+                )
+                if created and initial_message:
+                    Message.objects.create(
+                        conversation=conversation,
+                        sender=request_user,
+                        content=initial_message
+                    )
+                return conversation
             
             # Prepare conversation data
             conversation_data = {
@@ -408,10 +485,15 @@ class VoiceMessageCreateSerializer(serializers.ModelSerializer):
     """Serializer specifically for creating voice messages"""
     audio = serializers.FileField(write_only=True, required=True)
     duration = serializers.FloatField(write_only=True, required=False)
+    waveform = serializers.ListField(
+        child=serializers.FloatField(min_value=0, max_value=1),
+        write_only=True,
+        required=False
+    )
     
     class Meta:
         model = Message
-        fields = ['conversation', 'audio', 'duration', 'message_type']
+        fields = ['conversation', 'audio', 'duration', 'waveform', 'message_type']
     
     def validate_audio(self, value):
         """Validate audio file"""
@@ -432,11 +514,19 @@ class VoiceMessageCreateSerializer(serializers.ModelSerializer):
         import math
         audio_file = validated_data.pop('audio')
         duration = validated_data.pop('duration', None)
+        waveform = validated_data.pop('waveform', [])[:messaging_setting('WAVEFORM_POINTS')]
         
         # Validate duration
         if duration is not None and (math.isinf(duration) or math.isnan(duration) or duration < 0):
             duration = None
         
+        # Measure what we can decode so readers never have to open the file
+        measured_duration, measured_waveform = audio_summary(audio_file)
+        if measured_duration is not None:
+            duration = measured_duration
+        if measured_waveform:
+            waveform = measured_waveform
+        
         # Create the message
         message = Message.objects.create(
             conversation=validated_data['conversation'],
@@ -444,6 +534,7 @@ class VoiceMessageCreateSerializer(serializers.ModelSerializer):
             message_type='voice',
             voice_file=audio_file,
             voice_duration=duration,
+            voice_waveform=waveform,
             content=f"🎤 Voice message ({duration:.1f}s)" if duration else "🎤 Voice message"
         )
         
@@ -567,18 +658,12 @@ class VideoCallSerializer(serializers.ModelSerializer):
         """Get call duration in seconds"""
         return obj.duration
 
-class CallSignalSerializer(serializers.ModelSerializer):
-    from_user = UserSerializer(read_only=True)
-    to_user = UserSerializer(read_only=True)
-    call = serializers.StringRelatedField(read_only=True)
-    
-    class Meta:
-        model = CallSignal
-        fields = [
-            'id', 'call', 'from_user', 'to_user', 'signal_type', 'signal_data',
-            'created_at', 'processed'
-        ]
-        read_only_fields = ['created_at', 'processed']
+class CallSignalSerializer(serializers.Serializer):
+    """Validates WebRTC signals relayed through the ephemeral signal store"""
+    call = serializers.UUIDField()
+    to_user = serializers.IntegerField(required=False, allow_null=True)
+    signal_type = serializers.ChoiceField(choices=CallSignal.SIGNAL_TYPE_CHOICES)
+    signal_data = serializers.JSONField()
     
     def validate_signal_data(self, value):
         """Validate signal data based on signal type"""
@@ -0,0 +1,231 @@
+# startup_hub/apps/messaging/services.py
+"""
+Write paths shared by the chat consumers and the REST views.
+
+``persist_messages`` is the WebSocket send path: it inserts a burst of
+messages, moves the conversation pointers and bumps unread counters in a
+single transaction, and returns broadcast payloads built from the objects
+already in memory so nothing is re-queried for serialization.
+
+Unread counters: every message saved through ``Message.objects.create``
+(REST sends, system and call messages, first messages of new chats) is added
+by the ``post_save`` receiver in ``signals.py``; ``bulk_create`` skips it, so
+``persist_messages`` calls ``add_unread`` itself. Soft deletes take unread
+messages back off with ``release_unread``.
+"""
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .conf import messaging_setting
+from .models import CallParticipant, CallSignal, Conversation, ConversationParticipant, Message, VideoCall
+from .signalling import get_signal_store
+
+
+def add_unread(conversation_id, sender_id, count=1):
+    """Add ``count`` new messages to the unread counter of everyone but the sender"""
+    ConversationParticipant.objects.filter(conversation_id=conversation_id).exclude(
+        user_id=sender_id
+    ).update(unread_count=F('unread_count') + count)
+
+
+def release_unread(message):
+    """Take a soft-deleted message off the counters of participants who had not read it yet"""
+    ConversationParticipant.objects.filter(
+        conversation_id=message.conversation_id,
+        unread_count__gt=0
+    ).exclude(
+        user_id=message.sender_id
+    ).filter(
+        Q(last_read_message__isnull=True) | Q(last_read_message__sent_at__lt=message.sent_at)
+    ).update(unread_count=F('unread_count') - 1)
+
+
+def update_conversation_pointers(conversation_id, sender, last_message):
+    """Move conversation/participant pointers after new messages
+
+    Sets ``Conversation.updated_at``/``last_message`` and marks the sender as
+    having read up to ``last_message``.
+    """
+    now = timezone.now()
+
+    Conversation.objects.filter(id=conversation_id).update(
+        updated_at=now,
+        last_message=last_message
+    )
+
+    participants = ConversationParticipant.objects.filter(conversation_id=conversation_id)
+    updated = participants.filter(user=sender).update(
+        last_read_message=last_message,
+        last_read_at=now,
+        unread_count=0
+    )
+    if not updated:
+        ConversationParticipant.objects.create(
+            conversation_id=conversation_id,
+            user=sender,
+            last_read_message=last_message,
+            last_read_at=now
+        )
+
+
+def get_or_create_direct_conversation(user, other_user, created_by=None):
+    """Return ``(conversation, created)`` for the 1-on-1 conversation of two users
+
+    Looks the conversation up by its unique ``dm_key``; concurrent creates for
+    the same pair resolve to one row because the losing insert hits the
+    unique index and falls back to the lookup.
+    """
+    with transaction.atomic():
+        conversation, created = Conversation.objects.get_or_create(
+            dm_key=Conversation.make_dm_key(user.id, other_user.id),
+            defaults={'is_group': False, 'created_by': created_by}
+        )
+        if created:
+            conversation.participants.add(user, other_user)
+            ConversationParticipant.objects.bulk_create([
+                ConversationParticipant(
+                    conversation=conversation,
+                    user=participant,
+                    is_admin=(participant == created_by)
+                )
+                for participant in (user, other_user)
+            ], ignore_conflicts=True)
+    return conversation, created
+
+
+def mark_conversation_read(conversation_id, user, count=None):
+    """Reset (or, with ``count``, decrement) a participant's unread counter"""
+    if count is None:
+        unread_count = 0
+    else:
+        unread_count = Greatest(F('unread_count') - count, 0)
+    ConversationParticipant.objects.filter(
+        conversation_id=conversation_id,
+        user=user
+    ).update(unread_count=unread_count)
+
+
+def build_message_payload(message, sender, reply_to=None):
+    """Broadcast payload for a freshly created text message
+
+    Mirrors the shape the chat consumer has always sent; a new message has
+    no read receipts yet, so nothing needs to be loaded.
+    """
+    return {
+        'id': str(message.id),
+        'sender': {
+            'id': sender.id,
+            'username': sender.username,
+            'display_name': sender.get_display_name() if hasattr(sender, 'get_display_name') else sender.username
+        },
+        'content': message.content,
+        'sent_at': message.sent_at.isoformat(),
+        'message_type': message.message_type,
+        'voice_file': None,
+        'voice_duration': None,
+        'reply_to': {
+            'id': str(reply_to.id),
+            'content': reply_to.content[:100],
+            'sender': reply_to.sender.username
+        } if reply_to else None,
+        'read_receipts': [],
+        'read_by': [],
+        'is_deleted': False
+    }
+
+
+def persist_messages(sender, drafts):
+    """Insert a burst of text messages from one sender
+
+    ``drafts`` is a list of dicts with ``conversation_id``, ``content`` and
+    optional ``reply_to`` / ``client_id``. Returns ``(conversation_id,
+    payload)`` pairs in the order the drafts were given.
+    """
+    reply_ids = set()
+    for draft in drafts:
+        try:
+            reply_ids.add(uuid.UUID(str(draft['reply_to'])))
+        except (KeyError, TypeError, ValueError):
+            pass
+    replies = {}
+    if reply_ids:
+        replies = {
+            str(reply.id): reply for reply in
+            Message.objects.filter(id__in=reply_ids).select_related('sender')
+        }
+
+    messages = []
+    for draft in drafts:
+        reply = replies.get(str(draft.get('reply_to')))
+        # Replies must point at a message in the same conversation
+        if reply and str(reply.conversation_id) != str(draft['conversation_id']):
+            reply = None
+        messages.append(Message(
+            conversation_id=draft['conversation_id'],
+            sender=sender,
+            content=draft['content'],
+            reply_to=reply
+        ))
+
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+
+        # conversation_id -> (newest message, number of messages)
+        per_conversation = {}
+        for message in messages:
+            count = per_conversation.get(message.conversation_id, (None, 0))[1]
+            per_conversation[message.conversation_id] = (message, count + 1)
+        for conversation_id, (last_message, count) in per_conversation.items():
+            update_conversation_pointers(conversation_id, sender, last_message)
+            # bulk_create skips the post_save receiver that counts single messages
+            add_unread(conversation_id, sender.id, count)
+
+    results = []
+    for draft, message in zip(drafts, messages):
+        payload = build_message_payload(message, sender, message.reply_to)
+        if draft.get('client_id'):
+            payload['client_id'] = draft['client_id']
+        results.append((draft['conversation_id'], payload))
+    return results
+
+
+def end_stale_calls(conversation_id=None):
+    """End abandoned calls with set-based updates
+
+    A call is stale when it was never answered within ``STALE_CALL_TIMEOUT``,
+    or was answered but has no joined participant left or has run past
+    ``MAX_CALL_DURATION``. Their signal backlogs and any legacy
+    ``CallSignal`` rows past the timeout are dropped as well. Returns the
+    number of calls ended.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=messaging_setting('STALE_CALL_TIMEOUT'))
+
+    stale_calls = VideoCall.objects.filter(
+        Q(status__in=['initiated', 'ringing'], created_at__lt=cutoff) |
+        Q(status='answered', created_at__lt=now - timedelta(seconds=messaging_setting('MAX_CALL_DURATION'))) |
+        (Q(status='answered', created_at__lt=cutoff) & ~Q(call_participants__status='joined'))
+    )
+    if conversation_id:
+        stale_calls = stale_calls.filter(conversation_id=conversation_id)
+    calls = list(stale_calls.values_list('conversation_id', 'id').distinct())
+
+    if calls:
+        call_ids = [call_id for _, call_id in calls]
+        with transaction.atomic():
+            VideoCall.objects.filter(
+                id__in=call_ids,
+                status__in=['initiated', 'ringing', 'answered']
+            ).update(status='ended', ended_at=now)
+            CallParticipant.objects.filter(call_id__in=call_ids).update(status='left', left_at=now)
+        get_signal_store().clear(calls)
+
+    # Signals are no longer stored in the database; purge what is left over
+    CallSignal.objects.filter(created_at__lt=cutoff).delete()
+
+    return len(calls)
@@ -0,0 +1,199 @@
+# startup_hub/apps/messaging/signalling.py
+"""
+Ephemeral store for WebRTC signalling (offers, answers, ICE candidates).
+
+Signals are relayed live over the channel layer. The store only keeps a short
+per-call backlog with a TTL so a participant who joins late or reconnects can
+fetch what was sent before; nothing is written to the database per signal.
+Clients either page with a ``created_at`` cursor or, like older clients,
+acknowledge signals with ``mark_processed``, which records a per-user
+processed cursor that ``pending`` applies when no cursor is passed.
+Call lifecycle (status, participants) is still persisted on ``VideoCall``.
+
+Redis is used when ``MESSAGING_SETTINGS['SIGNAL_REDIS_URL']`` is configured and
+reachable; otherwise the Django cache acts as an in-process stand-in.
+"""
+import json
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+
+from .conf import messaging_setting
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_TYPES = {'offer', 'answer', 'ice-candidate', 'call-end'}
+
+SIGNAL_KEY = 'callsignal:{}:{}'  # conversation id, call id
+CURSOR_KEY = 'callsignal:processed:{}'  # user id
+
+
+class RedisSignalBackend:
+    """Capped Redis list per call, expiring with the call's last signal"""
+
+    def __init__(self, client, ttl, backlog):
+        self.client = client
+        self.ttl = ttl
+        self.backlog = backlog
+
+    def append(self, key, entry):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(key, json.dumps(entry))
+        pipe.ltrim(key, -self.backlog, -1)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def entries(self, keys):
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.lrange(key, 0, -1)
+        return [json.loads(entry) for values in pipe.execute() for entry in values]
+
+    def clear(self, keys):
+        self.client.delete(*keys)
+
+    def get_cursor(self, key):
+        return self.client.get(key)
+
+    def set_cursor(self, key, value):
+        self.client.set(key, value, ex=self.ttl)
+
+
+class CacheSignalBackend:
+    """Django cache stand-in used when Redis is not available"""
+
+    def __init__(self, ttl, backlog):
+        self.ttl = ttl
+        self.backlog = backlog
+
+    def append(self, key, entry):
+        entries = cache.get(key) or []
+        entries.append(entry)
+        cache.set(key, entries[-self.backlog:], self.ttl)
+
+    def entries(self, keys):
+        return [entry for values in cache.get_many(keys).values() for entry in values]
+
+    def clear(self, keys):
+        cache.delete_many(keys)
+
+    def get_cursor(self, key):
+        return cache.get(key)
+
+    def set_cursor(self, key, value):
+        cache.set(key, value, self.ttl)
+
+
+class SignalStore:
+    """Short-lived backlog of signals per call"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def publish(self, conversation_id, call_id, from_user_id, to_user_id, signal_type, signal_data):
+        """Record a signal and return the entry to relay to the room"""
+        entry = {
+            'id': uuid.uuid4().hex,
+            'call_id': str(call_id),
+            'from_user_id': from_user_id,
+            'to_user_id': to_user_id,
+            'signal_type': signal_type,
+            'signal_data': signal_data,
+            'created_at': time.time(),
+        }
+        try:
+            self.backend.append(SIGNAL_KEY.format(conversation_id, call_id), entry)
+        except Exception as e:
+            # The live relay still goes out; only late joiners miss this one
+            logger.warning(f"Signal store write failed for call {call_id}: {e}")
+        return entry
+
+    def addressed(self, calls, user_id):
+        """Every stored signal addressed to ``user_id`` on the given calls"""
+        keys = [SIGNAL_KEY.format(conversation_id, call_id) for conversation_id, call_id in calls]
+        if not keys:
+            return []
+        try:
+            entries = self.backend.entries(keys)
+        except Exception as e:
+            logger.warning(f"Signal store read failed: {e}")
+            return []
+        return [
+            entry for entry in entries
+            if entry['from_user_id'] != user_id and entry['to_user_id'] in (None, user_id)
+        ]
+
+    def processed_cursor(self, user_id):
+        try:
+            cursor = self.backend.get_cursor(CURSOR_KEY.format(user_id))
+        except Exception as e:
+            logger.warning(f"Signal cursor read failed for user {user_id}: {e}")
+            return None
+        return float(cursor) if cursor is not None else None
+
+    def pending(self, calls, user_id, since=None):
+        """Signals addressed to ``user_id`` on the given calls, oldest first
+
+        ``calls`` is an iterable of ``(conversation_id, call_id)`` pairs;
+        ``since`` is a ``created_at`` cursor from a previous fetch. Without
+        it, signals up to the user's processed cursor are skipped.
+        """
+        if since is None:
+            since = self.processed_cursor(user_id)
+        return sorted(
+            (
+                entry for entry in self.addressed(calls, user_id)
+                if since is None or entry['created_at'] > since
+            ),
+            key=lambda entry: entry['created_at']
+        )
+
+    def mark_processed(self, calls, user_id, signal_id):
+        """Move the user's processed cursor up to a signal; returns it, or None if not found"""
+        entry = next((entry for entry in self.addressed(calls, user_id) if entry['id'] == signal_id), None)
+        if entry is None:
+            return None
+        cursor = self.processed_cursor(user_id)
+        if cursor is None or entry['created_at'] > cursor:
+            try:
+                self.backend.set_cursor(CURSOR_KEY.format(user_id), entry['created_at'])
+            except Exception as e:
+                logger.warning(f"Signal cursor write failed for user {user_id}: {e}")
+        return entry
+
+    def clear(self, calls):
+        """Drop the backlog of calls that have ended"""
+        keys = [SIGNAL_KEY.format(conversation_id, call_id) for conversation_id, call_id in calls]
+        if not keys:
+            return
+        try:
+            self.backend.clear(keys)
+        except Exception as e:
+            logger.warning(f"Signal store clear failed: {e}")
+
+
+_signal_store = None
+
+
+def get_signal_store():
+    """Return the process-wide signal store, choosing a backend on first use"""
+    global _signal_store
+    if _signal_store is None:
+        ttl = messaging_setting('SIGNAL_TTL')
+        backlog = messaging_setting('SIGNAL_BACKLOG')
+        backend = None
+        redis_url = messaging_setting('SIGNAL_REDIS_URL')
+        if redis_url:
+            try:
+                import redis
+                client = redis.from_url(redis_url, decode_responses=True)
+                client.ping()
+                backend = RedisSignalBackend(client, ttl, backlog)
+            except Exception as e:
+                logger.warning(f"Signal Redis unavailable, using cache backend: {e}")
+        if backend is None:
+            backend = CacheSignalBackend(ttl, backlog)
+        _signal_store = SignalStore(backend)
+    return _signal_store
@@ -0,0 +1,52 @@
+# startup_hub/apps/messaging/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import access
+from .models import BlockedUser, Conversation, Message, UserConnection
+from .services import add_unread
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def invalidate_conversation_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached conversation sets and member counts when participants change"""
+    if action == 'pre_clear':
+        # The cleared ids are not passed to post_clear, so collect them now
+        if reverse:
+            access.invalidate_conversations(instance.pk)
+            access.invalidate_member_counts(*instance.conversations.values_list('id', flat=True))
+        else:
+            access.invalidate_conversations(*instance.participants.values_list('id', flat=True))
+            access.invalidate_member_counts(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        if reverse:
+            access.invalidate_conversations(instance.pk)
+            access.invalidate_member_counts(*pk_set)
+        else:
+            access.invalidate_conversations(*pk_set)
+            access.invalidate_member_counts(instance.pk)
+
+
+@receiver(pre_delete, sender=Conversation)
+def invalidate_deleted_conversation(sender, instance, **kwargs):
+    access.invalidate_conversations(*instance.participants.values_list('id', flat=True))
+    access.invalidate_member_counts(instance.pk)
+
+
+@receiver(post_save, sender=BlockedUser)
+@receiver(post_delete, sender=BlockedUser)
+def invalidate_blocks(sender, instance, **kwargs):
+    access.invalidate_blocks(instance.user_id, instance.blocked_user_id)
+
+
+@receiver(post_save, sender=UserConnection)
+@receiver(post_delete, sender=UserConnection)
+def invalidate_connections(sender, instance, **kwargs):
+    access.invalidate_connections(instance.from_user_id, instance.to_user_id)
+
+
+@receiver(post_save, sender=Message)
+def count_unread_message(sender, instance, created, raw=False, **kwargs):
+    """Every new message is unread for the other participants, whichever path created it"""
+    if created and not raw and not instance.is_deleted:
+        add_unread(instance.conversation_id, instance.sender_id)
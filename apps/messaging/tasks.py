@@ -0,0 +1,18 @@
+# startup_hub/apps/messaging/tasks.py
+from celery import shared_task
+from .services import end_stale_calls
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def sweep_stale_calls():
+    """
+    End abandoned video calls and drop their signalling backlog.
+    This task should be scheduled to run every minute.
+    """
+    ended = end_stale_calls()
+    if ended:
+        logger.info(f'Ended {ended} stale calls')
+    return ended
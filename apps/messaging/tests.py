@@ -0,0 +1,72 @@
+# startup_hub/apps/messaging/tests.py
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.users.models import User
+
+from .models import Conversation, Message, MessageReaction, MessageRead
+from .serializers import MessageSerializer
+
+EMOJIS = ['👍', '❤️', '😂', '🎉', '🚀']
+
+
+class MessagePageQueryTests(TestCase):
+    """A page of messages is serialized with a fixed number of queries, however many rows it holds"""
+
+    PAGE_SIZE = 50
+    PARTICIPANTS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(email=f'page_{index}@example.com', username=f'page_{index}')
+            for index in range(cls.PARTICIPANTS)
+        ]
+        cls.conversation = Conversation.objects.create(is_group=True)
+        cls.conversation.participants.add(*cls.users)
+        messages = Message.objects.bulk_create([
+            Message(
+                conversation=cls.conversation,
+                sender=cls.users[index % cls.PARTICIPANTS],
+                content=f'message {index}'
+            )
+            for index in range(cls.PAGE_SIZE)
+        ])
+        # Every user reacts to and reads every other message
+        MessageReaction.objects.bulk_create([
+            MessageReaction(message=message, user=user, emoji=EMOJIS[index % len(EMOJIS)])
+            for index, message in enumerate(messages[::2]) for user in cls.users
+        ])
+        MessageRead.objects.bulk_create([
+            MessageRead(message=message, user=user)
+            for message in messages[::2] for user in cls.users
+        ])
+
+    def page(self):
+        # Same queryset shape as MessageViewSet.get_queryset
+        return Message.objects.filter(
+            conversation=self.conversation,
+            is_deleted=False
+        ).select_related('sender', 'reply_to').order_by('sent_at')
+
+    def serialize(self, queryset):
+        request = Request(APIRequestFactory().get('/api/messaging/messages/'))
+        request.user = self.users[0]
+        return MessageSerializer(queryset, many=True, context={'request': request}).data
+
+    def test_page_query_count(self):
+        # Messages, then reactions, read receipts and attachments for the whole page
+        with self.assertNumQueries(4):
+            data = self.serialize(self.page())
+        self.assertEqual(len(data), self.PAGE_SIZE)
+
+    def test_query_count_does_not_grow_with_page(self):
+        with self.assertNumQueries(4):
+            self.serialize(self.page()[:5])
+
+    def test_batched_state_matches_messages(self):
+        data = self.serialize(self.page())
+        reacted = [item for item in data if item['reactions']]
+        self.assertEqual(len(reacted), self.PAGE_SIZE // 2)
+        self.assertTrue(all(len(item['reactions']) == self.PARTICIPANTS for item in reacted))
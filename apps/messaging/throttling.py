@@ -0,0 +1,39 @@
+# startup_hub/apps/messaging/throttling.py
+import time
+from .conf import messaging_setting
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second up to ``capacity``"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def consume(self, tokens=1):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+
+class FrameRateLimiter:
+    """Per-connection token buckets keyed by inbound frame type"""
+    
+    def __init__(self, limits=None):
+        self.limits = limits or messaging_setting('FRAME_RATE_LIMITS')
+        self.buckets = {}
+    
+    def allow(self, frame_type):
+        # Unlisted frame types share the 'default' bucket
+        key = frame_type if frame_type in self.limits else 'default'
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            rate, burst = self.limits[key]
+            bucket = self.buckets[key] = TokenBucket(rate, burst)
+        return bucket.consume()
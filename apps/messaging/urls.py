@@ -5,8 +5,10 @@ from .views import (
     ConversationViewSet, MessageViewSet, ChatRequestViewSet,
     UserConnectionViewSet, BusinessCardViewSet, VoiceMessageViewSet,
     VideoCallViewSet, CallSignalViewSet,
-    mark_messages_read, mark_read, get_unread_count, get_active_call
+    mark_messages_read, mark_read, get_unread_count, get_active_call,
+    get_realtime_stats
 )
+from .media import stream_media
 
 router = DefaultRouter()
 router.register(r'conversations', ConversationViewSet, basename='conversation')
@@ -26,4 +28,6 @@ urlpatterns = [
     path('mark-messages-read/', mark_messages_read, name='mark-messages-read'),
     path('unread-count/', get_unread_count, name='unread-count'),
     path('conversations/<uuid:conversation_id>/active-call/', get_active_call, name='active-call'),
+    path('ws-stats/', get_realtime_stats, name='ws-stats'),
+    path('media/<str:token>/', stream_media, name='media-stream'),
 ]
\ No newline at end of file
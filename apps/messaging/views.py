@@ -1,8 +1,10 @@
 # startup_hub/apps/messaging/views.py
+import uuid
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count, Max, Prefetch
+from django.db.models import Q, Count, Max, OuterRef, Prefetch, Subquery, Sum
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.conf import settings
@@ -11,7 +13,7 @@ from datetime import timedelta
 from .models import (
     Conversation, Message, MessageAttachment, MessageRead, MessageReaction,
     ConversationParticipant, ChatRequest, UserConnection, BlockedUser, BusinessCard, SharedBusinessCard,
-    VideoCall, CallParticipant, CallSignal
+    VideoCall, CallParticipant
 )
 from .serializers import (
     ConversationListSerializer, ConversationDetailSerializer,
@@ -20,6 +22,12 @@ from .serializers import (
     BusinessCardSerializer, SharedBusinessCardSerializer, VoiceMessageCreateSerializer,
     VideoCallSerializer, CallParticipantSerializer, CallSignalSerializer
 )
+from . import access
+from .services import (
+    end_stale_calls, get_or_create_direct_conversation, mark_conversation_read, release_unread,
+    update_conversation_pointers
+)
+from .signalling import get_signal_store
 
 class ConversationViewSet(viewsets.ModelViewSet):
     """ViewSet for conversations"""
@@ -32,7 +40,13 @@ class ConversationViewSet(viewsets.ModelViewSet):
         queryset = Conversation.objects.filter(
             participants=user
         ).annotate(
-            last_message_time=Max('messages__sent_at')
+            last_message_time=Max('messages__sent_at'),
+            # The requesting user's unread counter, maintained on send and read
+            user_unread_count=Subquery(
+                ConversationParticipant.objects.filter(
+                    conversation=OuterRef('pk'), user=user
+                ).values('unread_count')[:1]
+            )
         ).order_by('-last_message_time')
         
         # Filter by conversation type
@@ -47,7 +61,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
         if not show_archived:
             queryset = queryset.filter(is_archived=False)
         
-        return queryset.prefetch_related('participants', 'messages')
+        return queryset.select_related('last_message').prefetch_related('participants', 'messages')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -144,6 +158,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
             is_deleted=True,
             deleted_at=timezone.now()
         )
+        ConversationParticipant.objects.filter(conversation=conversation).update(unread_count=0)
         
         # Add system message about clearing chat
         Message.objects.create(
@@ -613,6 +628,25 @@ class MessageViewSet(viewsets.ModelViewSet):
         logger.error(f"Request data: {request.data}")
         logger.error(f"Request FILES: {request.FILES}")
         
+        conversation_id = request.data.get('conversation')
+        if not conversation_id or not access.is_participant(request.user.id, conversation_id):
+            return Response(
+                {'error': 'Conversation not found or you are not a participant'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # Only look at participants when the user has any blocks at all
+        if access.blocked_user_ids(request.user.id):
+            other_ids = Conversation.participants.through.objects.filter(
+                conversation_id=conversation_id,
+                conversation__is_group=False
+            ).exclude(user_id=request.user.id).values_list('user_id', flat=True)
+            if any(access.is_blocked(request.user.id, user_id) for user_id in other_ids):
+                return Response(
+                    {'error': 'You cannot message this user'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        
         try:
             serializer = self.get_serializer(data=request.data)
             logger.error(f"Serializer created: {serializer}")
@@ -624,8 +658,8 @@ class MessageViewSet(viewsets.ModelViewSet):
             logger.error("Serializer validation passed, saving...")
             message = serializer.save(sender=request.user)
             
-            # Update conversation's updated_at
-            message.conversation.save()
+            # Update conversation pointers and unread counters
+            update_conversation_pointers(message.conversation_id, request.user, message)
             
             # Mark as read by sender
             MessageRead.objects.create(message=message, user=request.user)
@@ -651,9 +685,11 @@ class MessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        message.is_deleted = True
-        message.deleted_at = timezone.now()
-        message.save()
+        if not message.is_deleted:
+            message.is_deleted = True
+            message.deleted_at = timezone.now()
+            message.save()
+            release_unread(message)
         
         return Response({'message': 'Message deleted'})
     
@@ -958,6 +994,19 @@ class ChatRequestViewSet(viewsets.ModelViewSet):
         
         return queryset.select_related('from_user', 'to_user').order_by('-sent_at')
     
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        if access.is_blocked(request.user.id, serializer.validated_data['to_user_id']):
+            return Response(
+                {'error': 'You cannot send a chat request to this user'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
     def perform_create(self, serializer):
         serializer.save(from_user=self.request.user)
     
@@ -978,9 +1027,14 @@ class ChatRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create conversation
-        conversation = Conversation.objects.create(is_group=False)
-        conversation.participants.add(chat_request.from_user, chat_request.to_user)
+        if access.is_blocked(chat_request.to_user_id, chat_request.from_user_id):
+            return Response(
+                {'error': 'You cannot accept a request from this user'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # Reuse the pair's direct conversation if one already exists
+        conversation, _ = get_or_create_direct_conversation(chat_request.from_user, chat_request.to_user)
         
         # Create initial message
         Message.objects.create(
@@ -996,10 +1050,11 @@ class ChatRequestViewSet(viewsets.ModelViewSet):
         chat_request.save()
         
         # Create connection
-        UserConnection.objects.create(
-            from_user=chat_request.from_user,
-            to_user=chat_request.to_user
-        )
+        if not access.are_connected(chat_request.from_user_id, chat_request.to_user_id):
+            UserConnection.objects.create(
+                from_user=chat_request.from_user,
+                to_user=chat_request.to_user
+            )
         
         return Response({
             'message': 'Chat request accepted',
@@ -1075,6 +1130,7 @@ def mark_messages_read(request):
         
         participant.last_read_at = timezone.now()
         participant.last_read_message = all_messages  # Use the latest message overall
+        participant.unread_count = 0
         participant.save()
         
         # Send WebSocket notification for read receipts
@@ -1114,6 +1170,7 @@ def mark_messages_read(request):
         
         marked_count = 0
         conversation_ids = set()
+        marked_per_conversation = {}
         
         for message in messages:
             MessageRead.objects.get_or_create(
@@ -1122,6 +1179,11 @@ def mark_messages_read(request):
             )
             marked_count += 1
             conversation_ids.add(message.conversation_id)
+            if message.sender_id != request.user.id:
+                marked_per_conversation[message.conversation_id] = marked_per_conversation.get(message.conversation_id, 0) + 1
+        
+        for conv_id, count in marked_per_conversation.items():
+            mark_conversation_read(conv_id, request.user, count=count)
         
         # Update last read for all affected conversations
         for conv_id in conversation_ids:
@@ -1161,15 +1223,11 @@ def mark_read(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_unread_count(request):
-    """Get unread message count"""
-    unread_count = Message.objects.filter(
-        conversation__participants=request.user,
-        is_deleted=False
-    ).exclude(
-        sender=request.user
-    ).exclude(
-        read_receipts__user=request.user
-    ).count()
+    """Get unread message count, the sum of the per-conversation counters"""
+    unread_count = ConversationParticipant.objects.filter(
+        user=request.user,
+        conversation__participants=request.user
+    ).aggregate(total=Sum('unread_count'))['total'] or 0
     
     return Response({'unread_count': unread_count})
 
@@ -1192,6 +1250,7 @@ class VoiceMessageViewSet(viewsets.ModelViewSet):
         
         # Save the voice message
         message = serializer.save()
+        update_conversation_pointers(message.conversation_id, request.user, message)
         
         # Return the message using MessageSerializer for full data
         response_serializer = MessageSerializer(message, context={'request': request})
@@ -1345,6 +1404,7 @@ class VideoCallViewSet(viewsets.ModelViewSet):
                 room_group_name,
                 {
                     'type': 'call_notification',
+                    'conversation_id': str(conversation.id),
                     'notification_type': 'incoming_call',
                     'call_id': str(video_call.id),
                     'call_data': {
@@ -1453,6 +1513,7 @@ class VideoCallViewSet(viewsets.ModelViewSet):
                     room_group_name,
                     {
                         'type': 'call_notification',
+                        'conversation_id': str(video_call.conversation_id),
                         'notification_type': 'call_ended',
                         'call_id': str(video_call.id),
                         'call_data': {
@@ -1512,6 +1573,7 @@ class VideoCallViewSet(viewsets.ModelViewSet):
                 room_group_name,
                 {
                     'type': 'call_notification',
+                    'conversation_id': str(video_call.conversation_id),
                     'notification_type': 'call_declined',
                     'call_id': str(video_call.id),
                     'call_data': {
@@ -1644,82 +1706,138 @@ class VideoCallViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Find and clean up stale calls
-        from datetime import timedelta
-        stale_time = timezone.now() - timedelta(minutes=5)
-        
-        stale_calls = VideoCall.objects.filter(
-            conversation=conversation,
-            status__in=['initiated', 'ringing', 'answered'],
-            created_at__lt=stale_time
-        )
-        
-        cleaned_count = 0
-        for call in stale_calls:
-            call.status = 'ended'
-            call.ended_at = timezone.now()
-            call.save()
-            
-            # Update all participants to left
-            call.call_participants.update(
-                status='left',
-                left_at=timezone.now()
-            )
-            cleaned_count += 1
+        # The same sweep runs periodically (apps.messaging.tasks.sweep_stale_calls)
+        cleaned_count = end_stale_calls(conversation_id=conversation.id)
         
         return Response({
             'message': f'Cleaned up {cleaned_count} stale calls',
             'cleaned_count': cleaned_count
         })
 
-class CallSignalViewSet(viewsets.ModelViewSet):
-    """ViewSet for WebRTC signaling"""
-    serializer_class = CallSignalSerializer
-    permission_classes = [permissions.IsAuthenticated]
+class CallSignalViewSet(viewsets.ViewSet):
+    """REST fallback for WebRTC signaling
     
-    def get_queryset(self):
-        """Get signals for user's calls"""
-        return CallSignal.objects.filter(
-            call__conversation__participants=self.request.user
-        ).select_related('call', 'from_user', 'to_user').order_by('-created_at')
+    Signals are relayed over the chat WebSocket and kept only briefly in the
+    ephemeral signal store, so this endpoint publishes into the same store
+    and reads the backlog for late joiners; nothing is stored per signal.
+    """
+    permission_classes = [permissions.IsAuthenticated]
     
-    def create(self, request, *args, **kwargs):
-        """Create a WebRTC signal"""
-        serializer = self.get_serializer(data=request.data)
+    def create(self, request):
+        """Publish a WebRTC signal to the call's conversation"""
+        serializer = CallSignalSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        # Set from_user automatically
-        signal = serializer.save(from_user=request.user)
+        call = VideoCall.objects.filter(
+            id=data['call'],
+            conversation__participants=request.user,
+            status__in=['initiated', 'ringing', 'answered']
+        ).only('id', 'conversation_id').first()
+        if not call:
+            return Response(
+                {'error': 'Active call not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        signal = get_signal_store().publish(
+            call.conversation_id, call.id, request.user.id,
+            data.get('to_user'), data['signal_type'], data['signal_data']
+        )
         
-        return Response(self.get_serializer(signal).data, status=status.HTTP_201_CREATED)
+        from channels.layers import get_channel_layer
+        from asgiref.sync import async_to_sync
+        
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(
+                f'chat_{call.conversation_id}',
+                {
+                    'type': 'call_signal',
+                    'conversation_id': str(call.conversation_id),
+                    'signal_id': signal['id'],
+                    'signal_type': signal['signal_type'],
+                    'signal_data': signal['signal_data'],
+                    'from_user_id': request.user.id,
+                    'to_user_id': signal['to_user_id'],
+                    'call_id': signal['call_id']
+                }
+            )
+        
+        return Response(signal, status=status.HTTP_201_CREATED)
+    
+    def list(self, request):
+        return self.pending(request)
+    
+    def active_calls(self):
+        return VideoCall.objects.filter(
+            conversation__participants=self.request.user,
+            status__in=['initiated', 'ringing', 'answered']
+        )
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
-        """Get pending signals for user"""
-        signals = CallSignal.objects.filter(
-            to_user=request.user,
-            processed=False
-        ).select_related('call', 'from_user').order_by('created_at')
+        """Signals addressed to the user on their active calls
+        
+        Optional ``call_id`` narrows to one call; pass the last seen
+        ``created_at`` as ``since`` to fetch only newer signals, otherwise
+        signals acknowledged with ``mark_processed`` are left out.
+        """
+        calls = self.active_calls()
+        call_id = request.query_params.get('call_id')
+        if call_id:
+            try:
+                calls = calls.filter(id=uuid.UUID(call_id))
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid call_id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         
-        serializer = self.get_serializer(signals, many=True)
-        return Response(serializer.data)
+        since = request.query_params.get('since')
+        try:
+            since = float(since) if since else None
+        except ValueError:
+            return Response(
+                {'error': 'since must be a timestamp'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        signals = get_signal_store().pending(
+            calls.values_list('conversation_id', 'id'), request.user.id, since=since
+        )
+        return Response(signals)
     
     @action(detail=True, methods=['post'])
     def mark_processed(self, request, pk=None):
-        """Mark signal as processed"""
-        signal = self.get_object()
-        
-        if signal.to_user != request.user:
+        """Acknowledge a signal (and every older one) for clients polling without ``since``"""
+        entry = get_signal_store().mark_processed(
+            self.active_calls().values_list('conversation_id', 'id'), request.user.id, pk
+        )
+        if entry is None:
             return Response(
-                {'error': 'You can only mark your own signals as processed'},
-                status=status.HTTP_403_FORBIDDEN
+                {'error': 'Signal not found'},
+                status=status.HTTP_404_NOT_FOUND
             )
-        
-        signal.processed = True
-        signal.save()
-        
         return Response({'message': 'Signal marked as processed'})
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def get_realtime_stats(request):
+    """Real-time messaging counters (dropped/coalesced frames, fan-out) for this worker"""
+    from .metrics import fanout_stats, frame_stats
+    
+    try:
+        limit = min(int(request.query_params.get('limit', 20)), 200)
+    except ValueError:
+        limit = 20
+    
+    return Response({
+        'counters': frame_stats.snapshot(),
+        'fanout': fanout_stats.snapshot(limit=limit),
+        'since': frame_stats.started_at
+    })
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_active_call(request, conversation_id):
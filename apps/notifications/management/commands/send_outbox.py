@@ -0,0 +1,66 @@
+# startup_hub/apps/notifications/management/commands/send_outbox.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.outbox import OUTBOX_BATCH_SIZE, OUTBOX_CONCURRENCY, process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in pooled batches and report the throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help='Emails claimed per batch',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=OUTBOX_CONCURRENCY,
+            help='Parallel connections, each sending its share of a batch',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after this many batches (default: until the outbox is drained)',
+        )
+        parser.add_argument(
+            '--smtp-sink',
+            metavar='HOST:PORT',
+            help='Deliver to a plain SMTP server such as a local test sink '
+                 '(e.g. "python -m aiosmtpd -n -l localhost:1025") instead of EMAIL_BACKEND',
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--concurrency and --batch-size must be at least 1')
+
+        connection_options = {}
+        if options['smtp_sink']:
+            host, _, port = options['smtp_sink'].rpartition(':')
+            if not host or not port.isdigit():
+                raise CommandError('--smtp-sink must look like HOST:PORT')
+            connection_options = {
+                'backend': 'django.core.mail.backends.smtp.EmailBackend',
+                'host': host,
+                'port': int(port),
+                'username': '',
+                'password': '',
+                'use_tls': False,
+                'use_ssl': False,
+            }
+
+        report = process_outbox(
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency'],
+            max_batches=options['max_batches'],
+            connection_options=connection_options,
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        if report['released']:
+            self.stdout.write(f"Requeued {report['released']} emails left unfinished by a stopped worker")
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {report['sent']} emails in {report['batches']} batches, {report['seconds']}s "
+            f"({report['per_second']}/s); {report['retrying']} to retry, {report['failed']} failed"
+        ))
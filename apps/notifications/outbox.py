@@ -0,0 +1,188 @@
+# startup_hub/apps/notifications/outbox.py
+"""
+Batched email delivery through the ``OutboxEmail`` table.
+
+Senders such as the job alert digests only render and enqueue their emails;
+``process_outbox`` delivers them. Each batch of due rows is claimed with
+``SELECT ... FOR UPDATE SKIP LOCKED`` so several workers can drain the outbox
+at once, then split across ``OUTBOX_CONCURRENCY`` threads. Every thread opens
+one connection of the configured backend (an SMTP session or a SendGrid
+client) and sends its whole share over it, instead of a connection per email.
+
+A failed email is retried with exponential backoff until it has been tried
+``OUTBOX_MAX_ATTEMPTS`` times; rows left in ``sending`` by a crashed worker are
+handed back after ``OUTBOX_STALE_AFTER``.
+"""
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_CONCURRENCY = getattr(settings, 'EMAIL_OUTBOX_CONCURRENCY', 4)
+OUTBOX_MAX_ATTEMPTS = 5
+# Retry delay after the first failure in seconds, doubled for every later one
+OUTBOX_BACKOFF = 60
+OUTBOX_MAX_BACKOFF = 6 * 60 * 60
+OUTBOX_STALE_AFTER = timedelta(minutes=15)
+
+
+def outbox_email(to, subject, body, html_body='', headers=None, category='', from_email=None):
+    """Unsaved ``OutboxEmail``; save it or pass a list of them to ``enqueue``"""
+    return OutboxEmail(
+        to=to,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        headers=headers or {},
+        category=category,
+    )
+
+
+def enqueue(emails):
+    """Store ``OutboxEmail`` objects for delivery; returns how many were queued"""
+    return len(OutboxEmail.objects.bulk_create(emails, batch_size=500))
+
+
+def release_stale():
+    """Hand rows claimed by a worker that never finished back to the queue"""
+    return OutboxEmail.objects.filter(
+        status='sending', claimed_at__lt=timezone.now() - OUTBOX_STALE_AFTER
+    ).update(status='pending', claimed_at=None)
+
+
+def claim_batch(size=OUTBOX_BATCH_SIZE):
+    """Mark up to ``size`` due rows as ``sending`` for this worker and return them"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status='pending', next_attempt_at__lte=now
+            ).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:size]
+        )
+        OutboxEmail.objects.filter(id__in=ids).update(
+            status='sending', claimed_at=now, attempts=F('attempts') + 1
+        )
+    return list(OutboxEmail.objects.filter(id__in=ids))
+
+
+def to_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=[email.to],
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def deliver(emails, connection_options):
+    """Send ``emails`` over one connection; ``[(id, error or None)]``"""
+    results = []
+    connection = get_connection(fail_silently=False, **connection_options)
+    try:
+        connection.open()
+    except Exception as e:
+        return [(email.id, f'Could not connect: {e}') for email in emails]
+
+    try:
+        for email in emails:
+            try:
+                sent = connection.send_messages([to_message(email, connection)])
+                results.append((email.id, None if sent else 'Rejected by the email backend'))
+            except Exception as e:
+                results.append((email.id, str(e) or e.__class__.__name__))
+                # The SMTP session may be unusable after an error; start a new one
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception:
+                    pass
+    finally:
+        connection.close()
+    return results
+
+
+def retry_delay(attempts):
+    delay = min(OUTBOX_BACKOFF * 2 ** (attempts - 1), OUTBOX_MAX_BACKOFF)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def record(emails, results):
+    """Store the outcome of a batch; returns ``(sent, retrying, failed)``"""
+    attempts = {email.id: email.attempts for email in emails}
+    now = timezone.now()
+    sent_ids = [email_id for email_id, error in results if error is None]
+    OutboxEmail.objects.filter(id__in=sent_ids).update(
+        status='sent', sent_at=now, claimed_at=None, last_error=''
+    )
+
+    retrying = failed = 0
+    for email_id, error in results:
+        if error is None:
+            continue
+        if attempts[email_id] >= OUTBOX_MAX_ATTEMPTS:
+            OutboxEmail.objects.filter(id=email_id).update(status='failed', claimed_at=None, last_error=error)
+            failed += 1
+        else:
+            OutboxEmail.objects.filter(id=email_id).update(
+                status='pending', claimed_at=None, last_error=error,
+                next_attempt_at=now + retry_delay(attempts[email_id]),
+            )
+            retrying += 1
+    return len(sent_ids), retrying, failed
+
+
+def process_outbox(batch_size=OUTBOX_BATCH_SIZE, concurrency=OUTBOX_CONCURRENCY, max_batches=None,
+                   connection_options=None, log=None):
+    """
+    Deliver due outbox emails until none are left (or ``max_batches`` ran).
+    Returns a report with the counts, elapsed seconds and emails per second.
+    """
+    connection_options = connection_options or {}
+    started = time.perf_counter()
+    report = {'batches': 0, 'sent': 0, 'retrying': 0, 'failed': 0, 'released': release_stale()}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while max_batches is None or report['batches'] < max_batches:
+            emails = claim_batch(batch_size)
+            if not emails:
+                break
+            # One connection per thread, each sending an equal share of the batch
+            shares = [emails[i::concurrency] for i in range(concurrency) if emails[i::concurrency]]
+            results = []
+            for share_results in pool.map(deliver, shares, [connection_options] * len(shares)):
+                results.extend(share_results)
+
+            sent, retrying, failed = record(emails, results)
+            report['batches'] += 1
+            report['sent'] += sent
+            report['retrying'] += retrying
+            report['failed'] += failed
+            if log:
+                log(f'Batch {report["batches"]}: {sent} sent, {retrying} to retry, {failed} failed')
+
+    report['seconds'] = round(time.perf_counter() - started, 2)
+    report['per_second'] = round(report['sent'] / report['seconds'], 1) if report['seconds'] else 0.0
+    if report['batches']:
+        logger.info(
+            f"Email outbox: {report['sent']} sent, {report['retrying']} to retry, {report['failed']} failed "
+            f"in {report['seconds']}s ({report['per_second']}/s)"
+        )
+    return report
@@ -0,0 +1,17 @@
+# startup_hub/apps/notifications/tasks.py
+from celery import shared_task
+from .outbox import process_outbox
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def deliver_email_outbox(max_batches=50):
+    """
+    Deliver due emails from the outbox, retrying earlier failures whose
+    backoff has passed. Senders also queue this right after enqueueing.
+    This task should be scheduled to run every minute.
+    """
+    report = process_outbox(max_batches=max_batches)
+    return report['sent']
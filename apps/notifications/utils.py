@@ -36,6 +36,35 @@ def create_notification(recipient, notification_type, title, message, sender=Non
         return None
 
 
+def create_notifications(notification_type, notifications):
+    """
+    Create many notifications of one type with one preference query and one insert.
+    Each item is a dict of Notification fields, with ``recipient_id`` instead of ``recipient``.
+    """
+    if not notifications:
+        return []
+    try:
+        muted = set()
+        preference_field = f"inapp_on_{notification_type.split('_')[0]}"
+        if hasattr(NotificationPreference, preference_field):
+            muted = set(NotificationPreference.objects.filter(
+                user_id__in={item['recipient_id'] for item in notifications},
+                **{preference_field: False}
+            ).values_list('user_id', flat=True))
+        
+        created = Notification.objects.bulk_create([
+            Notification(notification_type=notification_type, **item)
+            for item in notifications if item['recipient_id'] not in muted
+        ])
+        
+        logger.info(f"Created {len(created)} {notification_type} notifications")
+        return created
+        
+    except Exception as e:
+        logger.error(f"Error creating {notification_type} notifications: {e}")
+        return []
+
+
 def notify_startup_liked(startup, liker):
     """Create notification when someone likes a startup"""
     if startup.claimed_by and startup.claimed_by != liker:
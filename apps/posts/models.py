@@ -132,6 +132,8 @@ class PostImage(models.Model):
     caption = models.CharField(max_length=200, blank=True)
     order = models.PositiveSmallIntegerField(default=0)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Resized variants of the image (see apps/core/images.py)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     
     class Meta:
         ordering = ['order', 'uploaded_at']
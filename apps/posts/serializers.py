@@ -11,9 +11,19 @@ from .models import (
 import re
 from django.db import transaction
 from django.utils.timesince import timesince
+from apps.connect.presence import online_status, prime_online_status
+from apps.core.images import image_srcset, largest_variant_url, process_image
 
 User = get_user_model()
 
+class AuthoredListSerializer(serializers.ListSerializer):
+    """List serializer that batch-loads online status for all authors in the page"""
+    
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        prime_online_status(self.context, [item.author_id for item in items if item.author_id])
+        return super().to_representation(items)
+
 class TopicSerializer(serializers.ModelSerializer):
     is_following = serializers.SerializerMethodField()
     
@@ -31,13 +41,17 @@ class TopicSerializer(serializers.ModelSerializer):
 
 class PostImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = PostImage
-        fields = ['id', 'image', 'caption', 'order']
+        fields = ['id', 'image', 'srcset', 'caption', 'order']
     
     def get_image(self, obj):
-        """Return full URL for the image"""
+        """Return full URL for the image, preferring the largest resized variant"""
+        resized = largest_variant_url(obj.variants)
+        if resized:
+            return resized
         if obj.image:
             from django.conf import settings
             if obj.image.url.startswith('http'):
@@ -47,6 +61,9 @@ class PostImageSerializer(serializers.ModelSerializer):
                 backend_url = getattr(settings, 'BACKEND_URL', 'http://localhost:8000')
                 return f"{backend_url}{obj.image.url}"
         return None
+    
+    def get_srcset(self, obj):
+        return image_srcset(obj.variants)
 
 class PostLinkSerializer(serializers.ModelSerializer):
     class Meta:
@@ -89,7 +106,7 @@ class AuthorSerializer(serializers.ModelSerializer):
     
     def get_is_online(self, obj):
         if hasattr(obj, 'connect_profile') and obj.connect_profile.show_online_status:
-            return obj.connect_profile.is_online
+            return online_status(self.context, obj.id)
         return False
     
     def get_headline(self, obj):
@@ -287,6 +304,7 @@ class PostListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Post
+        list_serializer_class = AuthoredListSerializer
         fields = [
             'id', 'author', 'author_name', 'title', 'content_preview', 'post_type',
             'topics', 'topic_names', 'is_anonymous', 'is_pinned', 'is_locked',
@@ -538,11 +556,12 @@ class PostCreateSerializer(serializers.ModelSerializer):
             
             # Handle images
             for i, image in enumerate(images):
-                PostImage.objects.create(
-                    post=post,
-                    image=image,
-                    order=i
-                )
+                post_image = PostImage(post=post, order=i)
+                post_image.image.save(image.name, image, save=False)
+                post_image.variants = {'original': post_image.image.name}
+                post_image.save()
+                # Resized variants are rendered once the post is committed
+                process_image(post_image, 'variants', 'post')
             
             # Handle mentions
             self._process_mentions(post, mentioned_users)
@@ -671,6 +690,7 @@ class CommentSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Comment
+        list_serializer_class = AuthoredListSerializer
         fields = [
             'id', 'author', 'content', 'is_anonymous', 'created_at', 
             'like_count', 'reply_count', 'time_since', 'is_liked',
@@ -6,6 +6,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django.contrib import messages
 import json
+from .facets import invalidate_facets
 from .models import (
     Industry, Startup, StartupFounder, StartupTag, StartupRating, 
     StartupComment, StartupBookmark, StartupLike, StartupSubmission,
@@ -140,8 +141,11 @@ class StartupAdmin(admin.ModelAdmin):
             return format_html('<span style="color: gray;">- Unclaimed</span>')
     claim_status.short_description = 'Claim Status'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+    
     def total_ratings(self, obj):
-        return obj.ratings.count()
+        return obj.total_ratings
     total_ratings.short_description = 'Total Ratings'
     
     def average_rating(self, obj):
@@ -168,7 +172,8 @@ class StartupAdmin(admin.ModelAdmin):
     has_pending_claims.short_description = 'Pending Claims'
     
     def approve_startups(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = queryset.update(is_approved=True, updated_at=timezone.now())
+        invalidate_facets()
         # Also update submission status if exists
         for startup in queryset:
             if hasattr(startup, 'submission'):
@@ -181,12 +186,14 @@ class StartupAdmin(admin.ModelAdmin):
     approve_startups.short_description = "Approve selected startups"
     
     def feature_startups(self, request, queryset):
-        updated = queryset.update(is_featured=True)
+        updated = queryset.update(is_featured=True, updated_at=timezone.now())
+        invalidate_facets()
         self.message_user(request, f'{updated} startup(s) were featured.')
     feature_startups.short_description = "Feature selected startups"
     
     def unfeature_startups(self, request, queryset):
-        updated = queryset.update(is_featured=False)
+        updated = queryset.update(is_featured=False, updated_at=timezone.now())
+        invalidate_facets()
         self.message_user(request, f'{updated} startup(s) were unfeatured.')
     unfeature_startups.short_description = "Unfeature selected startups"
 
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class StartupsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.startups' 
+    name = 'apps.startups'
+    
+    def ready(self):
+        # Import signals when the app is ready
+        import apps.startups.signals
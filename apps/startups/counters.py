@@ -0,0 +1,91 @@
+# startup_hub/apps/startups/counters.py
+"""
+Denormalized engagement counters on ``Startup``.
+
+``like_count``, ``bookmark_count``, ``comment_count``, ``rating_count`` and
+``rating_sum`` are kept in step with single ``UPDATE ... SET x = x + n``
+statements, so concurrent requests can't lose increments. The receivers in
+``signals.py`` apply them for every engagement row saved or deleted through
+the ORM - API actions, admin, user-deletion cascades - so adds and removals
+always go through the same code. ``rating_average`` is derived from the other
+two rating columns in the same statement and indexed for sorting.
+
+Writes that bypass the model signals (raw SQL, ``bulk_create``, queryset
+``update``/``delete`` without receivers) can leave the columns behind;
+``reconcile_counters`` recounts and repairs them in bulk.
+"""
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .models import (
+    Startup, StartupBookmark, StartupComment, StartupLike, StartupRating, count_subquery
+)
+
+COUNTER_FIELDS = ['like_count', 'bookmark_count', 'comment_count', 'rating_count', 'rating_sum', 'rating_average']
+
+
+def adjust_counters(startup_id, likes=0, bookmarks=0, comments=0, ratings=0, rating_sum=0):
+    """Apply counter deltas to one startup atomically"""
+    updates = {}
+    if likes:
+        updates['like_count'] = F('like_count') + likes
+    if bookmarks:
+        updates['bookmark_count'] = F('bookmark_count') + bookmarks
+    if comments:
+        updates['comment_count'] = F('comment_count') + comments
+    if ratings or rating_sum:
+        new_count = F('rating_count') + ratings
+        new_sum = F('rating_sum') + rating_sum
+        updates['rating_count'] = new_count
+        updates['rating_sum'] = new_sum
+        # Right-hand sides see the old column values, so recompute from them
+        updates['rating_average'] = Case(
+            When(rating_count__gt=-ratings, then=Cast(new_sum, FloatField()) / Cast(new_count, FloatField())),
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    if updates:
+        Startup.objects.filter(pk=startup_id).update(**updates)
+
+
+def true_counts(startup_ids):
+    """Recount the counter columns from the engagement tables"""
+    rows = Startup.objects.filter(id__in=startup_ids).annotate(
+        true_like_count=count_subquery(StartupLike),
+        true_bookmark_count=count_subquery(StartupBookmark),
+        true_comment_count=count_subquery(StartupComment),
+        true_rating_count=count_subquery(StartupRating),
+        true_rating_sum=count_subquery(StartupRating, aggregate=Sum('rating')),
+    ).values('id', *[f'true_{field}' for field in COUNTER_FIELDS[:-1]])
+    counts = {}
+    for row in rows:
+        values = {field: row[f'true_{field}'] for field in COUNTER_FIELDS[:-1]}
+        values['rating_average'] = (
+            values['rating_sum'] / values['rating_count'] if values['rating_count'] else 0.0
+        )
+        counts[row['id']] = values
+    return counts
+
+
+def reconcile_counters(batch_size=1000, dry_run=False, startup_ids=None):
+    """Repair counter drift of every startup (or just ``startup_ids``); returns ``(checked, repaired)``"""
+    queryset = Startup.objects.all() if startup_ids is None else Startup.objects.filter(id__in=startup_ids)
+    startup_ids = list(queryset.order_by('id').values_list('id', flat=True))
+    checked = repaired = 0
+    for start in range(0, len(startup_ids), batch_size):
+        batch_ids = startup_ids[start:start + batch_size]
+        counts = true_counts(batch_ids)
+        changed = []
+        for startup in Startup.objects.filter(id__in=batch_ids).only('id', *COUNTER_FIELDS):
+            values = counts[startup.id]
+            if any(
+                abs(getattr(startup, field) - values[field]) > 1e-9 for field in COUNTER_FIELDS
+            ):
+                for field, value in values.items():
+                    setattr(startup, field, value)
+                changed.append(startup)
+        if changed and not dry_run:
+            Startup.objects.bulk_update(changed, COUNTER_FIELDS)
+        checked += len(batch_ids)
+        repaired += len(changed)
+    return checked, repaired
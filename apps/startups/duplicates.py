@@ -0,0 +1,280 @@
+# startup_hub/apps/startups/duplicates.py
+"""
+Near-duplicate startup detection.
+
+Every startup has a ``StartupFingerprint``: its name normalized to a key
+("Acme Inc", "acme.io" and "ACME" all become ``acme``), its website domain and
+MinHash signatures of the name's character trigrams and the description's
+word shingles. The signatures are cut into LSH bands stored as
+``StartupLSHBucket`` rows, so candidates for a new submission come from one
+indexed lookup - same name key, same domain or any shared band - instead of
+a scan, and are then scored by the fraction of matching MinHash values.
+
+Fingerprints are refreshed by the receiver in ``signals.py`` when a startup's
+name, website or description changes; ``find_duplicate_startups`` rebuilds
+them and clusters the existing duplicates.
+"""
+import hashlib
+import random
+import re
+import unicodedata
+from collections import namedtuple
+from urllib.parse import urlparse
+
+from django.db.models import Q
+
+from .models import StartupFingerprint, StartupLSHBucket
+
+# Startup fields that feed the fingerprint
+FINGERPRINT_FIELDS = {'name', 'website', 'description'}
+
+# (bands, rows per band): a pair shares a band with probability 1 - (1 - s^rows)^bands
+NAME_BANDS = (16, 2)
+DESCRIPTION_BANDS = (16, 4)
+
+DUPLICATE_THRESHOLD = 0.5
+
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'gmbh', 'ag', 'sa', 'sas', 'bv', 'plc', 'pvt', 'pte', 'oy', 'ab',
+}
+
+DOMAIN_SUFFIXES = {'com', 'io', 'ai', 'co', 'app', 'dev', 'net', 'org', 'xyz', 'tech', 'so', 'me', 'in'}
+
+# Hosts shared by unrelated startups (profiles, site builders); a match means nothing
+SHARED_DOMAINS = {
+    'linkedin.com', 'facebook.com', 'twitter.com', 'x.com', 'instagram.com', 'github.com',
+    'medium.com', 'notion.site', 'sites.google.com', 'wellfound.com', 'angel.co', 'crunchbase.com',
+}
+
+_PRIME = (1 << 61) - 1
+_random = random.Random(20240601)
+_PERMUTATIONS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(max(NAME_BANDS[0] * NAME_BANDS[1], DESCRIPTION_BANDS[0] * DESCRIPTION_BANDS[1]))
+]
+
+Fingerprint = namedtuple('Fingerprint', ['name_key', 'domain', 'name_minhash', 'description_minhash'])
+
+
+def words(text):
+    """Lowercase words in any script, with accents folded (``Café`` -> ``cafe``)"""
+    kept = []
+    for char in unicodedata.normalize('NFKD', text or ''):
+        # Drop accents on Latin letters only; marks like the kana dakuten change the word
+        if unicodedata.combining(char) and kept and kept[-1] < '\u0250':
+            continue
+        kept.append(char)
+    return re.findall(r'[^\W_]+', unicodedata.normalize('NFKC', ''.join(kept)).lower())
+
+
+def normalize_name(name):
+    """Name key without case, punctuation, legal suffixes or a trailing domain ending"""
+    tokens = words(name)
+    if len(tokens) > 1 and tokens[-1] in DOMAIN_SUFFIXES and re.search(r'\.\s*' + tokens[-1] + r'\s*$', name.lower()):
+        tokens = tokens[:-1]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens = tokens[:-1]
+    return ''.join(tokens)[:100]
+
+
+def website_domain(url):
+    """Host of ``url`` without ``www.``; empty for missing or shared hosts"""
+    url = (url or '').strip().lower()
+    if not url:
+        return ''
+    if '//' not in url:
+        url = f'//{url}'
+    host = (urlparse(url).hostname or '').removeprefix('www.')
+    return '' if host in SHARED_DOMAINS else host[:253]
+
+
+def name_shingles(name_key):
+    padded = f' {name_key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def description_shingles(description):
+    tokens = words(description)[:2000]
+    if len(tokens) < 3:
+        return set(tokens)
+    return {' '.join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+
+
+def stable_hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+def minhash(shingles, size):
+    if not shingles:
+        return []
+    hashes = [stable_hash(shingle) for shingle in shingles]
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS[:size]]
+
+
+def fingerprint(name, website='', description=''):
+    name_key = normalize_name(name)
+    return Fingerprint(
+        name_key=name_key,
+        domain=website_domain(website),
+        name_minhash=minhash(name_shingles(name_key), NAME_BANDS[0] * NAME_BANDS[1]),
+        description_minhash=minhash(description_shingles(description), DESCRIPTION_BANDS[0] * DESCRIPTION_BANDS[1]),
+    )
+
+
+def lsh_buckets(fp):
+    """``(band, bucket)`` pairs; description bands are numbered after the name bands"""
+    buckets = []
+    for offset, signature, (bands, rows) in [
+        (0, fp.name_minhash, NAME_BANDS),
+        (NAME_BANDS[0], fp.description_minhash, DESCRIPTION_BANDS),
+    ]:
+        for band in range(bands if signature else 0):
+            values = ','.join(str(value) for value in signature[band * rows:(band + 1) * rows])
+            bucket = int.from_bytes(hashlib.blake2b(values.encode(), digest_size=8).digest(), 'big', signed=True)
+            buckets.append((offset + band, bucket))
+    return buckets
+
+
+def estimate(a, b):
+    """Jaccard similarity estimated from two MinHash signatures"""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def similarity(a, b):
+    """``(score, reasons)`` for two fingerprints"""
+    reasons = []
+    name_score = estimate(a.name_minhash, b.name_minhash)
+    description_score = estimate(a.description_minhash, b.description_minhash)
+    if a.domain and a.domain == b.domain:
+        reasons.append('same_website')
+    if a.name_key and a.name_key == b.name_key:
+        reasons.append('same_name')
+    elif name_score >= DUPLICATE_THRESHOLD:
+        reasons.append('similar_name')
+    if description_score >= DUPLICATE_THRESHOLD:
+        reasons.append('similar_description')
+
+    score = max(name_score, description_score)
+    if 'same_website' in reasons:
+        score = 1.0
+    elif 'same_name' in reasons:
+        score = max(score, 0.95)
+    return round(score, 2), reasons
+
+
+def update_fingerprints(startups):
+    """Store fingerprints and LSH buckets for ``startups`` (objects with name, website and description)"""
+    fingerprints, buckets = [], []
+    for startup in startups:
+        fp = fingerprint(startup.name, startup.website, startup.description)
+        fingerprints.append(StartupFingerprint(startup_id=startup.pk, **fp._asdict()))
+        buckets.extend(
+            StartupLSHBucket(startup_id=startup.pk, band=band, bucket=bucket) for band, bucket in lsh_buckets(fp)
+        )
+    if not fingerprints:
+        return 0
+
+    StartupFingerprint.objects.bulk_create(
+        fingerprints,
+        update_conflicts=True,
+        unique_fields=['startup'],
+        update_fields=['name_key', 'domain', 'name_minhash', 'description_minhash', 'updated_at'],
+    )
+    StartupLSHBucket.objects.filter(startup_id__in=[fp.startup_id for fp in fingerprints]).delete()
+    StartupLSHBucket.objects.bulk_create(buckets)
+    return len(fingerprints)
+
+
+def find_duplicates(name, website='', description='', exclude_id=None, approved_only=False, limit=5):
+    """Existing startups likely to be the same company, best match first"""
+    fp = fingerprint(name, website, description)
+    if not fp.name_key:
+        return []
+
+    candidates = Q(name_key=fp.name_key)
+    if fp.domain:
+        candidates |= Q(domain=fp.domain)
+    bands = Q()
+    for band, bucket in lsh_buckets(fp):
+        bands |= Q(band=band, bucket=bucket)
+    if bands:
+        candidates |= Q(startup_id__in=StartupLSHBucket.objects.filter(bands).values('startup_id'))
+
+    queryset = StartupFingerprint.objects.filter(candidates).select_related('startup').only(
+        'name_key', 'domain', 'name_minhash', 'description_minhash',
+        'startup__name', 'startup__website', 'startup__is_approved', 'startup__logo',
+    )
+    if exclude_id:
+        queryset = queryset.exclude(startup_id=exclude_id)
+    if approved_only:
+        queryset = queryset.filter(startup__is_approved=True)
+
+    matches = []
+    for candidate in queryset:
+        score, reasons = similarity(fp, candidate)
+        if score >= DUPLICATE_THRESHOLD:
+            matches.append({
+                'id': candidate.startup_id,
+                'name': candidate.startup.name,
+                'logo': candidate.startup.logo,
+                'website': candidate.startup.website,
+                'is_approved': candidate.startup.is_approved,
+                'score': score,
+                'reasons': reasons,
+            })
+    matches.sort(key=lambda match: -match['score'])
+    return matches[:limit]
+
+
+def cluster_duplicates(threshold=DUPLICATE_THRESHOLD, max_bucket_size=200):
+    """Groups of startup ids that look like the same company, from the stored fingerprints"""
+    fingerprints = {
+        fp.startup_id: fp
+        for fp in StartupFingerprint.objects.only('name_key', 'domain', 'name_minhash', 'description_minhash').iterator()
+    }
+    parent = {startup_id: startup_id for startup_id in fingerprints}
+
+    def find(startup_id):
+        while parent[startup_id] != startup_id:
+            parent[startup_id] = parent[parent[startup_id]]
+            startup_id = parent[startup_id]
+        return startup_id
+
+    def link(group):
+        # Very common buckets (one-word names, boilerplate text) would make this quadratic
+        if len(group) < 2 or len(group) > max_bucket_size:
+            return
+        for i, a in enumerate(group):
+            for b in group[i + 1:]:
+                if find(a) != find(b) and similarity(fingerprints[a], fingerprints[b])[0] >= threshold:
+                    parent[find(a)] = find(b)
+
+    # Same name key or website is a match on its own, however large the group
+    groups = {}
+    for startup_id, fp in fingerprints.items():
+        # An empty key (a name of only symbols) says nothing about the company
+        if fp.name_key:
+            groups.setdefault(('name', fp.name_key), []).append(startup_id)
+        if fp.domain:
+            groups.setdefault(('domain', fp.domain), []).append(startup_id)
+    for group in groups.values():
+        for startup_id in group[1:]:
+            parent[find(startup_id)] = find(group[0])
+
+    group, current = [], None
+    buckets = StartupLSHBucket.objects.order_by('band', 'bucket').values_list('band', 'bucket', 'startup_id')
+    for band, bucket, startup_id in buckets.iterator(chunk_size=5000):
+        if (band, bucket) != current:
+            link(group)
+            group, current = [], (band, bucket)
+        if startup_id in fingerprints:
+            group.append(startup_id)
+    link(group)
+
+    clusters = {}
+    for startup_id in fingerprints:
+        clusters.setdefault(find(startup_id), []).append(startup_id)
+    return sorted((sorted(ids) for ids in clusters.values() if len(ids) > 1), key=len, reverse=True)
@@ -0,0 +1,271 @@
+# startup_hub/apps/startups/facets.py
+"""
+Facet counts for the startup directory sidebar.
+
+A compact snapshot of every approved startup (industry, location, year, size,
+funding, flags, rating and tags) is loaded once, cached, and kept in process
+memory. Facets are computed from it in a single pass: a startup counts toward
+a facet when it passes every applied filter except that facet's own, so each
+option shows how many results selecting it would give.
+
+Snapshots and computed facets are keyed by a cache generation that is bumped
+(``invalidate_facets``) when startups are approved, edited or deleted, or
+their tags or industries change. Ratings drift until ``FACET_CACHE_TIMEOUT``.
+"""
+import hashlib
+import time
+from collections import Counter, namedtuple
+
+from django.core.cache import cache
+
+from .models import Industry, Startup, StartupTag
+from .search import search_startups
+
+FACET_GENERATION_KEY = 'startups:facets:generation'
+FACET_SNAPSHOT_KEY = 'startups:facets:snapshot:{}'
+FACET_RESULT_KEY = 'startups:facets:result:{}:{}'
+FACET_CACHE_TIMEOUT = 10 * 60
+
+# Startup fields captured in the snapshot; saves touching only other fields keep the cache
+FACET_FIELDS = {
+    'is_approved', 'industry', 'location', 'founded_year', 'employee_count',
+    'funding_amount', 'is_featured', 'is_claimed', 'claim_verified',
+}
+
+POPULAR_TAG_LIMIT = 20
+
+EMPLOYEE_RANGES = [
+    {'label': '1-10', 'min': 1, 'max': 10},
+    {'label': '11-50', 'min': 11, 'max': 50},
+    {'label': '51-200', 'min': 51, 'max': 200},
+    {'label': '201-500', 'min': 201, 'max': 500},
+    {'label': '500+', 'min': 500, 'max': None},
+]
+
+# Query parameters that change facet results (see StartupViewSet.get_queryset)
+FILTER_PARAMS = [
+    'industry', 'location', 'min_employees', 'max_employees', 'min_founded_year',
+    'max_founded_year', 'min_rating', 'has_funding', 'tags', 'featured', 'claimed', 'search',
+]
+
+FacetRow = namedtuple('FacetRow', [
+    'id', 'industry_id', 'location', 'founded_year', 'employee_count',
+    'funded', 'is_featured', 'claim_verified', 'rating', 'tags',
+])
+
+_snapshot = (None, None)
+
+
+def generation():
+    value = cache.get(FACET_GENERATION_KEY)
+    if value is None:
+        # Start from the clock so a lost key never revives an older generation
+        cache.add(FACET_GENERATION_KEY, int(time.time()), None)
+        value = cache.get(FACET_GENERATION_KEY)
+    return value
+
+
+def invalidate_facets():
+    try:
+        cache.incr(FACET_GENERATION_KEY)
+    except ValueError:
+        cache.set(FACET_GENERATION_KEY, int(time.time()), None)
+
+
+def load_snapshot():
+    """Rows for every approved startup plus the industries they use"""
+    tags = {}
+    for startup_id, tag in StartupTag.objects.filter(startup__is_approved=True).values_list('startup_id', 'tag'):
+        tags.setdefault(startup_id, []).append(tag)
+
+    rows = [
+        FacetRow(
+            id=startup_id,
+            industry_id=industry_id,
+            location=location,
+            founded_year=founded_year,
+            employee_count=employee_count,
+            funded=bool(funding_amount),
+            is_featured=is_featured,
+            claim_verified=is_claimed and claim_verified,
+            rating=rating_average,
+            tags=tuple(tags.get(startup_id, ())),
+        )
+        for (
+            startup_id, industry_id, location, founded_year, employee_count,
+            funding_amount, is_featured, is_claimed, claim_verified, rating_average
+        ) in Startup.objects.filter(is_approved=True).values_list(
+            'id', 'industry_id', 'location', 'founded_year', 'employee_count',
+            'funding_amount', 'is_featured', 'is_claimed', 'claim_verified', 'rating_average'
+        )
+    ]
+    industries = {
+        industry['id']: industry for industry in Industry.objects.filter(
+            id__in={row.industry_id for row in rows}
+        ).values('id', 'name', 'description', 'icon')
+    }
+    return {'rows': rows, 'industries': industries}
+
+
+def get_snapshot():
+    """Current snapshot, from process memory, then the cache, then the database"""
+    global _snapshot
+    current = generation()
+    if _snapshot[0] != current:
+        key = FACET_SNAPSHOT_KEY.format(current)
+        data = cache.get(key)
+        if data is None:
+            data = load_snapshot()
+            cache.set(key, data, FACET_CACHE_TIMEOUT)
+        _snapshot = (current, data)
+    return _snapshot[1]
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_filters(params):
+    """Map each applied facet to a predicate over FacetRow"""
+    filters = {}
+
+    industries = {to_int(value) for value in params.getlist('industry')} - {None}
+    if industries:
+        filters['industry'] = lambda row: row.industry_id in industries
+
+    location = params.get('location', '').strip().lower()
+    if location:
+        filters['location'] = lambda row: location in row.location.lower()
+
+    min_employees, max_employees = to_int(params.get('min_employees')), to_int(params.get('max_employees'))
+    if min_employees is not None or max_employees is not None:
+        filters['employees'] = lambda row: (
+            (min_employees is None or row.employee_count >= min_employees)
+            and (max_employees is None or row.employee_count <= max_employees)
+        )
+
+    min_year, max_year = to_int(params.get('min_founded_year')), to_int(params.get('max_founded_year'))
+    if min_year is not None or max_year is not None:
+        filters['founded_year'] = lambda row: (
+            (min_year is None or row.founded_year >= min_year)
+            and (max_year is None or row.founded_year <= max_year)
+        )
+
+    try:
+        min_rating = float(params['min_rating']) if params.get('min_rating') else None
+    except ValueError:
+        min_rating = None
+    if min_rating is not None:
+        filters['rating'] = lambda row: row.rating >= min_rating
+
+    has_funding = params.get('has_funding')
+    if has_funding in ('true', 'false'):
+        funded = has_funding == 'true'
+        filters['funding'] = lambda row: row.funded == funded
+
+    tags = set(params.getlist('tags'))
+    if tags:
+        filters['tags'] = lambda row: not tags.isdisjoint(row.tags)
+
+    if params.get('featured') == 'true':
+        filters['featured'] = lambda row: row.is_featured
+
+    claimed = params.get('claimed')
+    if claimed in ('true', 'false'):
+        verified = claimed == 'true'
+        filters['claimed'] = lambda row: row.claim_verified == verified
+
+    search = params.get('search', '').strip()
+    if search:
+        matching = set(search_startups(Startup.objects.filter(is_approved=True), search).values_list('id', flat=True))
+        filters['search'] = lambda row: row.id in matching
+
+    return filters
+
+
+def compute_facets(snapshot, filters):
+    """Count every facet, each conditioned on all the other applied filters"""
+    total = 0
+    industry_counts = Counter()
+    location_counts = Counter()
+    tag_counts = Counter()
+    funding_counts = Counter()
+    employee_counts = [0] * len(EMPLOYEE_RANGES)
+    years = []
+
+    for row in snapshot['rows']:
+        failed = None
+        for name, passes in filters.items():
+            if not passes(row):
+                if failed is not None:
+                    break
+                failed = name
+        else:
+            if failed is None:
+                total += 1
+            if failed in (None, 'industry'):
+                industry_counts[row.industry_id] += 1
+            if failed in (None, 'location') and row.location:
+                location_counts[row.location] += 1
+            if failed in (None, 'tags'):
+                tag_counts.update(row.tags)
+            if failed in (None, 'funding'):
+                funding_counts[row.funded] += 1
+            if failed in (None, 'employees'):
+                for index, bucket in enumerate(EMPLOYEE_RANGES):
+                    if row.employee_count >= bucket['min'] and (bucket['max'] is None or row.employee_count <= bucket['max']):
+                        employee_counts[index] += 1
+                        break
+            if failed in (None, 'founded_year'):
+                years.append(row.founded_year)
+
+    industries = sorted(snapshot['industries'].values(), key=lambda industry: industry['name'])
+    popular_tags = tag_counts.most_common(POPULAR_TAG_LIMIT)
+    return {
+        'total': total,
+        'industries': [
+            dict(industry, startup_count=industry_counts[industry['id']]) for industry in industries
+        ],
+        'locations': sorted(location_counts),
+        'location_counts': [
+            {'location': location, 'count': count} for location, count in location_counts.most_common()
+        ],
+        'popular_tags': [tag for tag, _ in popular_tags],
+        'tag_counts': [{'tag': tag, 'count': count} for tag, count in popular_tags],
+        'employee_ranges': [
+            dict(bucket, count=count) for bucket, count in zip(EMPLOYEE_RANGES, employee_counts)
+        ],
+        'funding_counts': {'with_funding': funding_counts[True], 'without_funding': funding_counts[False]},
+        'founded_year_range': {
+            'min_year': min(years) if years else None,
+            'max_year': max(years) if years else None,
+        },
+    }
+
+
+def get_facets(params):
+    """Facets for the given query parameters, cached per filter combination"""
+    applied = sorted(
+        (name, value) for name in FILTER_PARAMS for value in params.getlist(name) if value
+    )
+    digest = hashlib.md5(repr(applied).encode()).hexdigest()
+    key = FACET_RESULT_KEY.format(generation(), digest)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(get_snapshot(), parse_filters(params))
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
+
+
+def get_directory_stats():
+    """Totals for the welcome page, from the same snapshot"""
+    snapshot = get_snapshot()
+    rows = snapshot['rows']
+    return {
+        'total_startups': len(rows),
+        'total_industries': len({row.industry_id for row in rows}),
+        'featured_count': sum(1 for row in rows if row.is_featured),
+    }
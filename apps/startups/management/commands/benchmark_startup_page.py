@@ -0,0 +1,130 @@
+# startup_hub/apps/startups/management/commands/benchmark_startup_page.py
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core.benchmarks import require_scratch_database
+from apps.startups.counters import reconcile_counters
+from apps.startups.models import (
+    Industry, Startup, StartupBookmark, StartupComment, StartupLike, StartupRating, StartupTag
+)
+from apps.startups.views import StartupViewSet
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Count the queries needed to serve a page of the startup directory (DEBUG or test databases only; apps.startups.tests pins the budget)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--startups',
+            type=int,
+            default=20,
+            help='Startups created for the page (the page size is 20)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10,
+            help='Users rating, liking, bookmarking and commenting on every startup',
+        )
+        parser.add_argument(
+            '--max-queries',
+            type=int,
+            default=10,
+            help='Fail if the list page takes more queries than this',
+        )
+
+    def handle(self, *args, **options):
+        require_scratch_database()
+
+        suffix = uuid.uuid4().hex[:8]
+        users = [
+            User.objects.create_user(
+                email=f'bench_{suffix}_{index}@example.com',
+                username=f'bench_{suffix}_{index}'
+            )
+            for index in range(options['users'])
+        ]
+        industry = Industry.objects.create(name=f'Bench {suffix}')
+
+        try:
+            startups = Startup.objects.bulk_create([
+                Startup(
+                    name=f'Bench startup {index}',
+                    description='benchmark',
+                    industry=industry,
+                    location='Remote',
+                    founded_year=2020,
+                    is_approved=True
+                )
+                for index in range(options['startups'])
+            ])
+            StartupTag.objects.bulk_create([
+                StartupTag(startup=startup, tag=tag) for startup in startups for tag in ('ai', 'saas')
+            ])
+            StartupRating.objects.bulk_create([
+                StartupRating(startup=startup, user=user, rating=random.randint(1, 5))
+                for startup in startups for user in users
+            ])
+            StartupLike.objects.bulk_create([
+                StartupLike(startup=startup, user=user)
+                for startup in startups for user in users if random.random() < 0.5
+            ])
+            StartupBookmark.objects.bulk_create([
+                StartupBookmark(startup=startup, user=user)
+                for startup in startups for user in users if random.random() < 0.3
+            ])
+            StartupComment.objects.bulk_create([
+                StartupComment(startup=startup, user=user, text='benchmark')
+                for startup in startups for user in users if random.random() < 0.3
+            ])
+            # bulk_create bypasses the counter receivers; recount just the benchmark startups
+            reconcile_counters(startup_ids=[startup.id for startup in startups])
+
+            viewer = users[0]
+            list_view = StartupViewSet.as_view({'get': 'list'})
+            detail_view = StartupViewSet.as_view({'get': 'retrieve'})
+
+            def get_list():
+                request = APIRequestFactory().get('/api/startups/', {'industry': industry.id})
+                force_authenticate(request, user=viewer)
+                response = list_view(request)
+                response.render()
+                return response
+
+            def get_detail():
+                request = APIRequestFactory().get(f'/api/startups/{startups[0].id}/')
+                force_authenticate(request, user=viewer)
+                response = detail_view(request, pk=startups[0].id)
+                response.render()
+                return response
+
+            list_queries, list_time = self.measure(get_list)
+            detail_queries, detail_time = self.measure(get_detail)
+        finally:
+            industry.delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.stdout.write(f'{options["startups"]} startups, {options["users"]} engaged users')
+        self.stdout.write(f'List page:   {list_queries} queries, {list_time * 1000:.1f} ms')
+        self.stdout.write(f'Detail page: {detail_queries} queries, {detail_time * 1000:.1f} ms')
+
+        if list_queries > options['max_queries']:
+            raise CommandError(f'List page took {list_queries} queries, budget is {options["max_queries"]}')
+
+        self.stdout.write(self.style.SUCCESS('Query budget met'))
+
+    def measure(self, fetch):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = fetch()
+            elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise CommandError(f'Request failed with status {response.status_code}')
+        return len(queries), elapsed
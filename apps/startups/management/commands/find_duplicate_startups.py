@@ -0,0 +1,56 @@
+# startup_hub/apps/startups/management/commands/find_duplicate_startups.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.startups.duplicates import DUPLICATE_THRESHOLD, cluster_duplicates, update_fingerprints
+from apps.startups.models import Startup
+
+
+class Command(BaseCommand):
+    help = 'Cluster startups that look like the same company, optionally rebuilding their fingerprints first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute every fingerprint (needed once for startups created before fingerprinting)',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DUPLICATE_THRESHOLD,
+            help='Minimum similarity for two startups to be clustered',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Startups fingerprinted per batch',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            started = time.perf_counter()
+            startups = Startup.objects.order_by('id').only('id', 'name', 'website', 'description')
+            batch, rebuilt = [], 0
+            for startup in startups.iterator(chunk_size=options['batch_size']):
+                batch.append(startup)
+                if len(batch) >= options['batch_size']:
+                    rebuilt += update_fingerprints(batch)
+                    batch = []
+            rebuilt += update_fingerprints(batch)
+            self.stdout.write(f'Rebuilt {rebuilt} fingerprints in {time.perf_counter() - started:.1f}s')
+
+        started = time.perf_counter()
+        clusters = cluster_duplicates(threshold=options['threshold'])
+        names = dict(
+            Startup.objects.filter(id__in=[pk for cluster in clusters for pk in cluster]).values_list('id', 'name')
+        )
+        for cluster in clusters:
+            self.stdout.write(', '.join(f'{names.get(pk, "?")} (#{pk})' for pk in cluster))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Found {len(clusters)} duplicate clusters covering {sum(len(cluster) for cluster in clusters)} startups '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
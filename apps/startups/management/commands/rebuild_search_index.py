@@ -0,0 +1,29 @@
+# startup_hub/apps/startups/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.startups.models import Startup
+from apps.startups.search import search_enabled, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vectors of startups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Startups updated per statement',
+        )
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            raise CommandError('Full-text search needs PostgreSQL; this database uses the icontains fallback')
+
+        startup_ids = list(Startup.objects.order_by('id').values_list('id', flat=True))
+        batch_size = options['batch_size']
+        updated = 0
+        for start in range(0, len(startup_ids), batch_size):
+            updated += update_search_vectors(startup_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search vectors for {updated} startups'))
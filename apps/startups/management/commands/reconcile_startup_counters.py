@@ -0,0 +1,32 @@
+# startup_hub/apps/startups/management/commands/reconcile_startup_counters.py
+from django.core.management.base import BaseCommand
+
+from apps.startups.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount startup like, bookmark, comment and rating counters and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Startups recounted and updated per batch',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted startups without writing',
+        )
+
+    def handle(self, *args, **options):
+        checked, repaired = reconcile_counters(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Checked {checked} startups; {repaired} had drifted counters'
+        ))
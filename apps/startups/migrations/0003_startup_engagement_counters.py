@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:47
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Fill the new counters from existing engagement rows, one UPDATE per column"""
+    Startup = apps.get_model('startups', 'Startup')
+
+    def total(model_name, aggregate):
+        model = apps.get_model('startups', model_name)
+        return Coalesce(
+            Subquery(
+                model.objects.filter(startup=OuterRef('pk')).order_by().values('startup').annotate(
+                    total=aggregate
+                ).values('total')
+            ),
+            0
+        )
+
+    Startup.objects.update(
+        like_count=total('StartupLike', Count('pk')),
+        bookmark_count=total('StartupBookmark', Count('pk')),
+        comment_count=total('StartupComment', Count('pk')),
+        rating_count=total('StartupRating', Count('pk')),
+        rating_sum=total('StartupRating', Sum('rating')),
+    )
+    Startup.objects.filter(rating_count__gt=0).update(
+        rating_average=Cast('rating_sum', FloatField()) / Cast('rating_count', FloatField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='bookmark_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='rating_average',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='startup',
+            index=models.Index(fields=['rating_average'], name='startups_st_rating_avg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='startup',
+            index=models.Index(fields=['rating_count'], name='startups_st_rating_cnt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='startup',
+            index=models.Index(fields=['like_count'], name='startups_st_like_cnt_idx'),
+        ),
+    ]
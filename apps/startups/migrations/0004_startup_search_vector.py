@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+class PostgresAddIndex(migrations.AddIndex):
+    """GIN indexes only exist on PostgreSQL; other backends just record the state"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def build_search_vectors(apps, schema_editor):
+    """Same document as search.startup_search_vector, built for every startup"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Startup = apps.get_model('startups', 'Startup')
+
+    def related_text(model_name, field):
+        model = apps.get_model('startups', model_name)
+        return Coalesce(
+            Subquery(
+                model.objects.filter(startup=OuterRef('pk')).order_by().values('startup').annotate(
+                    text=StringAgg(field, ' ')
+                ).values('text')
+            ),
+            Value(''),
+            output_field=TextField()
+        )
+
+    Startup.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector(related_text('StartupTag', 'tag'), weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+        + SearchVector(related_text('StartupFounder', 'name'), 'location', weight='D', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0003_startup_engagement_counters'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='startup',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(build_search_vectors, migrations.RunPython.noop),
+        PostgresAddIndex(
+            model_name='startup',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='startups_st_search_gin'),
+        ),
+        PostgresAddIndex(
+            model_name='startup',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='startups_st_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0004_startup_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('ratings', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='startup',
+            index=models.Index(fields=['is_approved', '-trending_score'], name='startups_st_trending_idx'),
+        ),
+        migrations.AddField(
+            model_name='startupactivity',
+            name='startup',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='startups.startup'),
+        ),
+        migrations.AddIndex(
+            model_name='startupactivity',
+            index=models.Index(fields=['hour'], name='startups_sa_hour_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='startupactivity',
+            unique_together={('startup', 'hour')},
+        ),
+    ]
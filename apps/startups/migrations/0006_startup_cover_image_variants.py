@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0005_startup_trending_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
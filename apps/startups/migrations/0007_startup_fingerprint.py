@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0006_startup_cover_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupFingerprint',
+            fields=[
+                ('startup', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='startups.startup')),
+                ('name_key', models.CharField(db_index=True, max_length=100)),
+                ('domain', models.CharField(blank=True, db_index=True, max_length=253)),
+                ('name_minhash', models.JSONField(default=list)),
+                ('description_minhash', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StartupLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='startups.startup')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='startups_lsh_bucket_idx')],
+                'unique_together': {('startup', 'band')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 23:40
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def rebuild_search_vectors(apps, schema_editor):
+    """Same document as search.startup_search_vector, now with the industry name, built for every startup"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Startup = apps.get_model('startups', 'Startup')
+    Industry = apps.get_model('startups', 'Industry')
+
+    def text(subquery):
+        return Coalesce(Subquery(subquery), Value(''), output_field=TextField())
+
+    def related_text(model_name, field):
+        model = apps.get_model('startups', model_name)
+        return text(
+            model.objects.filter(startup=OuterRef('pk')).order_by().values('startup').annotate(
+                text=StringAgg(field, ' ')
+            ).values('text')
+        )
+
+    industry_name = text(Industry.objects.filter(pk=OuterRef('industry_id')).values('name'))
+
+    Startup.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector(related_text('StartupTag', 'tag'), weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+        + SearchVector(related_text('StartupFounder', 'name'), 'location', industry_name, weight='D', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startups', '0007_startup_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_vectors, migrations.RunPython.noop),
+    ]
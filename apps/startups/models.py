@@ -1,9 +1,13 @@
 # startup_hub/apps/startups/models.py - Complete file with startup claiming functionality
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from apps.core.images import largest_variant_url
 import json
 import os
 from uuid import uuid4
@@ -54,6 +58,42 @@ class UserProfile(models.Model):
         verbose_name = "User Profile"
         verbose_name_plural = "User Profiles"
 
+def count_subquery(model, aggregate=None, **filters):
+    """Per-startup count (or other ``aggregate``) of ``model`` rows as a correlated subquery"""
+    return Coalesce(
+        models.Subquery(
+            model.objects.filter(startup=models.OuterRef('pk'), **filters).order_by().values('startup').annotate(
+                total=aggregate or models.Count('pk')
+            ).values('total')
+        ),
+        0
+    )
+
+class StartupQuerySet(models.QuerySet):
+    
+    def with_stats(self):
+        """Annotate the pending edit and claim request flags
+        
+        Engagement counts are columns on ``Startup`` (see counters.py).
+        """
+        return self.annotate(
+            pending_edits=models.Exists(
+                StartupEditRequest.objects.filter(startup=models.OuterRef('pk'), status='pending')
+            ),
+            pending_claims=models.Exists(
+                StartupClaimRequest.objects.filter(startup=models.OuterRef('pk'), status='pending')
+            ),
+        )
+    
+    def with_details(self):
+        """Related rows rendered by ``StartupDetailSerializer``"""
+        return self.select_related('industry', 'claimed_by', 'submitted_by').prefetch_related(
+            'founders',
+            'tags',
+            models.Prefetch('ratings', queryset=StartupRating.objects.select_related('user')),
+            models.Prefetch('comments', queryset=StartupComment.objects.select_related('user')),
+        )
+
 class Startup(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
@@ -74,6 +114,8 @@ class Startup(models.Model):
         null=True, 
         help_text='Or provide a URL to an external cover image'
     )
+    # Resized variants of an uploaded cover (see apps/core/images.py)
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     # Financial info
     funding_amount = models.CharField(max_length=20, blank=True)
@@ -108,6 +150,17 @@ class Startup(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     views = models.PositiveIntegerField(default=0)
     
+    # Engagement counters, maintained by the interaction actions (see counters.py)
+    like_count = models.PositiveIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0)
+    
+    # Decayed recent activity, recomputed in the background (see trending.py)
+    trending_score = models.FloatField(default=0)
+    
     # Contact information
     contact_email = models.EmailField(blank=True)
     contact_phone = models.CharField(max_length=20, blank=True)
@@ -117,23 +170,28 @@ class Startup(models.Model):
     # Social media fields (JSON field to store multiple social links)
     social_media = models.JSONField(default=dict, blank=True, help_text='Social media links as JSON')
     
+    # Weighted full-text document, maintained by search.py (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = StartupQuerySet.as_manager()
+    
     def __str__(self):
         return self.name
     
     @property
     def average_rating(self):
-        ratings = self.ratings.all()
-        if ratings:
-            return sum(r.rating for r in ratings) / len(ratings)
-        return 0
+        return self.rating_average
     
     @property
     def total_ratings(self):
-        return self.ratings.count()
+        return self.rating_count
     
     @property
     def cover_image_display_url(self):
-        """Get the cover image URL (either uploaded file or external URL)"""
+        """Get the cover image URL (resized upload, uploaded file or external URL)"""
+        resized = largest_variant_url(self.cover_image_variants)
+        if resized:
+            return resized
         if self.cover_image:
             return self.cover_image.url
         elif self.cover_image_url:
@@ -160,11 +218,11 @@ class Startup(models.Model):
             return True
         
         # Verified claimed user can edit
-        if self.is_claimed and self.claim_verified and self.claimed_by == user:
+        if self.is_claimed and self.claim_verified and self.claimed_by_id == user.id:
             return True
         
         # Original submitter can edit if they're premium
-        if self.submitted_by == user:
+        if self.submitted_by_id == user.id:
             try:
                 profile = user.profile
                 return profile.is_premium_active
@@ -190,10 +248,14 @@ class Startup(models.Model):
     
     def has_pending_edits(self):
         """Check if there are pending edit requests"""
+        if hasattr(self, 'pending_edits'):
+            return self.pending_edits
         return self.edit_requests.filter(status='pending').exists()
     
     def has_pending_claims(self):
         """Check if there are pending claim requests"""
+        if hasattr(self, 'pending_claims'):
+            return self.pending_claims
         return self.claim_requests.filter(status='pending').exists()
     
     def save(self, *args, **kwargs):
@@ -212,6 +274,12 @@ class Startup(models.Model):
             models.Index(fields=['location', 'is_approved'], name='startups_st_locatio_5f06e2_idx'),
             models.Index(fields=['created_at'], name='startups_st_created_93e688_idx'),
             models.Index(fields=['is_claimed', 'claim_verified'], name='startups_st_claimed_idx'),
+            models.Index(fields=['rating_average'], name='startups_st_rating_avg_idx'),
+            models.Index(fields=['rating_count'], name='startups_st_rating_cnt_idx'),
+            models.Index(fields=['like_count'], name='startups_st_like_cnt_idx'),
+            models.Index(fields=['is_approved', '-trending_score'], name='startups_st_trending_idx'),
+            GinIndex(fields=['search_vector'], name='startups_st_search_gin'),
+            GinIndex(fields=['name'], name='startups_st_name_trgm', opclasses=['gin_trgm_ops']),
         ]
 
 class StartupClaimRequest(models.Model):
@@ -312,7 +380,7 @@ class StartupClaimRequest(models.Model):
             self.startup.claimed_by = self.user
             self.startup.is_claimed = True
             self.startup.claim_verified = True
-            self.startup.save(update_fields=['claimed_by', 'is_claimed', 'claim_verified'])
+            self.startup.save(update_fields=['claimed_by', 'is_claimed', 'claim_verified', 'updated_at'])
             
             # Reject all other pending claims for this startup
             StartupClaimRequest.objects.filter(
@@ -527,4 +595,46 @@ class StartupLike(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['startup', 'created_at'], name='startups_st_startup_618547_idx'),
-        ]
\ No newline at end of file
+        ]
+
+class StartupActivity(models.Model):
+    """Hourly engagement bucket for one startup, the input to trending scores"""
+    startup = models.ForeignKey(Startup, on_delete=models.CASCADE, related_name='activity')
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    ratings = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['startup', 'hour']
+        ordering = ['-hour']
+        indexes = [
+            models.Index(fields=['hour'], name='startups_sa_hour_idx'),
+        ]
+
+
+class StartupFingerprint(models.Model):
+    """Normalized name, domain and MinHash signatures used to spot duplicate startups"""
+    startup = models.OneToOneField(Startup, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    name_key = models.CharField(max_length=100, db_index=True)
+    domain = models.CharField(max_length=253, blank=True, db_index=True)
+    name_minhash = models.JSONField(default=list)
+    description_minhash = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Fingerprint of {self.startup_id}: {self.name_key}"
+
+
+class StartupLSHBucket(models.Model):
+    """One LSH band of a startup's signatures; startups sharing a bucket are duplicate candidates"""
+    startup = models.ForeignKey(Startup, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    
+    class Meta:
+        unique_together = ['startup', 'band']
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='startups_lsh_bucket_idx'),
+        ]
@@ -0,0 +1,105 @@
+# startup_hub/apps/startups/search.py
+"""
+Directory search for startups.
+
+On PostgreSQL each startup carries a weighted ``search_vector`` (name A,
+tags B, description C, founders, location and industry D) behind a GIN index, and the
+name has a trigram index for typo-tolerant matches. Matches are ranked by
+text relevance plus name similarity, boosted by engagement.
+
+The vector is refreshed by the receivers in ``signals.py`` when a startup's
+text, industry, tags or founders change, or its industry is renamed;
+``rebuild_search_index`` rebuilds it in bulk.
+
+Other databases (SQLite in local settings) fall back to ``icontains``
+matching ordered by engagement.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Ln
+
+from .models import Industry, Startup, StartupFounder, StartupTag
+
+SEARCH_CONFIG = 'english'
+
+# Startup fields that feed the search vector
+SEARCH_FIELDS = {'name', 'description', 'location', 'industry'}
+
+# Weight of log(1 + likes + comments + ratings) in the ranking boost
+ENGAGEMENT_WEIGHT = 0.1
+
+
+def search_enabled():
+    return connection.vendor == 'postgresql'
+
+
+def related_text(model, field):
+    """Space-joined ``field`` values of a startup's ``model`` rows"""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(startup=OuterRef('pk')).order_by().values('startup').annotate(
+                text=StringAgg(field, ' ')
+            ).values('text')
+        ),
+        Value(''),
+        output_field=TextField()
+    )
+
+
+def startup_search_vector():
+    # Subquery rather than a join: UPDATE cannot reference related tables
+    industry_name = Coalesce(
+        Subquery(Industry.objects.filter(pk=OuterRef('industry_id')).values('name')),
+        Value(''),
+        output_field=TextField()
+    )
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(related_text(StartupTag, 'tag'), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+        + SearchVector(
+            related_text(StartupFounder, 'name'), 'location', industry_name, weight='D', config=SEARCH_CONFIG
+        )
+    )
+
+
+def update_search_vectors(startup_ids=None):
+    """Recompute the search vector for some (or all) startups in one statement"""
+    if not search_enabled():
+        return 0
+    queryset = Startup.objects.all()
+    if startup_ids is not None:
+        queryset = queryset.filter(id__in=startup_ids)
+    return queryset.update(search_vector=startup_search_vector())
+
+
+def engagement():
+    return F('like_count') + F('comment_count') + F('rating_count')
+
+
+def search_startups(queryset, text):
+    """Filter ``queryset`` to matches for ``text``, annotated with ``search_score``"""
+    text = text.strip()
+    if not text:
+        return queryset
+
+    if not search_enabled():
+        return queryset.filter(
+            Q(name__icontains=text) |
+            Q(description__icontains=text) |
+            Q(location__icontains=text) |
+            Q(industry__name__icontains=text) |
+            Q(id__in=StartupTag.objects.filter(tag__icontains=text).values('startup_id')) |
+            Q(id__in=StartupFounder.objects.filter(name__icontains=text).values('startup_id'))
+        ).annotate(search_score=Cast(engagement(), FloatField()))
+
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(
+        Q(search_vector=query) | Q(name__trigram_similar=text)
+    ).annotate(
+        search_score=(
+            SearchRank(F('search_vector'), query) + TrigramSimilarity('name', text)
+        ) * (1 + ENGAGEMENT_WEIGHT * Ln(1 + engagement()))
+    )
@@ -2,8 +2,10 @@
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 from datetime import timedelta
+from apps.core.images import image_srcset
 from .models import (
     Industry, Startup, StartupFounder, StartupTag, StartupRating, 
     StartupComment, StartupBookmark, StartupLike, UserProfile, 
@@ -228,6 +230,52 @@ class StartupClaimRequestDetailSerializer(StartupClaimRequestSerializer):
     def get_is_expired(self, obj):
         return obj.is_expired()
 
+STARTUP_STAT_FIELDS = ['pending_edits', 'pending_claims']
+
+def prime_startup_state(context, startups):
+    """Batch-load counts and the viewer's state for a page of startups
+    
+    Startups not loaded through ``Startup.objects.with_stats()`` get their
+    pending request flags in one extra query. The viewer's likes, bookmarks and pending
+    claims on the page take one query each, stored in
+    ``context['startup_state']``.
+    """
+    ids = [startup.id for startup in startups]
+    unannotated = [startup for startup in startups if not hasattr(startup, 'pending_edits')]
+    if unannotated:
+        stats = {
+            row['id']: row for row in Startup.objects.filter(
+                id__in=[startup.id for startup in unannotated]
+            ).with_stats().values('id', *STARTUP_STAT_FIELDS)
+        }
+        for startup in unannotated:
+            for field in STARTUP_STAT_FIELDS:
+                setattr(startup, field, stats[startup.id][field])
+    
+    prefetch_related_objects(startups, 'tags')
+    
+    request = context.get('request')
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        state = {
+            'liked': set(StartupLike.objects.filter(user=user, startup_id__in=ids).values_list('startup_id', flat=True)),
+            'bookmarked': set(StartupBookmark.objects.filter(user=user, startup_id__in=ids).values_list('startup_id', flat=True)),
+            'claiming': set(StartupClaimRequest.objects.filter(
+                user=user, startup_id__in=ids, status='pending'
+            ).values_list('startup_id', flat=True)),
+        }
+    else:
+        state = {'liked': set(), 'bookmarked': set(), 'claiming': set()}
+    context['startup_state'] = state
+
+class StartupPageSerializer(serializers.ListSerializer):
+    """Batch-load data shared by all startups in a page"""
+    
+    def to_representation(self, data):
+        startups = list(data.all() if hasattr(data, 'all') else data)
+        prime_startup_state(self.context, startups)
+        return super().to_representation(startups)
+
 # Base list serializer - MUST come before DetailSerializer
 class StartupListSerializer(serializers.ModelSerializer):
     industry_name = serializers.CharField(source='industry.name', read_only=True)
@@ -246,6 +294,7 @@ class StartupListSerializer(serializers.ModelSerializer):
     has_pending_edits = serializers.SerializerMethodField()
     has_pending_claims = serializers.SerializerMethodField()
     cover_image_display_url = serializers.ReadOnlyField()
+    cover_image_srcset = serializers.SerializerMethodField()
     
     # Claim information
     is_claimed = serializers.ReadOnlyField()
@@ -258,38 +307,51 @@ class StartupListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Startup
+        list_serializer_class = StartupPageSerializer
         fields = [
             'id', 'name', 'description', 'industry', 'industry_name', 'industry_icon',
             'location', 'website', 'logo', 'funding_amount', 'valuation', 'employee_count',
             'founded_year', 'is_featured', 'revenue', 'user_count', 'growth_rate',
             'views', 'average_rating', 'total_ratings', 'is_bookmarked', 'is_liked',
             'tags_list', 'created_at', 'total_likes', 'total_bookmarks', 'total_comments',
-            'cover_image_url', 'cover_image_display_url', 'can_edit', 'can_delete', 'can_claim', 'has_pending_edits',
+            'cover_image_url', 'cover_image_display_url', 'cover_image_srcset', 'can_edit', 'can_delete', 'can_claim', 'has_pending_edits',
             'has_pending_claims', 'is_approved', 'contact_email', 'contact_phone', 
             'business_model', 'target_market', 'is_claimed', 'claim_verified', 'claimed_by_username',
             'has_analytics_access', 'has_advanced_search'
         ]
     
+    def batched_state(self):
+        """Viewer state batch-loaded by StartupPageSerializer, if any"""
+        return self.context.get('startup_state')
+    
     def get_is_bookmarked(self, obj):
+        state = self.batched_state()
+        if state is not None:
+            return obj.id in state['bookmarked']
+        
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             return StartupBookmark.objects.filter(startup=obj, user=request.user).exists()
         return False
     
     def get_is_liked(self, obj):
+        state = self.batched_state()
+        if state is not None:
+            return obj.id in state['liked']
+        
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             return StartupLike.objects.filter(startup=obj, user=request.user).exists()
         return False
     
     def get_total_likes(self, obj):
-        return obj.likes.count()
+        return obj.like_count
     
     def get_total_bookmarks(self, obj):
-        return obj.bookmarks.count()
+        return obj.bookmark_count
     
     def get_total_comments(self, obj):
-        return obj.comments.count()
+        return obj.comment_count
     
     def get_can_edit(self, obj):
         request = self.context.get('request')
@@ -308,6 +370,10 @@ class StartupListSerializer(serializers.ModelSerializer):
     def get_can_claim(self, obj):
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
+            state = self.batched_state()
+            if state is not None:
+                # Same rules as Startup.can_claim, with the viewer's pending claims preloaded
+                return not (obj.is_claimed and obj.claim_verified) and obj.id not in state['claiming']
             return obj.can_claim(request.user)
         return False
     
@@ -333,6 +399,9 @@ class StartupListSerializer(serializers.ModelSerializer):
         # Disabled while subscriptions app is not active
         return False
     
+    def get_cover_image_srcset(self, obj):
+        return image_srcset(obj.cover_image_variants)
+    
 # Add these serializers to the END of your serializers.py file
 
 # Detailed serializers for ratings and comments
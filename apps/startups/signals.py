@@ -0,0 +1,150 @@
+# startup_hub/apps/startups/signals.py
+import threading
+from contextlib import contextmanager
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .counters import adjust_counters
+from .duplicates import FINGERPRINT_FIELDS, update_fingerprints
+from .facets import FACET_FIELDS, invalidate_facets
+from .models import (
+    Industry, Startup, StartupBookmark, StartupComment, StartupFounder, StartupLike, StartupRating, StartupTag
+)
+from .search import SEARCH_FIELDS, update_search_vectors
+
+_bulk = threading.local()
+
+
+@contextmanager
+def bulk_operation():
+    """Skip the per-row receivers below; the caller refreshes facets once afterwards"""
+    _bulk.active = True
+    try:
+        yield
+    finally:
+        _bulk.active = False
+
+
+def in_bulk_operation():
+    return getattr(_bulk, 'active', False)
+
+
+@receiver(post_save, sender=Startup)
+def refresh_startup_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Rebuild the search vector unless the save only touched non-text fields (e.g. views)"""
+    if in_bulk_operation():
+        return
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    update_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Startup)
+def refresh_startup_fingerprint(sender, instance, update_fields=None, **kwargs):
+    """Keep the duplicate-detection fingerprint in step with the name, website and description"""
+    if in_bulk_operation():
+        return
+    if update_fields is not None and not FINGERPRINT_FIELDS.intersection(update_fields):
+        return
+    update_fingerprints([instance])
+
+
+@receiver(post_save, sender=StartupTag)
+@receiver(post_delete, sender=StartupTag)
+@receiver(post_save, sender=StartupFounder)
+@receiver(post_delete, sender=StartupFounder)
+def refresh_related_search_vector(sender, instance, **kwargs):
+    if in_bulk_operation():
+        return
+    update_search_vectors([instance.startup_id])
+
+
+@receiver(post_save, sender=Startup)
+def invalidate_startup_facets(sender, instance, update_fields=None, **kwargs):
+    """Approvals, edits and new startups change the directory facets; view counts don't"""
+    if in_bulk_operation():
+        return
+    if update_fields is not None and not FACET_FIELDS.intersection(update_fields):
+        return
+    invalidate_facets()
+
+
+@receiver(post_delete, sender=Startup)
+@receiver(post_save, sender=StartupTag)
+@receiver(post_delete, sender=StartupTag)
+@receiver(post_save, sender=Industry)
+@receiver(post_delete, sender=Industry)
+def invalidate_related_facets(sender, **kwargs):
+    if in_bulk_operation():
+        return
+    invalidate_facets()
+
+
+@receiver(post_save, sender=Industry)
+def refresh_industry_search_vectors(sender, instance, created, **kwargs):
+    """Industry names are part of the startup search vector"""
+    if created or in_bulk_operation():
+        return
+    update_search_vectors(instance.startups.values('id'))
+
+
+# Engagement models and the adjust_counters argument each row counts towards
+ENGAGEMENT_COUNTERS = {
+    StartupLike: 'likes',
+    StartupBookmark: 'bookmarks',
+    StartupComment: 'comments',
+    StartupRating: 'ratings',
+}
+
+
+def count_engagement(sender, startup_id, rating, sign):
+    deltas = {ENGAGEMENT_COUNTERS[sender]: sign}
+    if sender is StartupRating:
+        deltas['rating_sum'] = sign * rating
+    adjust_counters(startup_id, **deltas)
+
+
+def remember_counted(instance):
+    instance._counted = (instance.__dict__.get('startup_id'), instance.__dict__.get('rating'))
+
+
+@receiver(post_init, sender=StartupLike)
+@receiver(post_init, sender=StartupBookmark)
+@receiver(post_init, sender=StartupComment)
+@receiver(post_init, sender=StartupRating)
+def remember_engagement_state(sender, instance, **kwargs):
+    """Keep the startup and rating a row was counted with, so edits and deletes adjust the right counters"""
+    remember_counted(instance)
+
+
+@receiver(post_save, sender=StartupLike)
+@receiver(post_save, sender=StartupBookmark)
+@receiver(post_save, sender=StartupComment)
+@receiver(post_save, sender=StartupRating)
+def count_engagement_counters(sender, instance, created, **kwargs):
+    """Add new engagement rows to the counters, wherever they are created (API, admin, shell)"""
+    startup_id, rating = instance._counted
+    if created:
+        count_engagement(sender, instance.startup_id, instance.rating if sender is StartupRating else None, 1)
+    elif startup_id != instance.startup_id:
+        # Moved to another startup
+        count_engagement(sender, startup_id, rating, -1)
+        count_engagement(sender, instance.startup_id, instance.rating if sender is StartupRating else None, 1)
+    elif sender is StartupRating and rating != instance.rating:
+        adjust_counters(instance.startup_id, rating_sum=instance.rating - rating)
+    remember_counted(instance)
+
+
+@receiver(post_delete, sender=StartupLike)
+@receiver(post_delete, sender=StartupBookmark)
+@receiver(post_delete, sender=StartupComment)
+@receiver(post_delete, sender=StartupRating)
+def release_engagement_counters(sender, instance, origin=None, **kwargs):
+    """Take deleted engagement rows - unlikes, moderation, user deletion cascades - off the counters"""
+    # Nothing to adjust when the startup itself is being deleted
+    if isinstance(origin, Startup) or (isinstance(origin, QuerySet) and origin.model is Startup):
+        return
+    startup_id, rating = instance._counted
+    count_engagement(sender, startup_id, rating, -1)
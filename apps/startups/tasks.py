@@ -0,0 +1,65 @@
+# startup_hub/apps/startups/tasks.py
+from celery import shared_task
+from apps.notifications.utils import create_notifications
+from apps.users.social_tasks import check_startup_achievements
+from .models import Startup
+from .trending import refresh_trending_scores
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def update_trending_scores():
+    """
+    Recompute decayed trending scores from the hourly activity buckets.
+    This task should be scheduled to run every five minutes.
+    """
+    scored, changed = refresh_trending_scores()
+    logger.info(f'Trending scores refreshed: {scored} active startups, {changed} updated')
+    return changed
+
+
+@shared_task
+def send_bulk_admin_followups(action, startup_ids, reason=''):
+    """
+    Notify owners of startups approved or rejected in bulk and re-check the
+    submitters' achievements, as one job rather than one per startup.
+    """
+    notifications = []
+    submitters = set()
+    for startup_id, name, claimed_by_id, submitted_by_id in Startup.objects.filter(
+        id__in=startup_ids
+    ).values_list('id', 'name', 'claimed_by_id', 'submitted_by_id'):
+        recipient_id = claimed_by_id or submitted_by_id
+        if recipient_id and action == 'reject':
+            message = f'Your startup "{name}" was not approved'
+            if reason:
+                message += f': {reason}'
+            notifications.append({
+                'recipient_id': recipient_id,
+                'title': 'Startup not approved',
+                'message': message,
+                'startup_id': startup_id,
+                'extra_data': {'reason': reason},
+            })
+        elif recipient_id:
+            notifications.append({
+                'recipient_id': recipient_id,
+                'title': 'Startup approved!',
+                'message': f'Your startup "{name}" has been approved and is now live!',
+                'startup_id': startup_id,
+            })
+        if submitted_by_id:
+            submitters.add(submitted_by_id)
+    
+    notification_type = 'startup_rejected' if action == 'reject' else 'startup_approved'
+    created = create_notifications(notification_type, notifications)
+    
+    # Approved submissions count toward the submitter's startup achievements
+    if action != 'reject':
+        for user_id in submitters:
+            check_startup_achievements(user_id)
+    
+    logger.info(f'Bulk {action} follow-ups: {len(created)} notifications, {len(submitters)} submitters')
+    return len(created)
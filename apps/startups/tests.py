@@ -1 +1,85 @@
- 
+# startup_hub/apps/startups/tests.py
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+
+from .counters import reconcile_counters
+from .models import Industry, Startup, StartupBookmark, StartupComment, StartupLike, StartupRating, StartupTag
+
+
+class StartupPageQueryTests(TestCase):
+    """The directory list and detail pages take a fixed number of queries, however much engagement they show"""
+
+    STARTUPS = 20
+    USERS = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(email=f'engaged_{index}@example.com', username=f'engaged_{index}')
+            for index in range(cls.USERS)
+        ]
+        cls.industry = Industry.objects.create(name='Query budget')
+        cls.startups = cls.create_startups(cls.STARTUPS)
+
+    @classmethod
+    def create_startups(cls, count, offset=0):
+        startups = Startup.objects.bulk_create([
+            Startup(
+                name=f'Budget startup {offset + index}',
+                description='query budget',
+                industry=cls.industry,
+                location='Remote',
+                founded_year=2020,
+                is_approved=True
+            )
+            for index in range(count)
+        ])
+        StartupTag.objects.bulk_create([
+            StartupTag(startup=startup, tag=tag) for startup in startups for tag in ('ai', 'saas')
+        ])
+        StartupRating.objects.bulk_create([
+            StartupRating(startup=startup, user=user, rating=index % 5 + 1)
+            for startup in startups for index, user in enumerate(cls.users)
+        ])
+        StartupLike.objects.bulk_create([
+            StartupLike(startup=startup, user=user) for startup in startups for user in cls.users[::2]
+        ])
+        StartupBookmark.objects.bulk_create([
+            StartupBookmark(startup=startup, user=user) for startup in startups for user in cls.users[::3]
+        ])
+        StartupComment.objects.bulk_create([
+            StartupComment(startup=startup, user=user, text='query budget')
+            for startup in startups for user in cls.users[::3]
+        ])
+        # bulk_create bypasses the counter receivers
+        reconcile_counters(startup_ids=[startup.id for startup in startups])
+        return startups
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def get_list(self):
+        response = self.client.get('/api/startups/', {'industry': self.industry.id})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_query_count(self):
+        with self.assertNumQueries(7):
+            data = self.get_list()
+        results = data.get('results', data)
+        self.assertEqual(len(results), self.STARTUPS)
+
+    def test_list_query_count_does_not_grow_with_engagement(self):
+        self.create_startups(self.STARTUPS, offset=self.STARTUPS)
+        with self.assertNumQueries(7):
+            self.get_list()
+
+    def test_detail_query_count(self):
+        with self.assertNumQueries(15):
+            response = self.client.get(f'/api/startups/{self.startups[0].id}/')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,91 @@
+# startup_hub/apps/startups/trending.py
+"""
+Trending startups.
+
+Views, ratings, comments and likes are counted into hourly
+``StartupActivity`` buckets as they happen (``record_activity``). Every few
+minutes ``refresh_trending_scores`` folds the buckets of the last week into
+``Startup.trending_score``, halving the weight of activity every
+``TRENDING_HALF_LIFE_HOURS``, so the trending endpoint is a read of the
+top rows of an index.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Startup, StartupActivity
+
+TRENDING_WINDOW_HOURS = 7 * 24
+TRENDING_HALF_LIFE_HOURS = 24
+
+# Views mostly break ties between startups with the same engagement
+TRENDING_WEIGHTS = {'views': 0.05, 'ratings': 1.0, 'comments': 1.0, 'likes': 1.0}
+
+
+def current_hour(now=None):
+    return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def record_activity(startup_id, at=None, **counts):
+    """
+    Add event counts (``views=1``, ``likes=1``...) to the startup's bucket for
+    this hour, or for the hour of ``at``. Negative counts take back an earlier
+    event (an unlike) from its bucket and never go below zero.
+    """
+    counts = {field: value for field, value in counts.items() if value}
+    if not counts:
+        return
+    hour = current_hour(at)
+    bucket = StartupActivity.objects.filter(startup_id=startup_id, hour=hour)
+    updates = {
+        field: Greatest(F(field) + value, 0) if value < 0 else F(field) + value
+        for field, value in counts.items()
+    }
+    if bucket.update(**updates) or any(value < 0 for value in counts.values()):
+        return
+    try:
+        with transaction.atomic():
+            StartupActivity.objects.create(startup_id=startup_id, hour=hour, **counts)
+    except IntegrityError:
+        # Another request created the bucket first
+        bucket.update(**updates)
+
+
+def activity_score(views, ratings, comments, likes, age_hours):
+    weighted = (
+        views * TRENDING_WEIGHTS['views']
+        + ratings * TRENDING_WEIGHTS['ratings']
+        + comments * TRENDING_WEIGHTS['comments']
+        + likes * TRENDING_WEIGHTS['likes']
+    )
+    return weighted * 0.5 ** (age_hours / TRENDING_HALF_LIFE_HOURS)
+
+
+def refresh_trending_scores(now=None, batch_size=1000):
+    """Recompute every trending score from the buckets; returns ``(scored, changed)``"""
+    now = now or timezone.now()
+    since = current_hour(now) - timedelta(hours=TRENDING_WINDOW_HOURS)
+
+    scores = defaultdict(float)
+    buckets = StartupActivity.objects.filter(hour__gte=since).values_list(
+        'startup_id', 'hour', 'views', 'ratings', 'comments', 'likes'
+    )
+    for startup_id, hour, views, ratings, comments, likes in buckets.iterator():
+        age_hours = max((now - hour).total_seconds() / 3600, 0)
+        scores[startup_id] += activity_score(views, ratings, comments, likes, age_hours)
+
+    # Startups whose activity aged out of the window drop back to zero
+    previous = dict(Startup.objects.filter(trending_score__gt=0).values_list('id', 'trending_score'))
+    changed = [
+        Startup(id=startup_id, trending_score=round(scores.get(startup_id, 0.0), 6))
+        for startup_id in scores.keys() | previous.keys()
+        if abs(scores.get(startup_id, 0.0) - previous.get(startup_id, 0.0)) > 1e-6
+    ]
+    Startup.objects.bulk_update(changed, ['trending_score'], batch_size=batch_size)
+
+    StartupActivity.objects.filter(hour__lt=since).delete()
+    return len(scores), len(changed)
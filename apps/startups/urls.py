@@ -1,5 +1,5 @@
 # apps/startups/urls.py - Complete URL configuration with claiming endpoints
-from django.urls import path
+from django.urls import path, re_path
 from .views import StartupViewSet, IndustryViewSet, StartupEditRequestViewSet, StartupClaimRequestViewSet
 
 # Define URL patterns manually
@@ -10,6 +10,7 @@ urlpatterns = [
     # Startups basic CRUD
     path('', StartupViewSet.as_view({'get': 'list', 'post': 'create'}), name='startup-list'),
     path('<int:pk>/', StartupViewSet.as_view({'get': 'retrieve', 'put': 'update', 'delete': 'destroy'}), name='startup-detail'),
+    path('check-duplicates/', StartupViewSet.as_view({'get': 'check_duplicates'}), name='startup-check-duplicates'),
     
     # Edit functionality endpoints
     path('<int:pk>/submit_edit/', StartupViewSet.as_view({'post': 'submit_edit'}), name='startup-submit-edit'),
@@ -29,6 +30,7 @@ urlpatterns = [
     path('admin/', StartupViewSet.as_view({'get': 'admin_list'}), name='startup-admin-list'),
     path('<int:pk>/admin/', StartupViewSet.as_view({'patch': 'admin_action'}), name='startup-admin-action'),
     path('bulk-admin/', StartupViewSet.as_view({'post': 'bulk_admin'}), name='startup-bulk-admin'),
+    re_path(r'^export/(?P<export_format>ndjson|csv)/$', StartupViewSet.as_view({'get': 'export'}), name='startup-export'),
     
     # Admin claim request management
     path('admin/claim-requests/', StartupViewSet.as_view({'get': 'admin_claim_requests'}), name='startup-admin-claim-requests'),
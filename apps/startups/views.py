@@ -5,9 +5,13 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from apps.core.bulk import MAX_BULK_IDS, bulk_results, parse_ids
+from apps.core.exports import export_columns, export_response, parse_updated_since
+from apps.core.images import delete_variants, process_image
 from apps.notifications.utils import notify_startup_liked, notify_startup_commented, notify_startup_rated
+from apps.users.signals import safe_celery_task
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Avg, Count, Case, When, IntegerField, Min, Max
+from django.db.models import Q, F, Avg, Count, Case, When, IntegerField, Min, Max
 from django.db import models, transaction
 from datetime import datetime, timedelta
 from django.utils import timezone
@@ -21,6 +25,12 @@ from .models import (
     Industry, Startup, StartupRating, StartupComment, StartupBookmark, StartupLike,
     UserProfile, StartupEditRequest, StartupClaimRequest
 )
+from .duplicates import find_duplicates
+from .facets import get_directory_stats, get_facets, invalidate_facets
+from .search import search_startups
+from .signals import bulk_operation
+from .tasks import send_bulk_admin_followups
+from .trending import record_activity
 from .serializers import (
     IndustrySerializer, StartupListSerializer, StartupDetailSerializer,
     StartupRatingDetailSerializer, StartupCommentDetailSerializer, StartupCreateSerializer,
@@ -31,6 +41,42 @@ from .serializers import (
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# (column, lookup) pairs streamed by the startup export
+STARTUP_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('name', 'name'),
+    ('industry', 'industry__name'),
+    ('location', 'location'),
+    ('website', 'website'),
+    ('founded_year', 'founded_year'),
+    ('employee_count', 'employee_count'),
+    ('funding_amount', 'funding_amount'),
+    ('valuation', 'valuation'),
+    ('revenue', 'revenue'),
+    ('user_count', 'user_count'),
+    ('growth_rate', 'growth_rate'),
+    ('business_model', 'business_model'),
+    ('target_market', 'target_market'),
+    ('is_approved', 'is_approved'),
+    ('is_featured', 'is_featured'),
+    ('is_claimed', 'is_claimed'),
+    ('claim_verified', 'claim_verified'),
+    ('views', 'views'),
+    ('like_count', 'like_count'),
+    ('bookmark_count', 'bookmark_count'),
+    ('comment_count', 'comment_count'),
+    ('rating_count', 'rating_count'),
+    ('rating_average', 'rating_average'),
+    ('trending_score', 'trending_score'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+# Columns updated without touching updated_at; left out of updated_since exports
+STARTUP_ACTIVITY_COLUMNS = {
+    'views', 'like_count', 'bookmark_count', 'comment_count', 'rating_count', 'rating_average', 'trending_score',
+}
+
 class IndustryViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for managing industries"""
     queryset = Industry.objects.all()
@@ -49,20 +95,31 @@ class StartupViewSet(viewsets.ModelViewSet):
     """ViewSet for managing startups with full CRUD operations and claiming"""
     
     # Base queryset - only approved startups for public viewing
-    queryset = Startup.objects.filter(is_approved=True).select_related('industry').prefetch_related(
-        'founders', 'tags', 'ratings', 'comments', 'likes', 'bookmarks'
-    )
+    queryset = Startup.objects.filter(is_approved=True).select_related('industry').prefetch_related('tags')
     
     # Permissions
     permission_classes = [IsAuthenticatedOrReadOnly]
     
     # Filtering and search
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled in get_queryset (see search.py)
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['industry', 'is_featured', 'founded_year', 'location']
-    search_fields = ['name', 'description', 'tags__tag', 'location', 'founders__name']
-    ordering_fields = ['name', 'founded_year', 'created_at', 'views', 'employee_count', 'average_rating']
+    ordering_fields = [
+        'name', 'founded_year', 'created_at', 'views', 'employee_count',
+        'average_rating', 'total_ratings', 'total_likes', 'trending_score'
+    ]
     ordering = ['-created_at']
     
+    # API ordering names for the indexed counter columns
+    ORDERING_ALIASES = {
+        'average_rating': F('rating_average'),
+        'total_ratings': F('rating_count'),
+        'total_likes': F('like_count'),
+    }
+    
+    # Actions that serialize startups and need the annotated counts
+    STATS_ACTIONS = ['list', 'retrieve', 'featured', 'trending', 'bookmarked', 'bookmarks']
+    
     def get_queryset(self):
         """Get queryset based on action and filters"""
         # For list/retrieve actions, only show approved startups
@@ -72,9 +129,11 @@ class StartupViewSet(viewsets.ModelViewSet):
             # For create/update/delete, show all startups (with proper permissions)
             queryset = Startup.objects.all()
             
-        queryset = queryset.select_related('industry', 'claimed_by').prefetch_related(
-            'founders', 'tags', 'ratings', 'comments', 'likes', 'bookmarks', 'claim_requests'
+        queryset = queryset.select_related('industry', 'claimed_by').prefetch_related('tags').alias(
+            **self.ORDERING_ALIASES
         )
+        if self.action in self.STATS_ACTIONS:
+            queryset = queryset.with_stats()
         
         params = self.request.query_params
         
@@ -84,17 +143,11 @@ class StartupViewSet(viewsets.ModelViewSet):
             bookmarked_ids = self.request.user.startupbookmark_set.values_list('startup_id', flat=True)
             queryset = queryset.filter(id__in=bookmarked_ids)
         
-        # Advanced search across multiple fields
-        search_query = params.get('search')
+        # Full-text search; results are ranked unless ?ordering= says otherwise
+        search_query = params.get('search', '').strip()
         if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(tags__tag__icontains=search_query) |
-                Q(location__icontains=search_query) |
-                Q(founders__name__icontains=search_query) |
-                Q(industry__name__icontains=search_query)
-            ).distinct()
+            queryset = search_startups(queryset, search_query)
+            self.ordering = ['-search_score', '-created_at']
         
         # Industry filtering (multiple industries)
         industries = params.getlist('industry')
@@ -125,9 +178,7 @@ class StartupViewSet(viewsets.ModelViewSet):
         # Filter by minimum rating
         min_rating = params.get('min_rating')
         if min_rating:
-            queryset = queryset.annotate(
-                avg_rating=Avg('ratings__rating')
-            ).filter(avg_rating__gte=float(min_rating))
+            queryset = queryset.filter(rating_average__gte=float(min_rating))
         
         # Filter by funding status
         has_funding = params.get('has_funding')
@@ -213,12 +264,21 @@ class StartupViewSet(viewsets.ModelViewSet):
             # Return the created startup using the detail serializer
             response_serializer = StartupDetailSerializer(startup, context={'request': request})
             
+            # Flag likely duplicates so the submitter (and reviewers) can spot a listing that already exists
+            possible_duplicates = find_duplicates(
+                startup.name, startup.website, startup.description,
+                exclude_id=startup.id, approved_only=not request.user.is_staff
+            )
+            if possible_duplicates:
+                logger.info(f"Startup {startup.id} may duplicate: {[match['id'] for match in possible_duplicates]}")
+            
             logger.info(f"Startup created successfully: {startup.name} (ID: {startup.id})")
             
             return Response({
                 'message': 'Startup submitted successfully! It will be reviewed before being published.',
                 'startup': response_serializer.data,
                 'id': startup.id,
+                'possible_duplicates': possible_duplicates,
                 'success': True
             }, status=status.HTTP_201_CREATED)
             
@@ -241,28 +301,14 @@ class StartupViewSet(viewsets.ModelViewSet):
             # Increment views (basic implementation - could be improved with IP tracking)
             instance.views += 1
             instance.save(update_fields=['views'])
+            record_activity(instance.id, views=1)
             
             # Use optimized queryset for detail view
-            optimized_instance = Startup.objects.select_related(
-                'industry', 'claimed_by', 'submitted_by'
-            ).prefetch_related(
-                'founders',
-                'tags',
-                'ratings__user',
-                'comments__user',
-                'likes__user',
-                'bookmarks__user',
-                'claim_requests__user'
-            ).get(pk=instance.pk)
+            optimized_instance = Startup.objects.with_stats().with_details().get(pk=instance.pk)
             
+            # Serializer includes edit permissions and pending request flags
             serializer = self.get_serializer(optimized_instance)
-            
-            # Add edit permissions info
             response_data = serializer.data
-            response_data['can_edit'] = optimized_instance.can_edit(request.user)
-            response_data['can_claim'] = optimized_instance.can_claim(request.user)
-            response_data['has_pending_edits'] = optimized_instance.has_pending_edits()
-            response_data['has_pending_claims'] = optimized_instance.has_pending_claims()
             
             logger.info(f"Startup retrieved successfully: {instance.name}")
             return Response(response_data)
@@ -621,33 +667,25 @@ class StartupViewSet(viewsets.ModelViewSet):
         try:
             import os
             from django.core.files.storage import default_storage
-            from django.core.files.base import ContentFile
             import uuid
             
             # Generate unique filename
             file_extension = os.path.splitext(cover_image.name)[1].lower()
             unique_filename = f"startup_covers/{startup.id}_{uuid.uuid4().hex}{file_extension}"
             
-            # Save the file
-            if hasattr(settings, 'MEDIA_ROOT') and settings.MEDIA_ROOT:
-                # Save to local media directory
-                file_path = default_storage.save(unique_filename, ContentFile(cover_image.read()))
-                
-                # Build the full URL
-                if hasattr(request, 'build_absolute_uri'):
-                    cover_image_url = request.build_absolute_uri(settings.MEDIA_URL + file_path)
-                else:
-                    cover_image_url = settings.MEDIA_URL + file_path
-                    
-            else:
-                # Fallback: create a data URL (base64 encoded) - not recommended for production
-                import base64
-                encoded_image = base64.b64encode(cover_image.read()).decode('utf-8')
-                cover_image_url = f"data:{cover_image.content_type};base64,{encoded_image}"
+            # Stream the original to storage; resized variants are rendered in the background
+            file_path = default_storage.save(unique_filename, cover_image)
+            cover_image_url = default_storage.url(file_path)
+            if cover_image_url.startswith('/'):
+                cover_image_url = request.build_absolute_uri(cover_image_url)
             
-            # Update the startup's cover image URL
+            # Update the startup's cover image URL, replacing any previous upload
+            previous_variants = startup.cover_image_variants
             startup.cover_image_url = cover_image_url
-            startup.save(update_fields=['cover_image_url'])
+            startup.cover_image_variants = {'original': file_path}
+            startup.save(update_fields=['cover_image_url', 'cover_image_variants'])
+            delete_variants(previous_variants, original=True)
+            process_image(startup, 'cover_image_variants', 'cover')
             
             logger.info(f"Cover image uploaded successfully for {startup.name}")
             
@@ -701,16 +739,7 @@ class StartupViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get startup statistics for the welcome page"""
-        total_startups = Startup.objects.filter(is_approved=True).count()
-        total_industries = Industry.objects.annotate(
-            startup_count=Count('startups', filter=Q(startups__is_approved=True))
-        ).filter(startup_count__gt=0).count()
-        
-        return Response({
-            'total_startups': total_startups,
-            'total_industries': total_industries,
-            'featured_count': Startup.objects.filter(is_approved=True, is_featured=True).count() if hasattr(Startup, 'is_featured') else 0,
-        })
+        return Response(get_directory_stats())
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
@@ -731,12 +760,8 @@ class StartupViewSet(viewsets.ModelViewSet):
         """Get trending startups based on recent activity"""
         logger.info(f"Trending startups requested by user: {request.user}")
         
-        # Get startups with recent activity (views, ratings, comments, likes)
-        trending_startups = self.get_queryset().annotate(
-            recent_activity=Count('ratings', filter=Q(ratings__created_at__gte=timezone.now() - timedelta(days=7))) +
-                          Count('comments', filter=Q(comments__created_at__gte=timezone.now() - timedelta(days=7))) +
-                          Count('likes', filter=Q(likes__created_at__gte=timezone.now() - timedelta(days=7)))
-        ).order_by('-recent_activity', '-views')[:10]
+        # Scores are precomputed from recent activity by the update_trending_scores task
+        trending_startups = self.get_queryset().filter(is_approved=True).order_by('-trending_score', '-views')[:10]
         
         serializer = self.get_serializer(trending_startups, many=True)
         return Response(serializer.data)
@@ -750,7 +775,9 @@ class StartupViewSet(viewsets.ModelViewSet):
         logger.info(f"My startups requested by user: {request.user}")
         
         # Get all startups submitted by user (including unapproved ones)
-        my_startups = Startup.objects.filter(submitted_by=request.user).order_by('-created_at')
+        my_startups = Startup.objects.filter(
+            submitted_by=request.user
+        ).with_stats().with_details().order_by('-created_at')
         
         # Apply pagination
         page = self.paginate_queryset(my_startups)
@@ -773,7 +800,7 @@ class StartupViewSet(viewsets.ModelViewSet):
         claimed_startups = Startup.objects.filter(
             claimed_by=request.user, 
             claim_verified=True
-        ).order_by('-created_at')
+        ).with_stats().with_details().order_by('-created_at')
         
         # Apply pagination
         page = self.paginate_queryset(claimed_startups)
@@ -784,47 +811,26 @@ class StartupViewSet(viewsets.ModelViewSet):
         serializer = StartupDetailSerializer(claimed_startups, many=True, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path='check-duplicates')
+    def check_duplicates(self, request):
+        """Likely existing listings for a startup about to be submitted"""
+        name = request.query_params.get('name', '').strip()
+        if not name:
+            return Response({'error': 'name is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        matches = find_duplicates(
+            name,
+            request.query_params.get('website', ''),
+            request.query_params.get('description', ''),
+            approved_only=not request.user.is_staff
+        )
+        return Response({'possible_duplicates': matches})
+    
     @action(detail=False, methods=['get'])
     def filters(self, request):
-        """Get available filter options"""
+        """Get available filter options with counts under the currently applied filters"""
         logger.info(f"Filter options requested by user: {request.user}")
-        
-        # Get all industries with startup counts (only for approved startups)
-        industries = Industry.objects.annotate(
-            startup_count=Count('startups', filter=Q(startups__is_approved=True))
-        ).filter(startup_count__gt=0).order_by('name')
-        
-        # Get location options (only from approved startups)
-        locations = Startup.objects.filter(is_approved=True).values_list('location', flat=True).distinct().order_by('location')
-        
-        # Get popular tags (only from approved startups)
-        from django.db.models import Count as DBCount
-        popular_tags = Startup.objects.filter(is_approved=True).values_list('tags__tag', flat=True).annotate(
-            count=DBCount('tags__tag')
-        ).order_by('-count')[:20]
-        
-        # Get employee count ranges
-        employee_ranges = [
-            {'label': '1-10', 'min': 1, 'max': 10},
-            {'label': '11-50', 'min': 11, 'max': 50},
-            {'label': '51-200', 'min': 51, 'max': 200},
-            {'label': '201-500', 'min': 201, 'max': 500},
-            {'label': '500+', 'min': 500, 'max': None},
-        ]
-        
-        # Get founded year range (only from approved startups)
-        year_range = Startup.objects.filter(is_approved=True).aggregate(
-            min_year=Min('founded_year'),
-            max_year=Max('founded_year')
-        )
-        
-        return Response({
-            'industries': IndustrySerializer(industries, many=True).data,
-            'locations': [loc for loc in locations if loc],
-            'popular_tags': [tag for tag in popular_tags if tag],
-            'employee_ranges': employee_ranges,
-            'founded_year_range': year_range
-        })
+        return Response(get_facets(request.query_params))
     
     @action(detail=False, methods=['get'])
     def guide(self, request):
@@ -1027,10 +1033,19 @@ class StartupViewSet(viewsets.ModelViewSet):
                           status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            rating, created = StartupRating.objects.update_or_create(
-                startup=startup, user=request.user,
-                defaults={'rating': rating_value}
-            )
+            with transaction.atomic():
+                rating = StartupRating.objects.select_for_update().filter(
+                    startup=startup, user=request.user
+                ).first()
+                created = rating is None
+                if created:
+                    rating = StartupRating.objects.create(startup=startup, user=request.user, rating=rating_value)
+                elif rating.rating != rating_value:
+                    rating.rating = rating_value
+                    rating.save(update_fields=['rating'])
+                # Re-rating is not new engagement
+                if created:
+                    record_activity(startup.id, ratings=1)
             
             # Send notification to startup owner/submitter on new rating (don't notify self)
             if created and startup.submitted_by and startup.submitted_by != request.user:
@@ -1039,7 +1054,7 @@ class StartupViewSet(viewsets.ModelViewSet):
             action_text = 'created' if created else 'updated'
             
             # Return updated startup metrics
-            startup.refresh_from_db()
+            startup.refresh_from_db(fields=['rating_count', 'rating_sum', 'rating_average'])
             
             logger.info(f"Rating {action_text} successfully: {rating_value}/5 for {startup.name}")
             
@@ -1075,9 +1090,11 @@ class StartupViewSet(viewsets.ModelViewSet):
                           status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            comment = StartupComment.objects.create(
-                startup=startup, user=request.user, text=text
-            )
+            with transaction.atomic():
+                comment = StartupComment.objects.create(
+                    startup=startup, user=request.user, text=text
+                )
+                record_activity(startup.id, comments=1)
             
             # Send notification to startup owner/submitter (don't notify self)
             if startup.submitted_by and startup.submitted_by != request.user:
@@ -1104,25 +1121,27 @@ class StartupViewSet(viewsets.ModelViewSet):
         startup = self.get_object()
         
         try:
-            bookmark = StartupBookmark.objects.get(startup=startup, user=request.user)
-            # Bookmark exists, so remove it
-            bookmark.delete()
-            bookmarked = False
-            message = 'Bookmark removed successfully'
-            logger.info(f"Bookmark removed for {startup.name} by {request.user}")
-        except StartupBookmark.DoesNotExist:
-            # Bookmark doesn't exist, so create it
-            StartupBookmark.objects.create(startup=startup, user=request.user)
-            bookmarked = True
-            message = 'Startup bookmarked successfully'
-            logger.info(f"Bookmark added for {startup.name} by {request.user}")
+            with transaction.atomic():
+                deleted, _ = StartupBookmark.objects.filter(startup=startup, user=request.user).delete()
+                if deleted:
+                    # Bookmark existed, so it has been removed
+                    bookmarked = False
+                    message = 'Bookmark removed successfully'
+                    logger.info(f"Bookmark removed for {startup.name} by {request.user}")
+                else:
+                    # Bookmark doesn't exist, so create it
+                    StartupBookmark.objects.create(startup=startup, user=request.user)
+                    bookmarked = True
+                    message = 'Startup bookmarked successfully'
+                    logger.info(f"Bookmark added for {startup.name} by {request.user}")
         except Exception as e:
             logger.error(f"Error toggling bookmark: {str(e)}")
             return Response({'error': 'Failed to update bookmark'}, 
                           status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         # Get updated bookmark count
-        total_bookmarks = startup.bookmarks.count()
+        startup.refresh_from_db(fields=['bookmark_count'])
+        total_bookmarks = startup.bookmark_count
         
         return Response({
             'bookmarked': bookmarked,
@@ -1140,21 +1159,25 @@ class StartupViewSet(viewsets.ModelViewSet):
         startup = self.get_object()
         
         try:
-            like = StartupLike.objects.get(startup=startup, user=request.user)
-            # Like exists, so remove it
-            like.delete()
-            liked = False
-            message = 'Like removed successfully'
-            logger.info(f"Like removed for {startup.name} by {request.user}")
-        except StartupLike.DoesNotExist:
-            # Like doesn't exist, so create it
-            StartupLike.objects.create(startup=startup, user=request.user)
-            liked = True
-            message = 'Startup liked successfully'
-            logger.info(f"Like added for {startup.name} by {request.user}")
+            with transaction.atomic():
+                like = StartupLike.objects.select_for_update().filter(startup=startup, user=request.user).first()
+                if like:
+                    # Like existed, so remove it and take it back out of the trending bucket it was counted in
+                    like.delete()
+                    record_activity(startup.id, at=like.created_at, likes=-1)
+                    liked = False
+                    message = 'Like removed successfully'
+                    logger.info(f"Like removed for {startup.name} by {request.user}")
+                else:
+                    # Like doesn't exist, so create it
+                    StartupLike.objects.create(startup=startup, user=request.user)
+                    record_activity(startup.id, likes=1)
+                    liked = True
+                    message = 'Startup liked successfully'
+                    logger.info(f"Like added for {startup.name} by {request.user}")
             
             # Send notification to startup owner/submitter (don't notify self)
-            if startup.submitted_by and startup.submitted_by != request.user:
+            if liked and startup.submitted_by and startup.submitted_by != request.user:
                 notify_startup_liked(startup, request.user)
         except Exception as e:
             logger.error(f"Error toggling like: {str(e)}")
@@ -1162,7 +1185,8 @@ class StartupViewSet(viewsets.ModelViewSet):
                           status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         # Get updated like count
-        total_likes = startup.likes.count()
+        startup.refresh_from_db(fields=['like_count'])
+        total_likes = startup.like_count
         
         return Response({
             'liked': liked,
@@ -1211,11 +1235,7 @@ class StartupViewSet(viewsets.ModelViewSet):
         search = request.query_params.get('search', '')
         
         # Get all startups without approval filter for admin
-        queryset = Startup.objects.all().select_related(
-            'industry', 'submitted_by', 'claimed_by'
-        ).prefetch_related(
-            'founders', 'tags', 'claim_requests'
-        )
+        queryset = Startup.objects.all().with_stats().with_details()
         
         # Apply filters
         if filter_type == 'pending':
@@ -1247,6 +1267,27 @@ class StartupViewSet(viewsets.ModelViewSet):
         serializer = StartupDetailSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path=r'export/(?P<export_format>ndjson|csv)')
+    def export(self, request, export_format=None):
+        """Stream the whole startup directory as NDJSON or CSV (admin only)"""
+        if not (request.user.is_staff or request.user.is_superuser):
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            updated_since = parse_updated_since(request.query_params.get('updated_since'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = Startup.objects.all()
+        if request.query_params.get('approved') == 'true':
+            queryset = queryset.filter(is_approved=True)
+        if updated_since:
+            queryset = queryset.filter(updated_at__gte=updated_since)
+        
+        logger.info(f"Startup {export_format} export started by: {request.user}")
+        columns = export_columns(STARTUP_EXPORT_COLUMNS, STARTUP_ACTIVITY_COLUMNS, incremental=bool(updated_since))
+        return export_response(queryset, columns, export_format, 'startups')
+    
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated], url_path='admin')
     def admin_action(self, request, pk=None):
         """Admin actions: approve, reject, feature, unfeature"""
@@ -1262,24 +1303,24 @@ class StartupViewSet(viewsets.ModelViewSet):
         try:
             if action_type == 'approve':
                 startup.is_approved = True
-                startup.save(update_fields=['is_approved'])
+                startup.save(update_fields=['is_approved', 'updated_at'])
                 return Response({'message': 'Startup approved successfully'})
             
             elif action_type == 'reject':
                 startup.is_approved = False
                 startup.is_featured = False  # Remove featured status if rejecting
-                startup.save(update_fields=['is_approved', 'is_featured'])
+                startup.save(update_fields=['is_approved', 'is_featured', 'updated_at'])
                 return Response({'message': 'Startup rejected successfully'})
             
             elif action_type == 'feature':
                 startup.is_approved = True  # Auto-approve when featuring
                 startup.is_featured = True
-                startup.save(update_fields=['is_approved', 'is_featured'])
+                startup.save(update_fields=['is_approved', 'is_featured', 'updated_at'])
                 return Response({'message': 'Startup featured successfully'})
             
             elif action_type == 'unfeature':
                 startup.is_featured = False
-                startup.save(update_fields=['is_featured'])
+                startup.save(update_fields=['is_featured', 'updated_at'])
                 return Response({'message': 'Startup unfeatured successfully'})
             
             else:
@@ -1290,39 +1331,80 @@ class StartupViewSet(viewsets.ModelViewSet):
             logger.error(f"Error performing admin action: {str(e)}")
             return Response({'error': 'Failed to perform action'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    # Field values set by each set-based bulk action, and the outcome reported per id
+    BULK_ADMIN_UPDATES = {
+        'approve': ({'is_approved': True}, 'approved'),
+        'reject': ({'is_approved': False, 'is_featured': False}, 'rejected'),
+        'feature': ({'is_approved': True, 'is_featured': True}, 'featured'),
+    }
+    
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated], url_path='bulk-admin')
     def bulk_admin(self, request):
-        """Bulk admin actions"""
+        """Bulk admin actions, each applied as one statement with per-id outcomes"""
         if not (request.user.is_staff or request.user.is_superuser):
             logger.warning(f"Non-admin user {request.user} attempted bulk admin action")
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        startup_ids = request.data.get('startup_ids', [])
+        startup_ids, invalid_ids = parse_ids(request.data.get('startup_ids', []))
         action_type = request.data.get('action')
+        reason = request.data.get('reason', '')
         
         logger.info(f"Bulk admin action '{action_type}' on {len(startup_ids)} startups by {request.user}")
         
         if not startup_ids:
             return Response({'error': 'No startups selected'}, status=status.HTTP_400_BAD_REQUEST)
         
+        if len(startup_ids) > MAX_BULK_IDS:
+            return Response({'error': f'At most {MAX_BULK_IDS} startups per request'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if action_type not in self.BULK_ADMIN_UPDATES and action_type != 'delete':
+            logger.warning(f"Invalid bulk admin action: {action_type}")
+            return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            startups = Startup.objects.filter(id__in=startup_ids)
-            
-            if action_type == 'approve':
-                updated_count = startups.update(is_approved=True)
-                return Response({'message': f'{updated_count} startups approved successfully'})
-            
-            elif action_type == 'reject':
-                updated_count = startups.update(is_approved=False, is_featured=False)
-                return Response({'message': f'{updated_count} startups rejected successfully'})
-            
-            elif action_type == 'feature':
-                updated_count = startups.update(is_approved=True, is_featured=True)
-                return Response({'message': f'{updated_count} startups featured successfully'})
+            with transaction.atomic():
+                current = {
+                    startup_id: (is_approved, is_featured)
+                    for startup_id, is_approved, is_featured in Startup.objects.select_for_update().filter(
+                        id__in=startup_ids
+                    ).values_list('id', 'is_approved', 'is_featured')
+                }
+                
+                if action_type == 'delete':
+                    outcome = 'deleted'
+                    changed = set(current)
+                    with bulk_operation():
+                        Startup.objects.filter(id__in=changed).delete()
+                    notify_ids = []
+                else:
+                    fields, outcome = self.BULK_ADMIN_UPDATES[action_type]
+                    target = (fields.get('is_approved'), fields.get('is_featured'))
+                    if action_type == 'reject':
+                        # Pending startups are unapproved already, but rejecting them is still a decision
+                        changed = set(current)
+                    else:
+                        changed = {
+                            startup_id for startup_id, state in current.items()
+                            if any(wanted is not None and wanted != value for wanted, value in zip(target, state))
+                        }
+                    Startup.objects.filter(id__in=changed).update(**fields, updated_at=timezone.now())
+                    # Owners hear about rejections and first approvals, not re-features
+                    notify_ids = sorted(
+                        startup_id for startup_id in changed
+                        if action_type == 'reject' or not current[startup_id][0]
+                    )
+                
+                transaction.on_commit(invalidate_facets)
+                if notify_ids:
+                    transaction.on_commit(lambda: safe_celery_task(
+                        send_bulk_admin_followups, action_type, notify_ids, reason
+                    ))
             
-            else:
-                logger.warning(f"Invalid bulk admin action: {action_type}")
-                return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'message': f'{len(changed)} startups {outcome} successfully',
+                'updated_count': len(changed),
+                'results': bulk_results(startup_ids, invalid_ids, current, changed, outcome)
+            })
                 
         except Exception as e:
             logger.error(f"Error performing bulk admin action: {str(e)}")
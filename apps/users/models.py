@@ -2,6 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
+from apps.core.images import largest_variant_url
 import re
 from .profanity_filter import is_valid_name
 
@@ -133,6 +134,8 @@ class User(AbstractUser):
         null=True,
         help_text="Profile picture"
     )
+    # Resized variants of the profile picture (see apps/core/images.py)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_premium = models.BooleanField(default=False)
     
     # Email verification fields
@@ -154,6 +157,9 @@ class User(AbstractUser):
     
     def get_avatar_url(self):
         """Get user avatar URL - profile picture or generated avatar"""
+        resized = largest_variant_url(self.profile_picture_variants)
+        if resized:
+            return resized
         if self.profile_picture:
             # Return full URL for profile picture
             from django.conf import settings
@@ -4,6 +4,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from .models import User, UserInterest, UserSettings, validate_username, validate_first_name, validate_last_name, Resume
 from .profanity_filter import validate_user_input
+from apps.core.images import image_srcset
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -145,13 +146,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
     total_likes = serializers.SerializerMethodField()
     member_since = serializers.DateTimeField(source='date_joined', read_only=True)
     avatar_url = serializers.SerializerMethodField()
+    avatar_srcset = serializers.SerializerMethodField()
     display_name = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name', 'bio', 
-            'location', 'profile_picture', 'avatar_url', 'display_name', 'is_premium', 'member_since', 'interests',
+            'location', 'profile_picture', 'avatar_url', 'avatar_srcset', 'display_name', 'is_premium', 'member_since', 'interests',
             'resumes', 'total_ratings', 'total_comments', 'total_bookmarks', 'total_likes',
             'follower_count', 'following_count',  # Social fields
             'is_staff', 'is_superuser'  # Added admin permission fields
@@ -196,6 +198,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def get_avatar_url(self, obj):
         return obj.get_avatar_url()
     
+    def get_avatar_srcset(self, obj):
+        return image_srcset(obj.profile_picture_variants)
+    
     def get_display_name(self, obj):
         return obj.get_display_name()
     
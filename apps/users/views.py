@@ -22,6 +22,7 @@ from PIL import Image
 import json
 import os
 import logging
+from apps.core.images import delete_variants, process_image
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer, 
     ChangePasswordSerializer, UserInterestSerializer, UserSettingsSerializer, ResumeSerializer
@@ -484,37 +485,22 @@ def upload_profile_picture(request):
                       status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Open and process image
-        image = Image.open(profile_picture)
+        # Check it really is an image without decoding it; resizing happens in the background
+        Image.open(profile_picture).verify()
+        profile_picture.seek(0)
         
-        # Convert to RGB if necessary (for PNG with transparency)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            image = image.convert('RGB')
-        
-        # Resize image to maximum 512x512 while maintaining aspect ratio
-        max_size_px = (512, 512)
-        image.thumbnail(max_size_px, Image.Resampling.LANCZOS)
-        
-        # Save processed image
-        from io import BytesIO
-        output = BytesIO()
-        image.save(output, format='JPEG', quality=85, optimize=True)
-        output.seek(0)
-        
-        # Delete old profile picture if exists
+        # Delete old profile picture and its variants if they exist
         user = request.user
+        delete_variants(user.profile_picture_variants)
         if user.profile_picture:
-            old_path = user.profile_picture.path
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        
-        # Save new profile picture
-        file_name = f"profile_{user.id}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-        user.profile_picture.save(
-            file_name,
-            ContentFile(output.getvalue()),
-            save=True
-        )
+            user.profile_picture.delete(save=False)
+        
+        # Stream the new original to storage
+        file_extension = os.path.splitext(profile_picture.name)[1].lower() or '.jpg'
+        user.profile_picture.save(f"profile_{user.id}{file_extension}", profile_picture, save=False)
+        user.profile_picture_variants = {'original': user.profile_picture.name}
+        user.save(update_fields=['profile_picture', 'profile_picture_variants'])
+        process_image(user, 'profile_picture_variants', 'avatar')
         
         # Return updated user data
         serializer = UserProfileSerializer(user)
@@ -538,15 +524,13 @@ def delete_profile_picture(request):
                       status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Delete file from storage
-        if user.profile_picture:
-            old_path = user.profile_picture.path
-            if os.path.exists(old_path):
-                os.remove(old_path)
-            user.profile_picture.delete(save=False)
+        # Delete file and its resized variants from storage
+        delete_variants(user.profile_picture_variants)
+        user.profile_picture.delete(save=False)
         
         # Clear the field
         user.profile_picture = None
+        user.profile_picture_variants = {}
         user.save()
         
         # Return updated user data
@@ -397,9 +397,11 @@ class RequestLoggingMiddleware(MiddlewareMixin):
             if duration:
                 duration = time.time() - duration
             
+            # Streaming responses (exports) have no content to measure
+            size = 'streamed' if response.streaming else f"{len(response.content)} bytes"
             logger.info(
                 f"Response [{request.signature}]: Status {response.status_code}, "
-                f"Duration: {duration:.3f}s, Size: {len(response.content)} bytes"
+                f"Duration: {duration:.3f}s, Size: {size}"
             )
         
         return response
\ No newline at end of file
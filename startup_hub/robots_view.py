@@ -1,11 +1,13 @@
 from django.http import HttpResponse
 from django.views import View
 
+from apps.core.sitemaps import base_url
+
 class RobotsView(View):
     def get(self, request):
-        robots_txt = """User-agent: *
+        robots_txt = f"""User-agent: *
 Disallow:
 
-Sitemap: https://startlinker.com/sitemap.xml
+Sitemap: {base_url()}/sitemap.xml
 """
         return HttpResponse(robots_txt, content_type='text/plain')
\ No newline at end of file
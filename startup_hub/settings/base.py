@@ -13,6 +13,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -40,6 +41,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.connect.middleware.UpdateLastSeenMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -119,6 +121,53 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.analysis.tasks.delete_old_pitch_decks',
         'schedule': 60 * 60 * 24,  # Run daily
     },
+    'flush-presence-last-seen': {
+        'task': 'apps.connect.tasks.flush_presence_last_seen',
+        'schedule': 60,  # Run every minute
+    },
+    'sweep-stale-calls': {
+        'task': 'apps.messaging.tasks.sweep_stale_calls',
+        'schedule': 60,  # Run every minute
+    },
+    'update-trending-scores': {
+        'task': 'apps.startups.tasks.update_trending_scores',
+        'schedule': 60 * 5,  # Run every five minutes
+    },
+    'send-job-alert-digests': {
+        'task': 'apps.jobs.tasks.send_job_alert_digests',
+        'schedule': 60 * 60,  # Run every hour
+    },
+    'rebuild-job-recommendations': {
+        'task': 'apps.jobs.tasks.rebuild_job_recommendations',
+        'schedule': 60 * 60 * 24,  # Run daily
+    },
+    'deliver-email-outbox': {
+        'task': 'apps.notifications.tasks.deliver_email_outbox',
+        'schedule': 60,  # Run every minute
+    },
+}
+
+# Worker processes rendering resized image variants (see apps/core/images.py)
+IMAGE_PROCESSING_WORKERS = int(os.environ.get('IMAGE_PROCESSING_WORKERS', 2))
+
+# Threads (one email connection each) delivering outbox batches (see apps/notifications/outbox.py)
+EMAIL_OUTBOX_CONCURRENCY = int(os.environ.get('EMAIL_OUTBOX_CONCURRENCY', 4))
+
+# Public site URL used for sitemap locations (see apps/core/sitemaps.py)
+SITEMAP_BASE_URL = os.environ.get('SITEMAP_BASE_URL', 'https://startlinker.com')
+
+# Real-time messaging settings (see apps/messaging/conf.py for defaults)
+MESSAGING_SETTINGS = {
+    'TYPING_START_INTERVAL': 3,
+    'TYPING_STOP_TIMEOUT': 6,
+    'SIGNAL_REDIS_URL': os.environ.get('SIGNAL_REDIS_URL', os.environ.get('REDIS_URL', '')),
+}
+
+# Presence Settings
+PRESENCE_SETTINGS = {
+    'REDIS_URL': os.environ.get('PRESENCE_REDIS_URL', os.environ.get('REDIS_URL', '')),
+    'TTL': int(os.environ.get('PRESENCE_TTL', '300')),
+    'FLUSH_BATCH_SIZE': 500,
 }
 
 # Analysis Settings
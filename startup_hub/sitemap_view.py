@@ -1,93 +1,52 @@
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
 from django.views import View
-from datetime import datetime
+
+from apps.core.sitemaps import SITEMAP_INDEX_TIMEOUT, get_index, get_shard, shard_body
+
+
+def conditional(request, etag, lastmod):
+    """304 response when the crawler already has this version, else None"""
+    return get_conditional_response(request, etag=f'"{etag}"', last_modified=int(lastmod.timestamp()))
+
+
+def finalize(response, etag, lastmod):
+    response['ETag'] = f'"{etag}"'
+    response['Last-Modified'] = http_date(lastmod.timestamp())
+    patch_cache_control(response, public=True, max_age=SITEMAP_INDEX_TIMEOUT)
+    return response
+
 
 class SitemapView(View):
+    """Sitemap index listing every shard, gzip-encoded for clients that accept it"""
+
     def get(self, request):
-        # Generate sitemap XML dynamically
-        sitemap_xml = '''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-  <!-- Homepage -->
-  <url>
-    <loc>https://startlinker.com/</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>daily</changefreq>
-    <priority>1.0</priority>
-  </url>
-  
-  <!-- Main Pages -->
-  <url>
-    <loc>https://startlinker.com/jobs</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>daily</changefreq>
-    <priority>0.9</priority>
-  </url>
-  
-  <url>
-    <loc>https://startlinker.com/startups</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>daily</changefreq>
-    <priority>0.9</priority>
-  </url>
-  
-  <url>
-    <loc>https://startlinker.com/feed</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>daily</changefreq>
-    <priority>0.8</priority>
-  </url>
-  
-  <url>
-    <loc>https://startlinker.com/messaging</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>weekly</changefreq>
-    <priority>0.7</priority>
-  </url>
-  
-  <url>
-    <loc>https://startlinker.com/profile</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>weekly</changefreq>
-    <priority>0.7</priority>
-  </url>
-  
-  <!-- Auth Pages -->
-  <url>
-    <loc>https://startlinker.com/auth</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.6</priority>
-  </url>
-  
-  <!-- Job Posting Page -->
-  <url>
-    <loc>https://startlinker.com/job-upload</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>weekly</changefreq>
-    <priority>0.7</priority>
-  </url>
-  
-  <!-- Legal Pages -->
-  <url>
-    <loc>https://startlinker.com/about</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.5</priority>
-  </url>
-  
-  <url>
-    <loc>https://startlinker.com/privacy</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.3</priority>
-  </url>
-  
-  <url>
-    <loc>https://startlinker.com/terms</loc>
-    <lastmod>{date}</lastmod>
-    <changefreq>monthly</changefreq>
-    <priority>0.3</priority>
-  </url>
-</urlset>'''.format(date=datetime.now().strftime('%Y-%m-%d'))
-        
-        return HttpResponse(sitemap_xml, content_type='application/xml')
\ No newline at end of file
+        index = get_index()
+        not_modified = conditional(request, index['etag'], index['lastmod'])
+        if not_modified:
+            return finalize(not_modified, index['etag'], index['lastmod'])
+
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = HttpResponse(index['gzip_body'], content_type='application/xml')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(index['body'], content_type='application/xml')
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return finalize(response, index['etag'], index['lastmod'])
+
+
+class SitemapShardView(View):
+    """One gzipped child sitemap, e.g. ``sitemap-startups-2025-01.xml.gz``"""
+
+    def get(self, request, name):
+        shard = get_shard(name)
+        if shard is None:
+            raise Http404('Unknown sitemap')
+        not_modified = conditional(request, shard.etag, shard.lastmod)
+        if not_modified:
+            return finalize(not_modified, shard.etag, shard.lastmod)
+
+        response = HttpResponse(shard_body(shard), content_type='application/gzip')
+        response['Content-Disposition'] = f'inline; filename="sitemap-{name}.xml.gz"'
+        return finalize(response, shard.etag, shard.lastmod)
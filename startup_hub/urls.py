@@ -1,14 +1,14 @@
 # startup_hub/startup_hub/urls.py
 import os
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.http import JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
 from apps.core.health import health_check, detailed_health_check, readiness_check, liveness_check
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from .sitemap_view import SitemapView
+from .sitemap_view import SitemapView, SitemapShardView
 from .robots_view import RobotsView
 
 def api_stats(request):
@@ -70,6 +70,7 @@ urlpatterns = [
     # SEO Files
     path('robots.txt', RobotsView.as_view(), name='robots'),
     path('sitemap.xml', SitemapView.as_view(), name='sitemap'),
+    re_path(r'^sitemap-(?P<name>[a-z]+(?:-\d{4}-\d{2}(?:-\d+)?)?)\.xml\.gz$', SitemapShardView.as_view(), name='sitemap-shard'),
     
     # Health check endpoints
     path('health/', health_check, name='health_check'),